@@ -144,5 +144,12 @@ if [ -n "${CEO_EMAIL:-}" ]; then
 	fi
 fi
 
+# SERVER_MODE=asgi serves the app with uvicorn workers and the async read views
+if [ "${SERVER_MODE:-wsgi}" = "asgi" ]; then
+	export ASYNC_READ_VIEWS="${ASYNC_READ_VIEWS:-1}"
+	echo "Starting Uvicorn (ASGI)..."
+	exec uvicorn leave_management.asgi:application --host 0.0.0.0 --port ${PORT:-8000} --workers ${WEB_CONCURRENCY:-2}
+fi
+
 echo "Starting Gunicorn..."
 exec gunicorn leave_management.wsgi:application --bind 0.0.0.0:${PORT:-8000}
\ No newline at end of file
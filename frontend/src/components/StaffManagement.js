@@ -1207,173 +1207,54 @@ function StaffManagement() {
   const handleImportFile = async (e) => {
     const f = e.target.files && e.target.files[0];
     if (!f) return;
-    const reader = new FileReader();
-    reader.onload = async (ev) => {
-      try {
-        const text = ev.target.result;
-        const rows = text.split(/\r?\n/).filter(Boolean);
-        if (!rows.length) {
-          showToast({ type: 'warning', message: 'Empty CSV file.' });
-          return;
-        }
-        const header = rows
-          .shift()
-          .split(',')
-          .map((h) => h.trim().toLowerCase());
-        
-        // Enhanced field mapping
-    const nameIdx = header.indexOf('name');
-    const emailIdx = header.indexOf('email');
-    const affiliateIdx = header.indexOf('affiliate');
-    const deptIdx = header.indexOf('department');
-        const roleIdx = header.indexOf('role');
-        const employeeIdIdx = header.indexOf('employee_id');
-        const hireDateIdx = header.indexOf('hire_date');
-        
-        // Validate required fields
-        if (nameIdx === -1 || emailIdx === -1) {
-          showToast({ type: 'error', message: 'CSV must contain at least "name" and "email" columns' });
-          return;
-        }
-        
-        if (affiliateIdx === -1) {
-          showToast({ type: 'error', message: 'CSV must contain "affiliate" column' });
-          return;
-        }
-        
-  const validRoles = ['junior_staff', 'senior_staff', 'manager', 'hr', 'ceo', 'admin'];
-        
-        const parsed = rows.map((r, i) => {
-          const cols = r.split(',').map((c) => c.trim());
-          
-          // Extract affiliate
-          const affiliateName = cols[affiliateIdx] || '';
-          const matchedAffiliate = affiliates.find(a => (a.name || '').toLowerCase() === affiliateName.toLowerCase());
-          
-          if (!matchedAffiliate) {
-            return { error: `Row ${i + 2}: Invalid or missing affiliate "${affiliateName}"` };
-          }
-          
-          // Extract and validate role
-          const role = cols[roleIdx] || 'junior_staff';
-          const validatedRole = validRoles.includes(role) ? role : 'junior_staff';
-          
-          // Extract employee ID or generate one
-          const employeeId = cols[employeeIdIdx] || `EMP${String(Date.now() + i).substring(-6)}`;
-          
-          // Extract hire date or use current date
-          const hireDate = cols[hireDateIdx] || new Date().toISOString().split('T')[0];
-          
-          // Split name into first and last name
-          const fullName = cols[nameIdx] || '';
-          const nameParts = fullName.trim().split(' ');
-          const firstName = nameParts[0] || '';
-          const lastName = nameParts.slice(1).join(' ') || '';
-          
-          // Generate username from email
-          const email = cols[emailIdx] || '';
-          const username = email.split('@')[0] || `user${Date.now() + i}`;
-          
-          // Handle department based on affiliate
-          let department_id = null;
-          const deptName = cols[deptIdx] || '';
-          
-          // For Merban Capital, department is required
-          if (matchedAffiliate.name === 'Merban Capital') {
-            if (!deptName) {
-              return { error: `Row ${i + 2}: Department required for Merban Capital employees` };
-            }
-            const matchedDept = departments.find(d => (d.name || '').toLowerCase() === deptName.toLowerCase());
-            if (!matchedDept) {
-              return { error: `Row ${i + 2}: Invalid department "${deptName}"` };
-            }
-            department_id = matchedDept.id;
-          }
-          // For SDSL/SBL, users remain as individual entities (no department assignment)
-          
-          return {
-            username,
-            email,
-            first_name: firstName,
-            last_name: lastName,
-            employee_id: employeeId,
-            role: validatedRole,
-            hire_date: hireDate,
-            affiliate_id: matchedAffiliate.id,
-            department_id: department_id,
-            password: 'TempPass123!', // Default temporary password
-            is_active_employee: true
-          };
+    // Validate and import server-side in one request; the server validates every row first (dry run)
+    const upload = async (dryRun) => {
+      const form = new FormData();
+      form.append('file', f);
+      form.append('dry_run', dryRun ? 'true' : 'false');
+      form.append('default_password', 'TempPass123!'); // Default temporary password
+      const res = await api.post('/users/staff/import/', form, { headers: { 'Content-Type': 'multipart/form-data' } });
+      return res.data;
+    };
+    try {
+      const preview = await upload(true);
+      if (preview.errors && preview.errors.length > 0) {
+        console.error('CSV validation errors:', preview.errors);
+        showToast({
+          type: 'warning',
+          message: `${preview.errors.length} rows have errors. Check console for details.`
         });
-        
-        // Filter out errors and collect valid entries
-        const validEntries = parsed.filter(p => !p.error);
-        const parseErrors = parsed.filter(p => p.error);
-        
-        if (parseErrors.length > 0) {
-          console.error('CSV parsing errors:', parseErrors);
-          showToast({ 
-            type: 'warning', 
-            message: `${parseErrors.length} rows have errors. Check console for details.` 
-          });
-        }
-        
-        if (validEntries.length === 0) {
-          showToast({ type: 'error', message: 'No valid employees to import' });
-          return;
-        }
-        
-        // Show preview and ask for confirmation
-        showToast({ type: 'info', message: `Parsed ${validEntries.length} valid employees. Starting import...` });
-        
-        // Import employees one by one to the backend
-        let successCount = 0;
-        let errorCount = 0;
-        const errors = [];
-        
-        for (let i = 0; i < validEntries.length; i++) {
-          const employeeData = validEntries[i];
-          try {
-            const response = await api.post('/users/staff/', employeeData);
-            successCount++;
-            console.log(`Successfully imported employee ${i + 1}:`, response.data);
-          } catch (error) {
-            errorCount++;
-            const errorMsg = error.response?.data?.detail || 
-                           error.response?.data?.email?.[0] || 
-                           error.response?.data?.employee_id?.[0] || 
-                           'Unknown error';
-            errors.push(`Row ${i + 1} (${employeeData.email}): ${errorMsg}`);
-            console.error(`Failed to import employee ${i + 1}:`, error.response?.data);
-          }
-        }
-        
-        // Show results
-        if (successCount > 0) {
-          showToast({ 
-            type: 'success', 
-            message: `Successfully imported ${successCount} employees to the system!` 
-          });
-          // Refresh the staff data
-          fetchStaffData();
-        }
-        
-        if (errorCount > 0) {
-          showToast({ 
-            type: 'warning', 
-            message: `${errorCount} employees failed to import. Check console for details.` 
-          });
-          console.error('Import errors:', errors);
-        }
-        
-      } catch (err) {
-        console.error('Import error:', err);
-        showToast({ type: 'error', message: 'Failed to process CSV. Please check the file format.' });
-      } finally {
-        if (fileInputRef.current) fileInputRef.current.value = null;
       }
-    };
-    reader.readAsText(f);
+      if (!preview.valid_rows) {
+        showToast({ type: 'error', message: 'No valid employees to import' });
+        return;
+      }
+
+      showToast({ type: 'info', message: `Parsed ${preview.valid_rows} valid employees. Starting import...` });
+      const report = await upload(false);
+      if (report.created > 0) {
+        showToast({
+          type: 'success',
+          message: `Successfully imported ${report.created} employees to the system!`
+        });
+        // Refresh the staff data
+        fetchStaffData();
+      }
+      const failed = report.total_rows - report.created;
+      if (failed > 0) {
+        showToast({
+          type: 'warning',
+          message: `${failed} employees failed to import. Check console for details.`
+        });
+        console.error('Import errors:', report.errors);
+      }
+    } catch (err) {
+      console.error('Import error:', err);
+      const msg = err.response?.data?.error || 'Failed to process CSV. Please check the file format.';
+      showToast({ type: 'error', message: msg });
+    } finally {
+      if (fileInputRef.current) fileInputRef.current.value = null;
+    }
   };
 
   const handleExportCSV = () => {
@@ -1434,8 +1315,6 @@ function StaffManagement() {
     }
   };
 
-  
-
   const downloadTemplateCSV = () => {
   const csv = `name,email,affiliate,department,role,employee_id,hire_date
 John Doe,john.doe@company.com,Merban Capital,IT,senior_staff,EMP001,2023-01-15
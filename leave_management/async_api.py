@@ -0,0 +1,75 @@
+"""
+Plumbing for async (ASGI) read endpoints.
+
+DRF views are synchronous, so under ASGI every DRF request still occupies a
+thread. The read-heavy endpoints therefore also have plain async Django views
+(leaves.async_views, notifications.async_views) built on the async ORM. They are
+routed in place of their DRF counterparts when ASYNC_READ_VIEWS is on, which the
+ASGI server mode of entrypoint.sh enables.
+
+`async_api_view` gives those views what DRF gave the sync versions: JWT
+authentication (the same cached snapshots as CachedJWTAuthentication), JSON
+errors in the `detail` shape, and optionally the strong ETags and early 304s of
+ConditionalGetMixin.
+"""
+import functools
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, JsonResponse
+from django.utils import timezone
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
+
+from leave_management.conditional import etag_matches, resource_etag
+from leave_management.db_router import replica_reads_active
+
+SAFE_METHODS = ('GET', 'HEAD')
+
+
+def _prepare(request, view, resources, kwargs):
+    """Authenticate and compute the ETag in one hop to the request's sync thread."""
+    from users.authentication import CachedJWTAuthentication
+
+    result = CachedJWTAuthentication().authenticate(request)
+    user = result[0] if result else None
+    if user is None or not resources or replica_reads_active():
+        return user, None
+    return user, resource_etag(
+        [r.format(user=user.pk, **kwargs) for r in resources],
+        view.__qualname__, user.pk, request.get_full_path(), 'json', timezone.localdate().isoformat(),
+    )
+
+
+def async_api_view(conditional_resources=None):
+    """Wrap an async GET view returning JSON-serializable data.
+
+    `conditional_resources` are resource names as in ConditionalGetMixin
+    (formatted with `{user}` and the URL kwargs).
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in SAFE_METHODS:
+                return JsonResponse({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+            try:
+                user, etag = await sync_to_async(_prepare)(request, view, conditional_resources, kwargs)
+            except (AuthenticationFailed, InvalidToken, TokenError) as exc:
+                return JsonResponse({'detail': str(getattr(exc, 'detail', exc))}, status=401)
+            if user is None:
+                return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+            request.user = user
+            if etag and etag_matches(etag, request.headers.get('If-None-Match')):
+                response = HttpResponse(status=304)
+                response['ETag'] = etag
+                return response
+
+            result = await view(request, *args, **kwargs)
+            # DRF's encoder, so dates and decimals render as in the sync views
+            response = result if isinstance(result, HttpResponse) else JsonResponse(result, encoder=JSONEncoder, safe=False)
+            if etag and response.status_code == 200:
+                response['ETag'] = etag
+                response['Cache-Control'] = 'private, no-cache'
+                response['Vary'] = 'Authorization'
+            return response
+        return wrapper
+    return decorator
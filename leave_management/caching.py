@@ -0,0 +1,103 @@
+"""
+Version counters for cache invalidation.
+
+Cached payloads embed the current version of the data they were built from in their
+cache key; writers bump the version instead of hunting down every derived key. Stale
+entries are simply never read again and expire on their own TTL.
+
+Versions only invalidate anything if every worker reads the same counters. With a
+process-local default cache (LocMemCache, the default without REDIS_URL) and
+several workers, a write in one worker would leave the others serving stale
+payloads and 304s, so `versions_shared()` is False there and version-keyed
+caches go through `versioned_cache()`, a no-op cache, instead.
+"""
+import time
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from django.core.cache.backends.dummy import DummyCache
+from django.db import transaction
+
+
+VERSION_KEY_PREFIX = 'cache-version:'
+# Version keys outlive the payloads that reference them
+VERSION_TTL = 60 * 60 * 24 * 7
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+_no_cache = DummyCache('versioned-caches-disabled', {})
+
+
+def versions_shared() -> bool:
+    """Whether every worker sees the same version counters (settings.VERSIONED_CACHES)."""
+    if settings.VERSIONED_CACHES is not None:
+        return settings.VERSIONED_CACHES
+    backend = settings.CACHES['default']['BACKEND']
+    return backend not in PROCESS_LOCAL_BACKENDS or settings.WEB_WORKERS <= 1
+
+
+def versioned_cache():
+    """The cache for version-keyed payloads: the default one, or a no-op without shared versions."""
+    return cache if versions_shared() else _no_cache
+
+
+@checks.register(checks.Tags.caches)
+def check_versions_shared(app_configs, **kwargs):
+    if versions_shared():
+        return []
+    return [checks.Warning(
+        f'The default cache is process-local and {settings.WEB_WORKERS} workers are configured, '
+        'so ETags and version-keyed caches are disabled.',
+        hint='Configure a shared cache (REDIS_URL) or set VERSIONED_CACHES.',
+        id='leave_management.W001',
+    )]
+
+
+def _version_key(name: str) -> str:
+    return f'{VERSION_KEY_PREFIX}{name}'
+
+
+def _initial_version() -> int:
+    # Time based so a cache flush or restart never reuses an old version number
+    return int(time.time() * 1000)
+
+
+def get_version(name: str) -> int:
+    """Return the current version for `name`, initializing it when missing."""
+    key = _version_key(name)
+    version = cache.get(key)
+    if version is None:
+        version = _initial_version()
+        if not cache.add(key, version, VERSION_TTL):
+            version = cache.get(key) or version
+    return version
+
+
+def get_versions(*names: str) -> dict:
+    """Return {name: version} for several names in one cache round trip."""
+    keys = {_version_key(n): n for n in names}
+    found = cache.get_many(list(keys))
+    result = {}
+    for key, name in keys.items():
+        result[name] = found[key] if key in found else get_version(name)
+    return result
+
+
+def _incr(name: str) -> None:
+    key = _version_key(name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _initial_version(), VERSION_TTL)
+
+
+def bump_version(name: str) -> None:
+    """Invalidate everything cached under `name`.
+
+    Bumped immediately and again once the surrounding transaction commits, so a reader
+    that repopulated the cache from pre-commit data does not keep it alive.
+    """
+    _incr(name)
+    transaction.on_commit(lambda: _incr(name))
@@ -0,0 +1,144 @@
+"""
+Resource versions and conditional GET for read endpoints.
+
+Every logical resource the API lists (leave types, departments, a user's leave
+balances, the approval queues, ...) has a monotonically increasing version in the
+shared cache (see leave_management.caching). The apps' signal handlers bump it with
+`bump_resources()` whenever a row behind it changes; bulk writes that bypass model
+signals call `bump_all_resources()`, whose counter is part of every tag.
+
+ConditionalGetMixin hashes the versions an endpoint depends on, together with the
+caller, the URL, the negotiated format and today's date (several payloads are
+relative to the current year or day), into a strong ETag. A request whose
+If-None-Match matches is answered with 304 straight after authentication and
+permission checks, before the handler runs any query or serializer.
+
+Resource names in use:
+
+- leave-types, affiliates, departments, employment-grades, grade-entitlements
+- users (profile fields shown in listings; last_login-only saves are ignored)
+- leave-requests (any request, interrupt or resume change)
+- leave-balances:<employee id> for one employee's balances; leave-balances for
+  bulk balance writes covering many employees
+- entitlements (entitled days and the role/affiliate buckets they are grouped by)
+"""
+import hashlib
+
+from django.utils.cache import patch_vary_headers
+from django.utils import timezone
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+
+from leave_management.caching import bump_version, get_versions, versions_shared
+from leave_management.db_router import replica_reads_active
+
+
+RESOURCE_PREFIX = 'resource:'
+ALL_RESOURCES = '*'
+CONDITIONAL_METHODS = ('GET', 'HEAD')
+
+
+def resource_version_name(resource: str) -> str:
+    return f'{RESOURCE_PREFIX}{resource}'
+
+
+def bump_resources(*resources: str) -> None:
+    """Invalidate the ETags of every endpoint depending on `resources`."""
+    for resource in dict.fromkeys(resources):
+        bump_version(resource_version_name(resource))
+
+
+def bump_all_resources() -> None:
+    """Invalidate every ETag (after bulk writes that send no model signals)."""
+    bump_version(resource_version_name(ALL_RESOURCES))
+
+
+def resource_etag(resources, *scope):
+    """Strong ETag over the current versions of `resources` and the `scope` values.
+
+    None when workers do not share versions (leave_management.caching.versions_shared):
+    a tag from one worker's counters could answer 304 after another worker's write.
+    """
+    if not versions_shared():
+        return None
+    names = [resource_version_name(r) for r in (ALL_RESOURCES, *sorted(set(resources)))]
+    versions = get_versions(*names)
+    parts = [str(part) for part in scope] + [f'{name}={versions[name]}' for name in names]
+    digest = hashlib.sha1('|'.join(parts).encode()).hexdigest()
+    return quote_etag(digest)
+
+
+def etag_matches(etag: str, if_none_match: str) -> bool:
+    # If-None-Match uses the weak comparison (RFC 9110 13.1.2)
+    candidates = parse_etags(if_none_match or '')
+    return '*' in candidates or any(c.removeprefix('W/') == etag for c in candidates)
+
+
+class NotModified(APIException):
+    status_code = status.HTTP_304_NOT_MODIFIED
+    default_detail = 'Not modified.'
+    default_code = 'not_modified'
+
+
+class ConditionalGetMixin:
+    """Strong ETags and early 304s for API views, driven by resource versions.
+
+    `conditional_resources` is either a tuple of resource names applying to every
+    GET, or a dict of {action: tuple} for viewsets. Names are formatted with the
+    requesting user's id (`{user}`) and the URL kwargs, e.g. 'leave-balances:{user}'.
+    Actions without resources, and requests served from the read replica, are
+    handled as usual. Views whose output also depends on configuration add it
+    through `get_conditional_scope()`.
+    """
+    conditional_resources = ()
+
+    def get_conditional_resources(self):
+        resources = self.conditional_resources
+        if isinstance(resources, dict):
+            resources = resources.get(getattr(self, 'action', None), ())
+        kwargs = {**self.kwargs, 'user': getattr(self.request.user, 'pk', None)}
+        return tuple(resource.format(**kwargs) for resource in resources)
+
+    def get_conditional_scope(self):
+        return ()
+
+    def get_conditional_etag(self, request):
+        resources = self.get_conditional_resources()
+        # A lagging replica could pair old rows with the current versions
+        if not resources or replica_reads_active():
+            return None
+        renderer = getattr(request, 'accepted_renderer', None)
+        return resource_etag(
+            resources,
+            type(self).__name__,
+            getattr(request.user, 'pk', ''),
+            request.get_full_path(),
+            getattr(renderer, 'format', ''),
+            timezone.localdate().isoformat(),
+            *self.get_conditional_scope(),
+        )
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.conditional_etag = None
+        if request.method not in CONDITIONAL_METHODS:
+            return
+        self.conditional_etag = self.get_conditional_etag(request)
+        if self.conditional_etag and etag_matches(self.conditional_etag, request.META.get('HTTP_IF_NONE_MATCH')):
+            raise NotModified()
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return Response(status=status.HTTP_304_NOT_MODIFIED)
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        etag = getattr(self, 'conditional_etag', None)
+        if etag and response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+            response['Cache-Control'] = 'private, no-cache'
+            patch_vary_headers(response, ['Authorization'])
+        return response
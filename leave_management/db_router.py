@@ -0,0 +1,136 @@
+"""
+Read-replica routing for reporting and list endpoints.
+
+Exports, dashboards and the categorized approval endpoints run long read queries
+that compete with approval writes on the primary. Views opt in with
+`@read_replica`; ReplicaRoutingMiddleware then sends their GET/HEAD reads to the
+replica alias (REPLICA_DATABASE_ALIAS, normally 'replica') while everything else,
+including all writes, stays on the primary.
+
+Read-your-writes: a successful write pins the client to the primary for
+REPLICA_STICKY_SECONDS, through a cookie and an `X-Primary-Until` response header
+that API clients may echo back. Pinned clients read from the primary even on
+opted-in views, so a user who just approved a request never sees it pending again.
+
+Without a replica configured the router sends everything to the primary. Locally,
+point REPLICA_SQLITE_PATH at a copy of the SQLite file to use it as a stand-in.
+"""
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+from leave_management.middleware import view_attribute
+
+
+SAFE_METHODS = ('GET', 'HEAD')
+PIN_COOKIE = 'db_primary_until'
+PIN_HEADER = 'X-Primary-Until'
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+def replica_alias():
+    """The configured replica alias, or None when reads can only go to the primary."""
+    alias = getattr(settings, 'REPLICA_DATABASE_ALIAS', 'replica')
+    return alias if alias in settings.DATABASES else None
+
+
+def replica_reads_active() -> bool:
+    """True while the current request reads from the replica."""
+    return _replica_reads.get() and replica_alias() is not None
+
+
+def read_replica(view):
+    """Allow a GET view to read from the replica.
+
+    Works on function views (place it above @api_view), APIView handler methods and
+    @action methods, like @query_budget.
+    """
+    view.read_replica = True
+    return view
+
+
+class ReplicaRouter:
+    """Reads go to the replica inside opted-in requests; everything else to the primary.
+
+    Returning the primary explicitly (rather than None) matters: Django would otherwise
+    follow the instance hint, sending saves and related lookups of rows loaded from
+    the replica back to the replica.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get():
+            return replica_alias() or DEFAULT_DB_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replica rows are copies of primary rows
+        aliases = {DEFAULT_DB_ALIAS, replica_alias()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """Route opted-in GET views to the replica and pin recent writers to the primary."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _replica_reads.set(False)
+        return self._finish(request, response)
+
+    async def __acall__(self, request):
+        try:
+            response = await self.get_response(request)
+        finally:
+            _replica_reads.set(False)
+        return self._finish(request, response)
+
+    def _finish(self, request, response):
+        if request.method not in SAFE_METHODS and response.status_code < 400 and replica_alias():
+            self._pin(response)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (request.method in SAFE_METHODS and replica_alias()
+                and view_attribute(request, view_func, 'read_replica') and not self._pinned(request)):
+            _replica_reads.set(True)
+        return None
+
+    @staticmethod
+    def _pinned(request) -> bool:
+        now = time.time()
+        for raw in (request.COOKIES.get(PIN_COOKIE), request.headers.get(PIN_HEADER)):
+            try:
+                if raw and float(raw) > now:
+                    return True
+            except ValueError:
+                continue
+        return False
+
+    @staticmethod
+    def _pin(response) -> None:
+        window = getattr(settings, 'REPLICA_STICKY_SECONDS', 5)
+        until = str(int(time.time() + window) + 1)
+        response.set_cookie(PIN_COOKIE, until, max_age=window + 1, httponly=True, samesite='Lax')
+        response[PIN_HEADER] = until
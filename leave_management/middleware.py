@@ -0,0 +1,166 @@
+"""
+Per-request SQL instrumentation and query budgets.
+
+QueryBudgetMiddleware counts every SQL statement a request executes (on all
+database aliases) and the time spent in them. The figures are:
+
+- exposed in a `Server-Timing` header (`db;dur=<ms>;desc="<n> queries"`), which
+  browser dev tools show next to the request;
+- logged on the `leave_management.queries` logger with structured `extra` fields;
+- attached to the response as `response.query_stats` for tests
+  (see leave_management.testing).
+
+Views declare how many queries they may run with `@query_budget(n)`. Exceeding a
+budget logs a warning, or raises QueryBudgetExceeded when QUERY_BUDGET_STRICT is
+set (tests), so N+1 regressions fail loudly instead of slowing down production.
+"""
+import logging
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger('leave_management.queries')
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised in strict mode when a view runs more queries than it declared."""
+
+
+def query_budget(max_queries: int):
+    """Declare the maximum number of SQL queries a view (or viewset action) may run.
+
+    Works on function views, APIView handler methods and @action methods; the
+    middleware reads the attribute when the request is routed.
+    """
+    def decorator(func):
+        func.query_budget = max_queries
+        return func
+    return decorator
+
+
+def view_attribute(request, view_func, name):
+    """Read a marker set by a view decorator, looking through DRF views to the handler."""
+    value = getattr(view_func, name, None)
+    if value is not None:
+        return value
+    view_class = getattr(view_func, 'cls', None)
+    if view_class is None:
+        return None
+    method = request.method.lower()
+    # ViewSets route methods to actions ({'get': 'list'}); APIViews use the method name
+    actions = getattr(view_func, 'actions', None) or {}
+    handler = getattr(view_class, actions.get(method, method), None)
+    return getattr(handler, name, None)
+
+
+class _QueryRecorder:
+    """Execute wrapper accumulating query count and duration."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+
+
+class QueryBudgetMiddleware:
+    """Record SQL count/time per request and enforce declared query budgets.
+
+    Runs in both sync and async mode, so ASGI deployments keep async views async.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'QUERY_BUDGET_ENABLED', True)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+
+        recorder = _QueryRecorder()
+        request._query_budget = None
+        started = time.perf_counter()
+        with self._recording(recorder):
+            response = self.get_response(request)
+        return self._finish(request, response, recorder, started)
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+
+        recorder = _QueryRecorder()
+        request._query_budget = None
+        started = time.perf_counter()
+        # Connections are per thread: async ORM queries run on the request's
+        # thread-sensitive executor thread, so the wrappers are installed there
+        stack = await sync_to_async(self._recording)(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self._finish(request, response, recorder, started)
+
+    @staticmethod
+    def _recording(recorder):
+        stack = ExitStack()
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(recorder))
+        return stack
+
+    def _finish(self, request, response, recorder, started):
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        db_ms = recorder.duration * 1000
+
+        budget = request._query_budget
+        stats = {
+            'queries': recorder.count,
+            'db_ms': round(db_ms, 2),
+            'total_ms': round(elapsed_ms, 2),
+            'budget': budget,
+        }
+        response.query_stats = stats
+
+        if getattr(settings, 'QUERY_BUDGET_HEADER', True):
+            timing = f'db;dur={db_ms:.2f};desc="{recorder.count} queries", app;dur={elapsed_ms:.2f}'
+            existing = response.get('Server-Timing')
+            response['Server-Timing'] = f'{existing}, {timing}' if existing else timing
+
+        log_extra = {'method': request.method, 'path': request.path, 'status': response.status_code, **stats}
+        over_budget = budget is not None and recorder.count > budget
+        if over_budget:
+            logger.warning(
+                'Query budget exceeded: %s %s ran %s queries (budget %s)',
+                request.method, request.path, recorder.count, budget, extra=log_extra,
+            )
+            if getattr(settings, 'QUERY_BUDGET_STRICT', False):
+                raise QueryBudgetExceeded(
+                    f'{request.method} {request.path} ran {recorder.count} queries, budget is {budget}'
+                )
+        else:
+            logger.info(
+                'method=%s path=%s status=%s queries=%s db_ms=%.2f total_ms=%.2f budget=%s',
+                request.method, request.path, response.status_code, recorder.count, db_ms, elapsed_ms, budget,
+                extra=log_extra,
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if self.enabled:
+            request._query_budget = view_attribute(request, view_func, 'query_budget')
+        return None
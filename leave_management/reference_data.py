@@ -0,0 +1,167 @@
+"""
+In-process registry of small, rarely changing reference tables.
+
+Leave types, affiliates, departments and employment grades change a few times a
+year but were re-queried by almost every leave and user view. Each ReferenceTable
+loads its rows once into an immutable Snapshot (a tuple plus read-only id/name
+indexes) and serves lookups from memory. Rows are shared model instances: treat
+them as read-only.
+
+Freshness is version checked: the apps' signal handlers call `changed()`, which
+drops the local snapshot and bumps the table's version in the shared cache (see
+leave_management.caching) so other processes reload on their next check.
+Versions are re-read at most every REFERENCE_DATA_RECHECK_SECONDS, and a snapshot
+never outlives REFERENCE_DATA_MAX_AGE. When workers do not share versions
+(leave_management.caching.versions_shared) other workers' writes are invisible,
+so a snapshot only lives for one recheck interval.
+
+A snapshot loaded inside a transaction that itself changed the table is only
+trusted while that transaction is open, so a rollback cannot leave rows that
+never committed in memory.
+"""
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Callable, Mapping, Optional, Tuple
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections, router
+
+from leave_management.caching import bump_version, get_version, versions_shared
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    version: int
+    loaded_at: float
+    rows: Tuple[Any, ...]
+    by_id: Mapping[int, Any]
+    by_name: Mapping[str, Any]
+    # Outermost atomic block that wrote this table before the load, if still open
+    transaction: Any = None
+
+
+class ReferenceTable:
+    """Immutable in-memory copy of one small table with id and name lookups."""
+
+    def __init__(self, name: str, model_label: str, related: Tuple[str, ...] = (), name_field: str = 'name'):
+        self.name = name
+        self.model_label = model_label
+        self.related = related
+        self.name_field = name_field
+        self.version_name = f'reference-data:{name}'
+        self._snapshot: Optional[Snapshot] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._pending = threading.local()
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    def _alias(self):
+        # Always the primary: a snapshot loaded from a lagging replica would outlive the lag
+        return router.db_for_write(self.model)
+
+    def _connection(self):
+        return connections[self._alias()]
+
+    # -- loading -------------------------------------------------------------------
+
+    def _open_write_transaction(self):
+        """The outermost atomic block that changed this table on this thread, if still open."""
+        block = getattr(self._pending, 'block', None)
+        if block is None:
+            return None
+        blocks = self._connection().atomic_blocks
+        if blocks and blocks[0] is block:
+            return block
+        # Committed (version already bumped on commit) or rolled back
+        self._pending.block = None
+        return None
+
+    def _load(self, version: int, transaction) -> Snapshot:
+        queryset = self.model._default_manager.db_manager(self._alias()).all()
+        if self.related:
+            queryset = queryset.select_related(*self.related)
+        rows = tuple(queryset)
+        return Snapshot(
+            version=version,
+            loaded_at=time.monotonic(),
+            rows=rows,
+            by_id=MappingProxyType({row.pk: row for row in rows}),
+            by_name=MappingProxyType({
+                str(getattr(row, self.name_field)).strip().lower(): row for row in rows
+            }),
+            transaction=transaction,
+        )
+
+    def snapshot(self) -> Snapshot:
+        """Current snapshot, reloaded when the shared version moved or it aged out."""
+        snap = self._snapshot
+        now = time.monotonic()
+        pending = self._open_write_transaction()
+        recheck = getattr(settings, 'REFERENCE_DATA_RECHECK_SECONDS', 1.0)
+        max_age = getattr(settings, 'REFERENCE_DATA_MAX_AGE', 300) if versions_shared() else recheck
+        # Snapshots built inside a writing transaction are only valid in that transaction
+        if snap is not None and snap.transaction is pending and now - snap.loaded_at <= max_age:
+            if now - self._checked_at < recheck:
+                return snap
+            if get_version(self.version_name) == snap.version:
+                self._checked_at = now
+                return snap
+        with self._lock:
+            current = self._snapshot
+            if current is not None and current is not snap and current.transaction is pending:
+                # Another thread reloaded while we waited
+                return current
+            snap = self._load(get_version(self.version_name), pending)
+            self._snapshot, self._checked_at = snap, time.monotonic()
+        return snap
+
+    # -- lookups -------------------------------------------------------------------
+
+    def all(self) -> Tuple[Any, ...]:
+        return self.snapshot().rows
+
+    def filter(self, predicate: Callable[[Any], bool]) -> Tuple[Any, ...]:
+        return tuple(row for row in self.snapshot().rows if predicate(row))
+
+    def active(self) -> Tuple[Any, ...]:
+        """Rows with is_active set (all rows for models without the flag)."""
+        return self.filter(lambda row: getattr(row, 'is_active', True))
+
+    def get(self, pk, default=None):
+        try:
+            return self.snapshot().by_id.get(int(pk), default)
+        except (TypeError, ValueError):
+            return default
+
+    def get_by_name(self, name, default=None):
+        if name is None:
+            return default
+        return self.snapshot().by_name.get(str(name).strip().lower(), default)
+
+    # -- invalidation --------------------------------------------------------------
+
+    def changed(self) -> None:
+        """Invalidate after a write; connected to the model's save/delete signals."""
+        connection = self._connection()
+        if connection.in_atomic_block:
+            self._pending.block = connection.atomic_blocks[0]
+        self._snapshot = None
+        bump_version(self.version_name)
+
+    def clear(self) -> None:
+        """Drop the local snapshot (e.g. after bulk writes that bypass signals)."""
+        self._snapshot = None
+
+
+leave_types = ReferenceTable('leave_types', 'leaves.LeaveType')
+affiliates = ReferenceTable('affiliates', 'users.Affiliate')
+departments = ReferenceTable('departments', 'users.Department', related=('affiliate', 'hod'))
+employment_grades = ReferenceTable('employment_grades', 'users.EmploymentGrade')
+
+TABLES = {table.name: table for table in (leave_types, affiliates, departments, employment_grades)}
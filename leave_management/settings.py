@@ -54,15 +54,20 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First so it also counts queries made by the middleware below it
+    'leave_management.middleware.QueryBudgetMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    # WhiteNoise that also runs in async mode, keeping ASGI requests on the event loop
+    'leave_management.static_files.AsyncWhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Sends @read_replica views to the replica; pins recent writers to the primary
+    'leave_management.db_router.ReplicaRoutingMiddleware',
 ]
 
 ROOT_URLCONF = 'leave_management.urls'
@@ -132,6 +137,28 @@ else:
         }
     }
 
+# Optional read replica for report and list views (leave_management.db_router).
+# REPLICA_SQLITE_PATH names a copy of the SQLite file to act as a local stand-in;
+# DB_REPLICA_HOST adds a MySQL replica reached with the primary's credentials.
+REPLICA_DATABASE_ALIAS = 'replica'
+if 'sqlite3' in DATABASES['default']['ENGINE']:
+    if os.getenv('REPLICA_SQLITE_PATH'):
+        DATABASES[REPLICA_DATABASE_ALIAS] = {
+            **DATABASES['default'],
+            'NAME': os.getenv('REPLICA_SQLITE_PATH'),
+            'TEST': {'MIRROR': 'default'},
+        }
+elif config('DB_REPLICA_HOST', default=''):
+    DATABASES[REPLICA_DATABASE_ALIAS] = {
+        **DATABASES['default'],
+        'HOST': config('DB_REPLICA_HOST'),
+        'PORT': config('DB_REPLICA_PORT', default=DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['leave_management.db_router.ReplicaRouter']
+# Seconds a client that just wrote keeps reading from the primary
+REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", "5"))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -183,7 +210,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -201,6 +228,10 @@ CORS_ALLOWED_ORIGINS = [
 ]
 
 CORS_ALLOW_CREDENTIALS = True
+# Read-your-writes pin set after writes (leave_management.db_router)
+from corsheaders.defaults import default_headers
+CORS_ALLOW_HEADERS = (*default_headers, 'x-primary-until')
+CORS_EXPOSE_HEADERS = ['X-Primary-Until']
 
 # In development, allow all origins to simplify local/network testing
 if DEBUG:
@@ -214,9 +245,42 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
     'ROTATE_REFRESH_TOKENS': True,
 }
+# Version-keyed caches and ETags (leave_management.caching) need one cache shared by
+# every worker process: the default here is a per-process LocMemCache, and
+# settings_production only configures Redis when REDIS_URL is set. Left unset,
+# VERSIONED_CACHES enables them only with a shared cache backend or a single
+# worker (WEB_CONCURRENCY, as the Procfile passes it; uvicorn defaults to 2).
+VERSIONED_CACHES = env_bool("VERSIONED_CACHES") if os.getenv("VERSIONED_CACHES") is not None else None
+WEB_WORKERS = int(os.getenv("WEB_CONCURRENCY") or (2 if os.getenv("SERVER_MODE") == "asgi" else 1))
+
+# Seconds an authenticated user snapshot stays cached (users.authentication)
+AUTH_USER_CACHE_TTL = int(os.getenv("AUTH_USER_CACHE_TTL", "60"))
+
+# Per-request SQL instrumentation (leave_management.middleware)
+QUERY_BUDGET_ENABLED = env_bool("QUERY_BUDGET_ENABLED", default=True)
+QUERY_BUDGET_HEADER = env_bool("QUERY_BUDGET_HEADER", default=True)
+# Raise instead of logging when a view exceeds its declared @query_budget
+QUERY_BUDGET_STRICT = env_bool("QUERY_BUDGET_STRICT", default=False)
+
+# In-process reference tables (leave_management.reference_data): seconds between
+# shared version checks, and the hard age limit of a snapshot
+REFERENCE_DATA_RECHECK_SECONDS = float(os.getenv("REFERENCE_DATA_RECHECK_SECONDS", "1"))
+REFERENCE_DATA_MAX_AGE = int(os.getenv("REFERENCE_DATA_MAX_AGE", "300"))
+
+# Route the busiest read endpoints (dashboard, balances, approval counts, inbox) to
+# their async views (leaves.async_views); enabled by the ASGI server mode
+ASYNC_READ_VIEWS = env_bool("ASYNC_READ_VIEWS", default=False)
+
+# Columnar snapshot read by the analytics endpoints (leaves.snapshots), refreshed by
+# build_analytics_snapshot; older snapshots than MAX_AGE seconds fall back to the database
+ANALYTICS_SNAPSHOT_ENABLED = env_bool("ANALYTICS_SNAPSHOT_ENABLED", default=True)
+ANALYTICS_SNAPSHOT_DIR = os.getenv("ANALYTICS_SNAPSHOT_DIR", str(BASE_DIR / "data" / "analytics"))
+ANALYTICS_SNAPSHOT_MAX_AGE = int(os.getenv("ANALYTICS_SNAPSHOT_MAX_AGE", "900"))
 
 # Custom User Model
 AUTH_USER_MODEL = 'users.CustomUser'
+# Username or email login resolved in one indexed query (users.backends)
+AUTHENTICATION_BACKENDS = ['users.backends.EmailOrUsernameModelBackend']
 
 # Media files (uploads)
 MEDIA_URL = '/media/'
@@ -227,3 +291,9 @@ OVERLAP_NOTIFY_MIN_DAYS = int(os.getenv("OVERLAP_NOTIFY_MIN_DAYS", "2"))  # mini
 OVERLAP_NOTIFY_MIN_COUNT = int(os.getenv("OVERLAP_NOTIFY_MIN_COUNT", "2"))  # min number of overlaps to notify
 OVERLAP_NOTIFY_EMAIL = env_bool("OVERLAP_NOTIFY_EMAIL", default=False)  # send email notifications for overlaps
 OVERLAP_DETECT_ENABLED = env_bool("OVERLAP_DETECT_ENABLED", default=True)  # enable/disable overlap detection
+
+# Approval SLA escalation (leaves.escalations); SiteSetting rows with the same keys override these
+ESCALATION_ENABLED = env_bool("ESCALATION_ENABLED", default=True)
+ESCALATION_REMINDER_HOURS = float(os.getenv("ESCALATION_REMINDER_HOURS", "24"))  # remind the stage approver
+ESCALATION_FALLBACK_HOURS = float(os.getenv("ESCALATION_FALLBACK_HOURS", "72"))  # escalate to the fallback approver
+ESCALATION_FALLBACK_APPROVER = os.getenv("ESCALATION_FALLBACK_APPROVER", "")  # username or email; default active admins
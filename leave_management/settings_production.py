@@ -124,6 +124,15 @@ if not _db_configured:
         "(SQLite fallback removed intentionally to prevent accidental ephemeral data usage.)"
     )
 
+# Optional read replica (leave_management.db_router); same engine options as the primary
+_replica_url = os.getenv('REPLICA_DATABASE_URL', '').strip()
+if _replica_url and '://' in _replica_url:
+    _replica = dj_database_url.parse(_replica_url, conn_max_age=600, conn_health_checks=True)
+    _replica['ENGINE'] = DATABASES['default']['ENGINE']
+    _replica['OPTIONS'] = dict(DATABASES['default'].get('OPTIONS') or {})
+    _replica['TEST'] = {'MIRROR': 'default'}
+    DATABASES[REPLICA_DATABASE_ALIAS] = _replica
+
 # Optional one-time logging of DB config (without credentials) to aid diagnosis
 if os.getenv('LOG_DB_CONFIG', '0').lower() in {'1', 'true', 'yes'} and _db_configured:
     import logging
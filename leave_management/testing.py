@@ -0,0 +1,133 @@
+"""
+Test helpers for query budgets.
+
+`seed_query_budget_dataset` builds a small organisation covering every approval
+flow (Merban departments with HODs, CEO-first SDSL/SBL, HR, CEOs) with leave
+requests at every stage, approver stamps and interrupt logs - the relations N+1
+regressions tend to hide behind. `QueryBudgetTestMixin.assertQueryBudget` then
+requests an endpoint and fails when it runs more queries than the view declared
+with `@query_budget` (see leave_management.middleware), listing the SQL.
+"""
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+
+def seed_query_budget_dataset(staff_per_group=4, year=None):
+    """Create affiliates, departments, approvers, staff and leave requests; returns a namespace."""
+    from users.models import Affiliate, CustomUser, Department
+    from leaves.models import LeaveBalance, LeaveInterruptLog, LeaveInterruptRequest, LeaveRequest, LeaveType
+
+    year = year or timezone.now().year
+    password = make_password(None)
+    users = []
+
+    def user(username, role, affiliate, department=None, manager=None):
+        obj = CustomUser(
+            username=username, email=f'{username}@example.com', first_name=username.title(), last_name='Seed',
+            employee_id=f'QB-{username.upper()}', role=role, affiliate=affiliate, department=department,
+            manager=manager, password=password,
+        )
+        obj.refresh_search_fields()
+        users.append(obj)
+        return obj
+
+    merban = Affiliate.objects.create(name='Merban Capital')
+    sdsl = Affiliate.objects.create(name='SDSL')
+    sbl = Affiliate.objects.create(name='SBL')
+    departments = [
+        Department.objects.create(name=name, affiliate=merban) for name in ('Finance', 'Operations')
+    ]
+
+    hr = user('qbhr', 'hr', merban)
+    ceos = {aff.name: user(f'qbceo{aff.id}', 'ceo', aff) for aff in (merban, sdsl, sbl)}
+    hods = [user(f'qbhod{dept.id}', 'manager', merban, dept) for dept in departments]
+    CustomUser.objects.bulk_create(users)
+    for dept, hod in zip(departments, hods):
+        dept.hod = hod
+        dept.save(update_fields=['hod'])
+
+    users = []
+    for dept, hod in zip(departments, hods):
+        for i in range(staff_per_group):
+            user(f'qbstaff{dept.id}x{i}', 'junior_staff', merban, dept, manager=hod)
+    for aff in (sdsl, sbl):
+        for i in range(staff_per_group):
+            user(f'qbstaff{aff.id}y{i}', 'senior_staff', aff)
+    staff = CustomUser.objects.bulk_create(users)
+
+    annual = LeaveType.objects.create(name='Annual')
+    sick = LeaveType.objects.create(name='Sick')
+    LeaveBalance.objects.bulk_create([
+        LeaveBalance(employee=emp, leave_type=lt, year=year, entitled_days=30)
+        for emp in staff + hods for lt in (annual, sick)
+    ])
+
+    now = timezone.now()
+    start = date(year, 1, 5)
+    requests = []
+    for n, emp in enumerate(staff + hods):
+        ceo = ceos[emp.affiliate.name]
+        ceo_first = emp.affiliate.name in ('SDSL', 'SBL')
+        stages = ['pending', 'ceo_approved', 'approved'] if ceo_first else [
+            'pending', 'manager_approved', 'hr_approved', 'approved',
+        ]
+        for k, stage in enumerate(stages):
+            begin = start + timedelta(days=14 * k + n % 7)
+            lr = LeaveRequest(
+                employee=emp, leave_type=annual if k % 2 == 0 else sick, start_date=begin,
+                end_date=begin + timedelta(days=2), total_days=3, status=stage, reason='Seeded',
+            )
+            if stage in ('manager_approved', 'hr_approved', 'approved') and not ceo_first:
+                lr.manager_approved_by, lr.manager_approval_date = emp.manager or hr, now
+            if stage in ('hr_approved', 'approved'):
+                lr.hr_approved_by, lr.hr_approval_date = hr, now
+            if stage in ('ceo_approved', 'approved') and (ceo_first or stage == 'approved'):
+                lr.ceo_approved_by, lr.ceo_approval_date = ceo, now
+            if stage == 'approved':
+                lr.approved_by, lr.approval_date = (hr if ceo_first else ceo), now
+            requests.append(lr)
+    requests = LeaveRequest.objects.bulk_create(requests)
+
+    approved = [lr for lr in requests if lr.status == 'approved']
+    interrupts = LeaveInterruptRequest.objects.bulk_create([
+        LeaveInterruptRequest(
+            leave_request=lr, type='staff_return', status='pending_manager', initiated_by=lr.employee,
+            requested_resume_date=lr.start_date + timedelta(days=1), reason='Seeded early return',
+        )
+        for lr in approved
+    ])
+    LeaveInterruptLog.objects.bulk_create([
+        LeaveInterruptLog(
+            leave_request=ir.leave_request, interrupt_request=ir, actor=ir.initiated_by, event='requested',
+        )
+        for ir in interrupts
+    ])
+
+    return SimpleNamespace(
+        affiliates={'MERBAN': merban, 'SDSL': sdsl, 'SBL': sbl},
+        departments=departments, hr=hr, ceos=ceos, hods=hods, staff=staff,
+        leave_types=[annual, sick], requests=requests,
+    )
+
+
+class QueryBudgetTestMixin:
+    """TestCase mixin asserting endpoints stay within their declared query budget."""
+
+    def assertQueryBudget(self, client, path, method='get', data=None, budget=None, expected_status=200, **extra):
+        with CaptureQueriesContext(connection) as ctx:
+            response = getattr(client, method)(path, data, **extra)
+        self.assertEqual(response.status_code, expected_status, getattr(response, 'content', b'')[:500])
+
+        stats = getattr(response, 'query_stats', None)
+        self.assertIsNotNone(stats, 'QueryBudgetMiddleware is not installed')
+        budget = stats['budget'] if budget is None else budget
+        self.assertIsNotNone(budget, f'{method.upper()} {path} declares no @query_budget')
+        if stats['queries'] > budget:
+            sql = '\n'.join(f"{i}. {q['sql']}" for i, q in enumerate(ctx.captured_queries, start=1))
+            self.fail(f"{method.upper()} {path} ran {stats['queries']} queries, budget is {budget}:\n{sql}")
+        return response
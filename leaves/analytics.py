@@ -0,0 +1,251 @@
+"""
+HR absence analytics (AbsenceAnalyticsAPIView).
+
+HR used to build absence reports in spreadsheets from the CSV export. This module
+computes them in the database's place with pandas/NumPy: one narrow query each
+loads the approved requests overlapping the year, the users and the year's
+entitlements as columns (names come from leave_management.reference_data, so the
+slices need no joins), and every metric is an array operation over them.
+
+Metrics, per department, affiliate, grade and month:
+
+- absence_rate: working days absent / (headcount x working days elapsed). Each
+  request's taken days (total_days less days credited back by interrupts) are
+  spread over its working days, so requests crossing a month or year boundary
+  count where they fall.
+- avg_duration: mean taken days per spell (request).
+- bradford_mean / bradford_max: Bradford factor S^2 x D per employee over
+  unplanned leave types (names containing BRADFORD_TYPE_KEYWORDS); the mean is
+  over the group's headcount.
+- utilization: days taken on leave types the employee holds a balance for, over
+  the days entitled.
+- approval_hours_p50 / p90: submission to final approval.
+
+Results are cached under the versions of every resource they read
+(leave_management.conditional), so any write that changes an input also retires
+the cached report. When build_analytics_snapshot keeps a fresh columnar snapshot
+(leaves.snapshots), the frames are sliced from its memory-mapped files instead of
+queried; the snapshot generation is then part of the cache key.
+"""
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+from django.utils import timezone
+
+from leave_management import reference_data
+from leave_management.caching import get_versions, versioned_cache
+from leave_management.conditional import ALL_RESOURCES, resource_version_name
+from users.models import CustomUser
+from .models import LeaveBalance, LeaveRequest
+from .snapshots import current_snapshot
+
+
+# Resources whose versions key the cache (and the endpoint's ETag)
+ANALYTICS_RESOURCES = (
+    'leave-requests', 'leave-balances', 'entitlements', 'users', 'departments', 'affiliates',
+    'employment-grades', 'leave-types',
+)
+ABSENCE_ANALYTICS_TTL = 60 * 10
+DIMENSIONS = ('department', 'affiliate', 'grade', 'month')
+# Leave types counted as unplanned absence for the Bradford factor
+BRADFORD_TYPE_KEYWORDS = ('sick',)
+UNASSIGNED = 'Unassigned'
+
+REQUEST_COLUMNS = [
+    'employee_id', 'leave_type_id', 'start_date', 'end_date', 'total_days', 'credited_days',
+    'created_at', 'approval_date',
+]
+USER_COLUMNS = ['employee_id', 'department_id', 'affiliate_id', 'grade_id', 'is_active']
+
+
+def _name(table, pk):
+    obj = table.get(pk) if pk is not None and not pd.isna(pk) else None
+    return obj.name if obj is not None else UNASSIGNED
+
+
+def _days(values) -> np.ndarray:
+    return pd.to_datetime(pd.Series(values)).to_numpy().astype('datetime64[D]')
+
+
+def load_users(users=None) -> pd.DataFrame:
+    """Users with dimension names, from USER_COLUMNS rows (queried when not given)."""
+    if users is None:
+        rows = CustomUser.objects.values_list('id', 'department_id', 'affiliate_id', 'grade_id', 'is_active')
+        users = pd.DataFrame.from_records(list(rows), columns=USER_COLUMNS)
+    departments = {d.pk: d for d in reference_data.departments.all()}
+    # Prefer the user's own affiliate, then the department's (ApprovalRoutingService order)
+    dept_affiliate = users['department_id'].map(lambda pk: getattr(departments.get(pk), 'affiliate_id', None))
+    affiliate_id = users['affiliate_id'].astype('object').where(users['affiliate_id'].notna(), dept_affiliate)
+    users['department'] = users['department_id'].map(lambda pk: _name(reference_data.departments, pk))
+    users['affiliate'] = affiliate_id.map(lambda pk: _name(reference_data.affiliates, pk))
+    users['grade'] = users['grade_id'].map(lambda pk: _name(reference_data.employment_grades, pk))
+    return users[['employee_id', 'department', 'affiliate', 'grade', 'is_active']]
+
+
+def load_requests(year) -> pd.DataFrame:
+    """Approved requests overlapping `year`, as columns (one query)."""
+    rows = LeaveRequest.objects.filter(
+        status='approved', start_date__lte=date(year, 12, 31), end_date__gte=date(year, 1, 1),
+    ).values_list(
+        'employee_id', 'leave_type_id', 'start_date', 'end_date', 'total_days', 'interruption_credited_days',
+        'created_at', 'approval_date',
+    )
+    return pd.DataFrame.from_records(list(rows), columns=REQUEST_COLUMNS)
+
+
+def load_entitlements(year) -> pd.DataFrame:
+    rows = LeaveBalance.objects.filter(year=year).values_list('employee_id', 'leave_type_id', 'entitled_days')
+    return pd.DataFrame.from_records(list(rows), columns=['employee_id', 'leave_type_id', 'entitled_days'])
+
+
+def month_bounds(year):
+    starts = np.arange(f'{year}-01', f'{year + 1}-01', dtype='datetime64[M]')
+    return starts.astype('datetime64[D]'), (starts + 1).astype('datetime64[D]')
+
+
+def monthly_taken_days(requests: pd.DataFrame, year, as_of) -> np.ndarray:
+    """(requests x 12) matrix of taken working days per month of `year`, up to `as_of`."""
+    if requests.empty:
+        return np.zeros((0, 12))
+    starts, ends = _days(requests['start_date']), _days(requests['end_date']) + 1
+    month_starts, month_ends = month_bounds(year)
+    month_ends = np.minimum(month_ends, np.datetime64(as_of, 'D') + 1)
+
+    lo = np.maximum(starts[:, None], month_starts[None, :])
+    hi = np.minimum(ends[:, None], month_ends[None, :])
+    overlap = np.where(hi > lo, np.busday_count(lo, np.maximum(hi, lo)), 0)
+
+    span = np.busday_count(starts, ends)
+    total = requests['total_days'].fillna(pd.Series(span, index=requests.index)).to_numpy(dtype=float)
+    taken = np.clip(total - requests['credited_days'].to_numpy(dtype=float), 0, None)
+    share = np.divide(taken, span, out=np.zeros(len(span)), where=span > 0)
+    return overlap * share[:, None]
+
+
+def _percentile(values, pct):
+    return round(float(np.percentile(values, pct)), 1) if len(values) else None
+
+
+def _ratio(numerator, denominator, digits=4):
+    return round(float(numerator) / float(denominator), digits) if denominator else None
+
+
+def compute_absence_analytics(year, as_of=None, users=None, requests=None, entitlements=None) -> dict:
+    """Absence metrics for `year` from column frames (loaded when not given)."""
+    as_of = min(as_of or timezone.localdate(), date(year, 12, 31))
+    # A year that has not started yet has no elapsed working days
+    as_of = max(as_of, date(year, 1, 1) - timedelta(days=1))
+    users = load_users() if users is None else users
+    requests = load_requests(year) if requests is None else requests
+    entitlements = load_entitlements(year) if entitlements is None else entitlements
+
+    monthly = monthly_taken_days(requests, year, as_of)
+    requests = requests.assign(days=monthly.sum(axis=1) if len(requests) else 0.0)
+    requests = requests.merge(users, on='employee_id', how='left').fillna(
+        {'department': UNASSIGNED, 'affiliate': UNASSIGNED, 'grade': UNASSIGNED}
+    )
+    requests['month'] = _days(requests['start_date']).astype('datetime64[M]').astype(str) if len(requests) else ''
+    approved_at = pd.to_datetime(requests['approval_date'], utc=True)
+    requests['approval_hours'] = (approved_at - pd.to_datetime(requests['created_at'], utc=True)).dt.total_seconds() / 3600
+
+    # Bradford factor per employee over unplanned leave
+    unplanned = {
+        lt.pk for lt in reference_data.leave_types.all()
+        if any(word in lt.name.lower() for word in BRADFORD_TYPE_KEYWORDS)
+    }
+    sick = requests[requests['leave_type_id'].isin(unplanned) & (requests['days'] > 0)]
+    per_employee = sick.groupby('employee_id')['days'].agg(['count', 'sum'])
+    bradford = (per_employee['count'] ** 2 * per_employee['sum']).rename('bradford')
+
+    active = users[users['is_active']].merge(bradford, left_on='employee_id', right_index=True, how='left')
+    active['bradford'] = active['bradford'].fillna(0.0)
+
+    # Utilization: days taken against the balances they draw on
+    entitled = entitlements.merge(users[['employee_id', 'department', 'affiliate', 'grade']], on='employee_id')
+    drawn = requests.merge(entitlements[['employee_id', 'leave_type_id']], on=['employee_id', 'leave_type_id'])
+
+    working_days = int(np.busday_count(np.datetime64(date(year, 1, 1)), np.datetime64(as_of, 'D') + 1))
+    result = {'year': year, 'as_of': as_of.isoformat(), 'working_days': working_days}
+    for dimension in ('department', 'affiliate', 'grade'):
+        headcount = active.groupby(dimension).size()
+        grouped = requests.groupby(dimension)
+        frame = pd.DataFrame({
+            'headcount': headcount,
+            'absence_days': grouped['days'].sum(),
+            'spells': grouped.size(),
+            'avg_duration': grouped['days'].mean(),
+            'bradford_sum': active.groupby(dimension)['bradford'].sum(),
+            'bradford_max': active.groupby(dimension)['bradford'].max(),
+            'entitled_days': entitled.groupby(dimension)['entitled_days'].sum(),
+            'drawn_days': drawn.groupby(dimension)['days'].sum(),
+        }).astype(float).fillna({'headcount': 0, 'absence_days': 0.0, 'spells': 0, 'bradford_sum': 0.0, 'bradford_max': 0.0,
+                   'entitled_days': 0, 'drawn_days': 0.0})
+        lead = grouped['approval_hours']
+        result[f'by_{dimension}'] = [
+            {
+                'key': key,
+                'headcount': int(row.headcount),
+                'absence_days': round(float(row.absence_days), 2),
+                'absence_rate': _ratio(row.absence_days, row.headcount * working_days),
+                'spells': int(row.spells),
+                'avg_duration': round(float(row.avg_duration), 2) if not pd.isna(row.avg_duration) else None,
+                'bradford_mean': _ratio(row.bradford_sum, row.headcount, 1),
+                'bradford_max': round(float(row.bradford_max), 1),
+                'entitled_days': int(row.entitled_days),
+                'utilization': _ratio(row.drawn_days, row.entitled_days),
+                'approval_hours_p50': _percentile(lead.get_group(key).dropna(), 50) if key in lead.groups else None,
+                'approval_hours_p90': _percentile(lead.get_group(key).dropna(), 90) if key in lead.groups else None,
+            }
+            for key, row in frame.sort_index().iterrows()
+        ]
+
+    month_starts, month_ends = month_bounds(year)
+    elapsed_ends = np.maximum(np.minimum(month_ends, np.datetime64(as_of, 'D') + 1), month_starts)
+    month_working = np.busday_count(month_starts, elapsed_ends)
+    headcount = int(users['is_active'].sum())
+    month_days = monthly.sum(axis=0) if len(monthly) else np.zeros(12)
+    by_month = requests.groupby('month')
+    result['by_month'] = []
+    for i, month in enumerate(month_starts.astype('datetime64[M]').astype(str).tolist()):
+        spells = by_month.get_group(month) if month in by_month.groups else requests.iloc[0:0]
+        result['by_month'].append({
+            'key': month,
+            'headcount': headcount,
+            'working_days': int(month_working[i]),
+            'absence_days': round(float(month_days[i]), 2),
+            'absence_rate': _ratio(month_days[i], headcount * int(month_working[i])),
+            'spells': len(spells),
+            'avg_duration': round(float(spells['days'].mean()), 2) if len(spells) else None,
+            'approval_hours_p50': _percentile(spells['approval_hours'].dropna(), 50),
+            'approval_hours_p90': _percentile(spells['approval_hours'].dropna(), 90),
+        })
+    return result
+
+
+def absence_analytics(year=None) -> dict:
+    """Cached compute_absence_analytics for `year` (default: the current year).
+
+    Reads the columnar snapshot (leaves.snapshots) when a fresh one exists, the
+    database otherwise; `source` and `snapshot_at` say which.
+    """
+    today = timezone.localdate()
+    year = year or today.year
+    snapshot = current_snapshot()
+    generation = snapshot.generation if snapshot else 'db'
+    names = [resource_version_name(r) for r in (ALL_RESOURCES, *ANALYTICS_RESOURCES)]
+    versions = ':'.join(str(v) for v in get_versions(*names).values())
+    key = f'absence-analytics:{year}:{today.isoformat()}:{generation}:{versions}'
+    data = versioned_cache().get(key)
+    if data is None:
+        if snapshot:
+            data = compute_absence_analytics(
+                year, as_of=today, users=load_users(snapshot.users_frame()),
+                requests=snapshot.requests_frame(year), entitlements=snapshot.entitlements_frame(year),
+            )
+            data.update(source='snapshot', snapshot_at=snapshot.built_at.isoformat())
+        else:
+            data = compute_absence_analytics(year, as_of=today)
+            data.update(source='database', snapshot_at=None)
+        versioned_cache().set(key, data, ABSENCE_ANALYTICS_TTL)
+    return data
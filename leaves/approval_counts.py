@@ -0,0 +1,134 @@
+"""
+Approver visibility and the approval badge counts (ManagerLeaveViewSet).
+
+`approver_queryset` is the set of requests an approver may see; the manager
+viewset lists from it and the counts below filter it. `approval_counts` returns
+the figures behind /leaves/manager/approval_counts/, and `aapproval_counts` the
+same figures for the async endpoint (leaves.async_views), which runs the
+independent counts of a role concurrently.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.db.models import Q
+
+from .models import LeaveInterruptRequest, LeaveRequest
+from .serializers import with_timeline_relations
+
+# Affiliates whose requests skip the manager stage (CEO-first flow)
+CEO_FIRST_AFFILIATES = ['SDSL', 'SBL']
+
+
+def approver_queryset(user):
+    """Return leave requests available to `user` as an approver.
+
+    Rules:
+    - manager: only requests from their direct reports (employee__manager = self.user)
+    - hr: all requests that are at or beyond Manager stage
+    - ceo: all requests that are at or beyond HR stage
+    - admin/superuser: all requests
+    - others: none
+    """
+    # Approver queues serialize timelines; load approvers and interrupt logs up front
+    qs = with_timeline_relations(LeaveRequest.objects.select_related(
+        'employee',
+        'employee__affiliate',
+        'employee__department',
+        'employee__department__affiliate'
+    ))
+    role = getattr(user, 'role', None)
+
+    # Superuser/admin: full access
+    if getattr(user, 'is_superuser', False) or role == 'admin':
+        return qs
+
+    if role == 'manager':
+        # Direct reports or same department where user is HOD/Manager, but EXCLUDE own requests
+        return qs.filter(Q(employee__manager=user) | Q(employee__department__hod=user)).exclude(employee=user)
+
+    if role == 'hr':
+        # Items that have passed Manager stage or are pending (to allow visibility)
+        # Include 'ceo_approved' for SDSL/SBL CEO-first flow where HR gives final approval
+        return qs.filter(status__in=['pending', 'manager_approved', 'hr_approved', 'ceo_approved', 'approved', 'rejected'])
+
+    if role == 'ceo':
+        # Items that require or have passed CEO stage.
+        # Merban: hr_approved; SDSL/SBL: pending. Include approved/rejected for record views.
+        return qs.filter(status__in=['pending', 'hr_approved', 'approved', 'rejected'])
+
+    # Everyone else: no access
+    return qs.none()
+
+
+def _ceo_first():
+    return (Q(employee__department__affiliate__name__in=CEO_FIRST_AFFILIATES)
+            | Q(employee__affiliate__name__in=CEO_FIRST_AFFILIATES))
+
+
+def count_querysets(user) -> dict:
+    """{count key: [querysets]} whose counts add up to each badge, for every role but CEO."""
+    # Counting ignores the timeline prefetches
+    visible = approver_queryset(user).prefetch_related(None)
+    role = getattr(user, 'role', None)
+    hr = [
+        visible.filter(status='manager_approved').exclude(_ceo_first()),
+        visible.filter(status='ceo_approved'),
+        visible.filter(status='pending', employee__role='ceo'),
+        LeaveInterruptRequest.objects.filter(type='staff_return', status='pending_hr'),
+    ]
+    manager = [visible.filter(status='pending').exclude(_ceo_first() | Q(employee__role='ceo'))]
+    if role == 'manager':
+        # include early return interrupts awaiting manager
+        return {'manager_approvals': manager + [
+            LeaveInterruptRequest.objects.filter(type='staff_return', status='pending_manager'),
+        ]}
+    if role == 'hr':
+        return {'hr_approvals': hr}
+    if role == 'admin':
+        return {
+            'manager_approvals': manager,
+            'hr_approvals': hr,
+            'ceo_approvals': [visible.filter(status='hr_approved')],
+        }
+    return {}
+
+
+def ceo_approval_count(user) -> int:
+    """Requests at pending/hr_approved that the CEO's workflow handler lets `user` approve."""
+    from .services import ApprovalRoutingService, ApprovalWorkflowService
+
+    candidates = approver_queryset(user).prefetch_related(None).filter(status__in=['pending', 'hr_approved'])
+    with ApprovalRoutingService.cached_ceo_lookups():
+        return sum(
+            1 for req in candidates
+            if ApprovalWorkflowService.get_handler(req).can_approve(user, req.status)
+        )
+
+
+def _totals(counts: dict) -> dict:
+    result = {'manager_approvals': 0, 'hr_approvals': 0, 'ceo_approvals': 0}
+    result.update(counts)
+    result['total'] = result['manager_approvals'] + result['hr_approvals'] + result['ceo_approvals']
+    return result
+
+
+def approval_counts(user) -> dict:
+    if getattr(user, 'role', None) == 'ceo':
+        return _totals({'ceo_approvals': ceo_approval_count(user)})
+    return _totals({
+        key: sum(qs.count() for qs in querysets)
+        for key, querysets in count_querysets(user).items()
+    })
+
+
+async def aapproval_counts(user) -> dict:
+    if getattr(user, 'role', None) == 'ceo':
+        # The handlers look up approvers synchronously
+        return _totals({'ceo_approvals': await sync_to_async(ceo_approval_count)(user)})
+    groups = count_querysets(user)
+    results = await asyncio.gather(*(qs.acount() for querysets in groups.values() for qs in querysets))
+    counts, position = {}, 0
+    for key, querysets in groups.items():
+        counts[key] = sum(results[position:position + len(querysets)])
+        position += len(querysets)
+    return _totals(counts)
@@ -1,15 +1,60 @@
 """
 API endpoint to show approval workflow dashboard
+
+Stage counts come from one GROUP BY status query, cached org-wide for a short
+time; the caller's queue is paginated (?page=, ?page_size=) and serialized with
+the lightweight LeaveRequestQueueSerializer, so the cost of the dashboard does
+not grow with the size of the backlog.
 """
+from django.core.cache import cache
+from django.db.models import Count
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from django.contrib.auth import get_user_model
+
+from leave_management.db_router import read_replica
+from leave_management.middleware import query_budget
 from leaves.models import LeaveRequest
-from leaves.serializers import LeaveRequestSerializer
+from leaves.serializers import LeaveRequestQueueSerializer, with_queue_relations
+
+
+STAGE_COUNTS_CACHE_KEY = 'approval-dashboard:stage-counts'
+STAGE_COUNTS_TTL = 30
+QUEUE_PAGE_SIZE = 25
+QUEUE_MAX_PAGE_SIZE = 100
+RECENT_ACTIVITY_LIMIT = 10
+
+# Statuses waiting on each approver role
+ROLE_QUEUE_STATUSES = {
+    'manager': ['pending'],
+    'hr': ['manager_approved'],
+    'ceo': ['hr_approved'],
+    'admin': ['pending', 'manager_approved', 'hr_approved'],
+}
+
+
+def stage_counts():
+    """{status: count} for all leave requests, cached for STAGE_COUNTS_TTL seconds."""
+    counts = cache.get(STAGE_COUNTS_CACHE_KEY)
+    if counts is None:
+        counts = dict(
+            LeaveRequest.objects.order_by().values('status').annotate(n=Count('id')).values_list('status', 'n')
+        )
+        cache.set(STAGE_COUNTS_CACHE_KEY, counts, STAGE_COUNTS_TTL)
+    return counts
 
-User = get_user_model()
 
+def _int_param(request, name, default, maximum=None):
+    try:
+        value = int(request.query_params.get(name, default))
+    except (TypeError, ValueError):
+        value = default
+    value = max(1, value)
+    return min(value, maximum) if maximum else value
+
+
+@read_replica
+@query_budget(3)
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def approval_dashboard(request):
@@ -18,35 +63,26 @@ def approval_dashboard(request):
     """
     user = request.user
     user_role = getattr(user, 'role', None)
-    
-    # Get counts for each approval stage
-    pending_manager = LeaveRequest.objects.filter(status='pending').count()
-    pending_hr = LeaveRequest.objects.filter(status='manager_approved').count()
-    pending_ceo = LeaveRequest.objects.filter(status='hr_approved').count()
-    approved = LeaveRequest.objects.filter(status='approved').count()
-    rejected = LeaveRequest.objects.filter(status='rejected').count()
-    
-    # Get requests specific to user's role
+
+    counts = stage_counts()
+
+    # Paginated queue for the user's role; its size comes from the stage counts
+    queue_statuses = ROLE_QUEUE_STATUSES.get(user_role, [])
+    page_size = _int_param(request, 'page_size', QUEUE_PAGE_SIZE, QUEUE_MAX_PAGE_SIZE)
+    page = _int_param(request, 'page', 1)
+    queue_count = sum(counts.get(s, 0) for s in queue_statuses)
     my_pending = []
-    if user_role == 'manager':
-        my_pending_qs = LeaveRequest.objects.filter(status='pending')
-        my_pending = LeaveRequestSerializer(my_pending_qs, many=True).data
-    elif user_role == 'hr':
-        my_pending_qs = LeaveRequest.objects.filter(status='manager_approved')
-        my_pending = LeaveRequestSerializer(my_pending_qs, many=True).data
-    elif user_role == 'ceo':
-        my_pending_qs = LeaveRequest.objects.filter(status='hr_approved')
-        my_pending = LeaveRequestSerializer(my_pending_qs, many=True).data
-    elif user_role == 'admin':
-        my_pending_qs = LeaveRequest.objects.filter(
-            status__in=['pending', 'manager_approved', 'hr_approved']
-        )
-        my_pending = LeaveRequestSerializer(my_pending_qs, many=True).data
-    
+    if queue_statuses:
+        offset = (page - 1) * page_size
+        queue = with_queue_relations(
+            LeaveRequest.objects.filter(status__in=queue_statuses).order_by('-created_at', '-id')
+        )[offset:offset + page_size]
+        my_pending = LeaveRequestQueueSerializer(queue, many=True).data
+
     # Get recent activity (last 10 requests)
-    recent_activity = LeaveRequest.objects.all()[:10]
-    recent_activity_data = LeaveRequestSerializer(recent_activity, many=True).data
-    
+    recent_activity = with_queue_relations(LeaveRequest.objects.order_by('-created_at', '-id'))[:RECENT_ACTIVITY_LIMIT]
+    recent_activity_data = LeaveRequestQueueSerializer(recent_activity, many=True).data
+
     return Response({
         'user': {
             'username': user.username,
@@ -54,15 +90,19 @@ def approval_dashboard(request):
             'full_name': user.get_full_name(),
         },
         'approval_stages': {
-            'pending_manager_approval': pending_manager,
-            'pending_hr_approval': pending_hr,
-            'pending_ceo_approval': pending_ceo,
-            'fully_approved': approved,
-            'rejected': rejected
+            'pending_manager_approval': counts.get('pending', 0),
+            'pending_hr_approval': counts.get('manager_approved', 0),
+            'pending_ceo_approval': counts.get('hr_approved', 0),
+            'fully_approved': counts.get('approved', 0),
+            'rejected': counts.get('rejected', 0),
         },
         'my_pending_approvals': {
-            'count': len(my_pending),
-            'requests': my_pending
+            'count': queue_count,
+            'page': page,
+            'page_size': page_size,
+            'next': page + 1 if page * page_size < queue_count else None,
+            'previous': page - 1 if page > 1 else None,
+            'requests': my_pending,
         },
         'recent_activity': recent_activity_data,
         'workflow_info': {
@@ -78,4 +118,4 @@ def approval_dashboard(request):
                 'admin': 'You can approve at any stage'
             }.get(user_role, 'You cannot approve requests')
         }
-    })
\ No newline at end of file
+    })
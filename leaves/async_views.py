@@ -0,0 +1,43 @@
+"""
+Async read views for ASGI deployments (see leave_management.async_api).
+
+Each mirrors a DRF action and returns the same payload; leaves/urls.py routes the
+DRF paths here when ASYNC_READ_VIEWS is on.
+"""
+import logging
+
+from leave_management.async_api import async_api_view
+from leave_management.middleware import query_budget
+
+from .approval_counts import aapproval_counts
+from .balances import LeaveBalanceService
+from .dashboard import aemployee_dashboard
+
+logger = logging.getLogger('leaves')
+
+APPROVAL_QUEUE_RESOURCES = ('leave-requests', 'leave-types', 'users', 'departments', 'affiliates')
+
+
+@query_budget(3)
+@async_api_view()
+async def dashboard(request):
+    """LeaveRequestViewSet.dashboard"""
+    return await aemployee_dashboard(request.user)
+
+
+@async_api_view(conditional_resources=('leave-balances', 'leave-balances:{user}', 'leave-types'))
+async def current_year_full(request):
+    """LeaveBalanceViewSet.current_year_full"""
+    return await LeaveBalanceService.acurrent_year_benefits(request.user)
+
+
+@async_api_view(conditional_resources=APPROVAL_QUEUE_RESOURCES)
+async def approval_counts(request):
+    """ManagerLeaveViewSet.approval_counts"""
+    user = request.user
+    try:
+        return await aapproval_counts(user)
+    except Exception as e:
+        logger.error(f'Error computing manager approval_counts for user={getattr(user, "username", None)}: {str(e)}', exc_info=True)
+        empty = {'manager_approvals': 0, 'hr_approvals': 0, 'ceo_approvals': 0, 'total': 0}
+        return {**empty, 'error': 'unable to compute counts'}
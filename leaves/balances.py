@@ -0,0 +1,326 @@
+"""
+Bulk write paths for LeaveBalance and LeaveGradeEntitlement rows.
+
+Entitlement endpoints used to resolve each leave type with its own query and then
+`get_or_create` + `save()` every balance individually. The helpers here validate
+leave types in a single query and upsert rows in chunks with
+`bulk_create(update_conflicts=True)` (INSERT ... ON CONFLICT / ON DUPLICATE KEY UPDATE).
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, List
+
+from asgiref.sync import sync_to_async
+from django.db import connections, router, transaction
+from django.db.models import Case, Count, F, IntegerField, Q, Sum, Value, When
+from django.db.models.functions import ExtractYear
+from django.utils import timezone
+
+from leave_management import reference_data
+from leave_management.caching import bump_version, get_version, versioned_cache
+from leave_management.conditional import bump_resources
+from .models import LeaveType, LeaveRequest, LeaveBalance, LeaveGradeEntitlement
+
+
+logger = logging.getLogger('leaves')
+
+# Cache version covering anything derived from entitled_days (role overview, etc.)
+ENTITLEMENTS_VERSION = 'entitlements'
+ROLE_OVERVIEW_TTL = 60 * 10
+
+# Pre-rename role codes still present on some accounts
+LEGACY_ROLE_MAP = {
+    'employee': 'junior_staff',
+    'staff': 'junior_staff',
+    'hod': 'manager',
+}
+
+
+def _chunks(seq: List, size: int):
+    for start in range(0, len(seq), size):
+        yield seq[start:start + size]
+
+
+class LeaveBalanceService:
+    """Set-based entitlement writes shared by the role, employee, grade and leave-type endpoints."""
+
+    BATCH_SIZE = 500
+
+    @classmethod
+    def active_leave_types(cls, leave_type_ids: Iterable[int]) -> Dict[int, LeaveType]:
+        """Return {id: LeaveType} for the active leave types among `leave_type_ids` (no query)."""
+        ids = {int(i) for i in leave_type_ids}
+        if not ids:
+            return {}
+        return {lt.id: lt for lt in reference_data.leave_types.active() if lt.id in ids}
+
+    @classmethod
+    def _upsert_kwargs(cls, model, unique_fields: List[str], update_fields: List[str]) -> Dict:
+        """bulk_create options for an upsert on the backend the model is written to.
+
+        MySQL/MariaDB do not accept a conflict target (ON DUPLICATE KEY UPDATE applies to any
+        unique key), so `unique_fields` is only passed where the backend supports it.
+        """
+        features = connections[router.db_for_write(model)].features
+        kwargs = {'update_conflicts': True, 'update_fields': update_fields}
+        if features.supports_update_conflicts_with_target:
+            kwargs['unique_fields'] = unique_fields
+        return kwargs
+
+    @classmethod
+    def upsert_entitlements(cls, employee_ids: Iterable[int], entitlements: Dict[int, int], year=None) -> Dict[str, int]:
+        """Set `entitled_days` per leave type for every employee in `employee_ids`.
+
+        Args:
+            employee_ids: ids of the users to update.
+            entitlements: {leave_type_id: entitled_days}; leave types must already be validated.
+            year: balance year; defaults to the current year.
+
+        Existing rows keep their used/pending figures; only rows whose entitlement actually
+        changes are written. Returns {'created': n, 'updated': n}.
+        """
+        if year is None:
+            year = timezone.now().year
+        employee_ids = sorted({int(e) for e in employee_ids})
+        entitlements = {int(k): int(v) for k, v in entitlements.items()}
+        result = {'created': 0, 'updated': 0}
+        if not employee_ids or not entitlements:
+            return result
+
+        upsert = cls._upsert_kwargs(LeaveBalance, ['employee', 'leave_type', 'year'], ['entitled_days', 'updated_at'])
+        lt_ids = list(entitlements.keys())
+        # Employees per chunk sized so one chunk yields at most ~BATCH_SIZE balance rows
+        per_chunk = max(1, cls.BATCH_SIZE // len(lt_ids))
+
+        for emp_chunk in _chunks(employee_ids, per_chunk):
+            existing = {
+                (emp_id, lt_id): days
+                for emp_id, lt_id, days in LeaveBalance.objects.filter(
+                    employee_id__in=emp_chunk, leave_type_id__in=lt_ids, year=year
+                ).values_list('employee_id', 'leave_type_id', 'entitled_days')
+            }
+            rows = []
+            for emp_id in emp_chunk:
+                for lt_id, days in entitlements.items():
+                    current = existing.get((emp_id, lt_id))
+                    if current is None:
+                        result['created'] += 1
+                    elif current != days:
+                        result['updated'] += 1
+                    else:
+                        continue
+                    rows.append(LeaveBalance(
+                        employee_id=emp_id,
+                        leave_type_id=lt_id,
+                        year=year,
+                        entitled_days=days,
+                        used_days=0,
+                        pending_days=0,
+                    ))
+            if rows:
+                with transaction.atomic():
+                    LeaveBalance.objects.bulk_create(rows, batch_size=cls.BATCH_SIZE, **upsert)
+
+        if result['created'] or result['updated']:
+            # bulk_create does not send post_save, so invalidate explicitly
+            bump_version(ENTITLEMENTS_VERSION)
+            bump_resources('entitlements', 'leave-balances')
+        logger.info(
+            'Entitlement upsert: employees=%s leave_types=%s year=%s created=%s updated=%s',
+            len(employee_ids), len(lt_ids), year, result['created'], result['updated'],
+        )
+        return result
+
+    @classmethod
+    def upsert_grade_entitlements(cls, grade, entitlements: Dict[int, object]) -> Dict[str, int]:
+        """Set LeaveGradeEntitlement rows for `grade` from {leave_type_id: Decimal days}."""
+        result = {'created': 0, 'updated': 0}
+        if not entitlements:
+            return result
+        existing = dict(
+            LeaveGradeEntitlement.objects.filter(grade=grade, leave_type_id__in=list(entitlements.keys()))
+            .values_list('leave_type_id', 'entitled_days')
+        )
+        rows = []
+        for lt_id, days in entitlements.items():
+            current = existing.get(lt_id)
+            if current is None:
+                result['created'] += 1
+            elif current != days:
+                result['updated'] += 1
+            else:
+                continue
+            rows.append(LeaveGradeEntitlement(grade=grade, leave_type_id=lt_id, entitled_days=days))
+        if rows:
+            upsert = cls._upsert_kwargs(LeaveGradeEntitlement, ['grade', 'leave_type'], ['entitled_days', 'updated_at'])
+            with transaction.atomic():
+                LeaveGradeEntitlement.objects.bulk_create(rows, batch_size=cls.BATCH_SIZE, **upsert)
+            bump_resources('grade-entitlements')
+        return result
+
+
+    @classmethod
+    def rebuild_usage(cls, keys) -> Dict[str, int]:
+        """Recompute used/pending days for the given (employee_id, leave_type_id, year) keys.
+
+        Set-based equivalent of LeaveBalance.update_balance(): one grouped aggregate over
+        LeaveRequest per chunk, then a bulk upsert. Missing balance rows are created with
+        zero entitlement. Returns {'created': n, 'updated': n}.
+        """
+        keys = sorted(set(keys))
+        result = {'created': 0, 'updated': 0}
+        if not keys:
+            return result
+        pending_statuses = ['pending', 'manager_approved', 'hr_approved', 'ceo_approved']
+        # Approved days net of recall credits, floored at zero per request
+        net_days = Case(
+            When(total_days__gt=F('interruption_credited_days'),
+                 then=F('total_days') - F('interruption_credited_days')),
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+        upsert = cls._upsert_kwargs(
+            LeaveBalance, ['employee', 'leave_type', 'year'], ['used_days', 'pending_days', 'updated_at']
+        )
+
+        for chunk in _chunks(keys, cls.BATCH_SIZE):
+            wanted = set(chunk)
+            employee_ids = {k[0] for k in chunk}
+            leave_type_ids = {k[1] for k in chunk}
+            years = {k[2] for k in chunk}
+            usage = {key: (0, 0) for key in chunk}
+            rows = (
+                LeaveRequest.objects.filter(
+                    employee_id__in=employee_ids, leave_type_id__in=leave_type_ids, start_date__year__in=years
+                )
+                .annotate(year=ExtractYear('start_date'))
+                .values('employee_id', 'leave_type_id', 'year')
+                .annotate(
+                    used=Sum(net_days, filter=Q(status='approved')),
+                    pending=Sum('total_days', filter=Q(status__in=pending_statuses)),
+                )
+                .order_by()
+            )
+            for row in rows:
+                key = (row['employee_id'], row['leave_type_id'], row['year'])
+                if key in wanted:
+                    usage[key] = (row['used'] or 0, row['pending'] or 0)
+
+            existing = set(
+                LeaveBalance.objects.filter(
+                    employee_id__in=employee_ids, leave_type_id__in=leave_type_ids, year__in=years
+                ).values_list('employee_id', 'leave_type_id', 'year')
+            )
+            balances = []
+            for (emp_id, lt_id, year), (used, pending) in usage.items():
+                result['updated' if (emp_id, lt_id, year) in existing else 'created'] += 1
+                balances.append(LeaveBalance(
+                    employee_id=emp_id, leave_type_id=lt_id, year=year,
+                    entitled_days=0, used_days=used, pending_days=pending,
+                ))
+            with transaction.atomic():
+                LeaveBalance.objects.bulk_create(balances, batch_size=cls.BATCH_SIZE, **upsert)
+
+        if result['created']:
+            bump_version(ENTITLEMENTS_VERSION)
+            bump_resources('entitlements')
+        bump_resources('leave-balances')
+        return result
+
+    @classmethod
+    def role_entitlement_overview(cls, year=None, affiliate_id=None) -> Dict[str, Dict]:
+        """Per-role entitlement statistics for active users, grouped in the database.
+
+        Returns {role_code: {'user_count': n, 'entitlements': {leave_type_id: {...}}}} where each
+        entitlement carries the mode, min, max and number of users holding a balance. Legacy
+        role codes are folded into their current equivalents. Cached until entitlements change.
+        """
+        if year is None:
+            year = timezone.now().year
+        key = f'role-entitlements:{get_version(ENTITLEMENTS_VERSION)}:{year}:{affiliate_id or "all"}'
+        overview = versioned_cache().get(key)
+        if overview is not None:
+            return overview
+
+        from users.models import CustomUser
+
+        users = CustomUser.objects.filter(is_active=True)
+        balances = LeaveBalance.objects.filter(year=year, employee__is_active=True, leave_type__is_active=True)
+        if affiliate_id:
+            users = users.filter(Q(department__affiliate_id=affiliate_id) | Q(affiliate_id=affiliate_id))
+            balances = balances.filter(
+                Q(employee__department__affiliate_id=affiliate_id) | Q(employee__affiliate_id=affiliate_id)
+            )
+
+        overview = defaultdict(lambda: {'user_count': 0, 'entitlements': {}})
+        for row in users.values('role').annotate(n=Count('id', distinct=True)).order_by():
+            role = LEGACY_ROLE_MAP.get(row['role'], row['role'])
+            overview[role]['user_count'] += row['n']
+
+        # {(role, leave_type_id): {entitled_days: users}}
+        histograms = defaultdict(lambda: defaultdict(int))
+        grouped = (
+            balances.values('employee__role', 'leave_type_id', 'entitled_days')
+            .annotate(n=Count('employee_id', distinct=True))
+            .order_by()
+        )
+        for row in grouped:
+            role = LEGACY_ROLE_MAP.get(row['employee__role'], row['employee__role'])
+            histograms[(role, row['leave_type_id'])][row['entitled_days']] += row['n']
+
+        for (role, lt_id), histogram in histograms.items():
+            # Most common value wins; ties resolve to the larger entitlement
+            mode = max(histogram.items(), key=lambda item: (item[1], item[0]))[0]
+            overview[role]['entitlements'][lt_id] = {
+                'entitled_days': mode,
+                'min_days': min(histogram),
+                'max_days': max(histogram),
+                'user_count': sum(histogram.values()),
+            }
+
+        overview = {role: dict(data) for role, data in overview.items()}
+        versioned_cache().set(key, overview, ROLE_OVERVIEW_TTL)
+        return overview
+
+    @classmethod
+    def benefit_rows(cls, leave_types, balances, year) -> List[Dict]:
+        """One row per active leave type for an employee's balances (zeros where none exist)."""
+        by_lt = {getattr(b, 'leave_type_id'): b for b in balances}
+        items = []
+        for lt in leave_types:
+            b = by_lt.get(getattr(lt, 'id'))
+            entitled = b.entitled_days if b else 0
+            used = b.used_days if b else 0
+            pending = b.pending_days if b else 0
+            items.append({
+                'leave_type': {
+                    'id': getattr(lt, 'id'),
+                    'name': lt.name,
+                },
+                'entitled_days': entitled,
+                'used_days': used,
+                'pending_days': pending,
+                'remaining_days': max(0, entitled - used - pending),
+                'year': year,
+            })
+        return items
+
+    @classmethod
+    def current_year_benefits(cls, user) -> List[Dict]:
+        year = timezone.now().year
+        balances = LeaveBalance.objects.filter(employee=user, year=year)
+        return cls.benefit_rows(reference_data.leave_types.active(), balances, year)
+
+    @classmethod
+    async def acurrent_year_benefits(cls, user) -> List[Dict]:
+        """Async current_year_benefits; the leave types and the balances load concurrently."""
+        year = timezone.now().year
+
+        async def balances():
+            return [b async for b in LeaveBalance.objects.filter(employee=user, year=year)]
+
+        leave_types, rows = await asyncio.gather(
+            sync_to_async(reference_data.leave_types.active)(), balances(),
+        )
+        return cls.benefit_rows(leave_types, rows, year)
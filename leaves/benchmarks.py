@@ -0,0 +1,223 @@
+"""
+Endpoint benchmark suite for the approval and reporting hot paths.
+
+Each scenario replays one API call as a representative user through the DRF test
+client against whatever the current database holds - normally a dataset built
+with `generate_perf_dataset`. Every sample runs inside a transaction that is rolled
+back, so write scenarios (leave submission) leave no trace and every sample sees
+the same data. Latency percentiles and query counts are written to JSON, and a
+previous run can serve as the baseline that later runs are compared against.
+"""
+import statistics
+import time
+from contextlib import ExitStack
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, connections, transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from leave_management.middleware import _QueryRecorder
+from users.models import CustomUser
+from .models import LeaveBalance, LeaveRequest, LeaveType
+from .perf_dataset import generated_accounts
+
+
+# name -> (actor, method, path)
+SCENARIOS = {
+    'pending_approvals.manager': ('manager', 'get', '/api/leaves/manager/pending_approvals/'),
+    'pending_approvals.hr': ('hr', 'get', '/api/leaves/manager/pending_approvals/'),
+    'pending_approvals.ceo': ('ceo', 'get', '/api/leaves/manager/pending_approvals/'),
+    'approval_counts.hr': ('hr', 'get', '/api/leaves/manager/approval_counts/'),
+    'approval_counts.ceo': ('ceo', 'get', '/api/leaves/manager/approval_counts/'),
+    'hr_approvals_categorized': ('hr', 'get', '/api/leaves/manager/hr_approvals_categorized/'),
+    'ceo_approvals_categorized': ('ceo', 'get', '/api/leaves/manager/ceo_approvals_categorized/'),
+    'history_combined': ('staff', 'get', '/api/leaves/requests/history_combined/'),
+    'export_all': ('hr', 'get', '/api/leaves/requests/export_all_list/'),
+    'staff_directory': ('hr', 'get', '/api/users/staff/'),
+    'submit_leave': ('submitter', 'post', '/api/leaves/requests/'),
+}
+
+DEFAULT_TOLERANCE = 0.25
+# Latency changes smaller than this are noise on any machine
+MIN_REGRESSION_MS = 5.0
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+def _client_host():
+    # The test client's default 'testserver' host is rejected outside of test runs
+    hosts = [h for h in settings.ALLOWED_HOSTS if h not in ('*', '') and not h.startswith('.')]
+    return hosts[0] if hosts else 'localhost'
+
+
+class BenchmarkSuite:
+    """Run SCENARIOS against the current database and summarize latency and queries."""
+
+    def __init__(self, iterations=20, warmup=3, prefix='perf', progress=None):
+        self.iterations = iterations
+        self.warmup = warmup
+        self.prefix = prefix
+        self.progress = progress or (lambda message: None)
+
+    # -- actors --------------------------------------------------------------------
+
+    def _users(self):
+        """Prefer generated accounts; fall back to any active user with the role."""
+        generated = generated_accounts(self.prefix).filter(is_active=True)
+        return generated if generated.exists() else CustomUser.objects.filter(is_active=True)
+
+    def resolve_actors(self):
+        users = self._users()
+        actors = {
+            'hr': users.filter(role='hr').order_by('id').first(),
+            'ceo': users.filter(role='ceo').filter(
+                Q(affiliate__name__iexact='MERBAN CAPITAL') | Q(affiliate__name__iexact='MERBAN')
+            ).order_by('id').first() or users.filter(role='ceo').order_by('id').first(),
+            # The busiest approver / requester give the worst realistic case
+            'manager': users.filter(role='manager').annotate(reports=Count('managed_employees'))
+            .order_by('-reports', 'id').first(),
+            'staff': users.filter(role__in=['junior_staff', 'senior_staff'])
+            .annotate(request_count=Count('leave_requests')).order_by('-request_count', 'id').first(),
+        }
+        actors['submitter'], self.submission = self._submission(users)
+        return actors
+
+    def _submission(self, users):
+        """A staff member with balance left and a free week to request."""
+        start = timezone.now().date() + timedelta(days=21)
+        start += timedelta(days=(7 - start.weekday()) % 7)  # next Monday
+        end = start + timedelta(days=4)
+        annual = LeaveType.objects.filter(name__iexact='annual', is_active=True).first()
+        if annual is None:
+            return None, None
+        busy = LeaveRequest.objects.filter(
+            start_date__lte=end, end_date__gte=start, status__in=['pending', 'approved']
+        ).values('employee_id')
+        balance = (
+            LeaveBalance.objects.filter(
+                employee__in=users.filter(role__in=['junior_staff', 'senior_staff']),
+                leave_type=annual, year=start.year,
+            )
+            .annotate(left=F('entitled_days') - F('used_days') - F('pending_days'))
+            .filter(left__gte=5).exclude(employee_id__in=busy)
+            .select_related('employee').order_by('employee_id').first()
+        )
+        if balance is None:
+            return None, None
+        payload = {
+            'leave_type': annual.id, 'start_date': start.isoformat(), 'end_date': end.isoformat(),
+            'reason': 'Benchmark submission',
+        }
+        return balance.employee, payload
+
+    # -- running -------------------------------------------------------------------
+
+    def _call(self, client, method, path):
+        if method == 'post':
+            return client.post(path, self.submission, format='json')
+        return client.get(path)
+
+    def run_scenario(self, name, actor):
+        _, method, path = SCENARIOS[name]
+        client = APIClient(HTTP_HOST=_client_host())
+        client.force_authenticate(actor)
+
+        timings, db_times, queries, statuses = [], [], [], set()
+        size = 0
+        for i in range(self.warmup + self.iterations):
+            # Counted with an execute wrapper: CaptureQueriesContext stops at 9000 queries
+            recorder = _QueryRecorder()
+            with transaction.atomic(), ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(recorder))
+                started = time.perf_counter()
+                response = self._call(client, method, path)
+                elapsed = (time.perf_counter() - started) * 1000
+                transaction.set_rollback(True)
+            if i == 0:
+                first = elapsed
+            if i >= self.warmup:
+                timings.append(elapsed)
+                db_times.append(recorder.duration * 1000)
+                queries.append(recorder.count)
+                statuses.add(response.status_code)
+                size = len(getattr(response, 'content', b'') or b'')
+
+        timings.sort()
+        return {
+            'actor': actor.username,
+            'method': method.upper(),
+            'path': path,
+            'status': sorted(statuses),
+            'samples': len(timings),
+            'first_ms': round(first, 2),
+            'p50_ms': round(percentile(timings, 50), 2),
+            'p95_ms': round(percentile(timings, 95), 2),
+            'p99_ms': round(percentile(timings, 99), 2),
+            'max_ms': round(timings[-1], 2),
+            'mean_ms': round(statistics.fmean(timings), 2),
+            'db_ms': round(statistics.median(db_times), 2),
+            'queries': int(statistics.median(queries)),
+            'queries_max': max(queries),
+            'response_bytes': size,
+        }
+
+    def run(self, names=None):
+        """Run the selected scenarios (all by default); returns the JSON-ready report."""
+        names = names or list(SCENARIOS)
+        unknown = set(names) - set(SCENARIOS)
+        if unknown:
+            raise ValueError(f"Unknown scenario(s): {', '.join(sorted(unknown))}")
+
+        actors = self.resolve_actors()
+        report = {
+            'generated_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'dataset': {
+                'users': CustomUser.objects.count(),
+                'leave_requests': LeaveRequest.objects.count(),
+            },
+            'iterations': self.iterations,
+            'warmup': self.warmup,
+            'scenarios': {},
+            'skipped': {},
+        }
+        for name in names:
+            actor = actors.get(SCENARIOS[name][0])
+            if actor is None:
+                report['skipped'][name] = f'no {SCENARIOS[name][0]} user in the dataset'
+                continue
+            self.progress(f'{name} as {actor.username}')
+            report['scenarios'][name] = self.run_scenario(name, actor)
+        return report
+
+
+def compare_to_baseline(report, baseline, tolerance=DEFAULT_TOLERANCE, min_delta_ms=MIN_REGRESSION_MS):
+    """Return regressions of `report` against `baseline` (both run() reports).
+
+    A scenario regresses when p50 or p95 grows by more than `tolerance` (and by at
+    least `min_delta_ms`), when it runs more queries, or when its status changed.
+    """
+    regressions = []
+    for name, current in report.get('scenarios', {}).items():
+        base = baseline.get('scenarios', {}).get(name)
+        if not base:
+            continue
+        for metric in ('p50_ms', 'p95_ms'):
+            limit = base[metric] * (1 + tolerance)
+            if current[metric] > limit and current[metric] - base[metric] >= min_delta_ms:
+                regressions.append({'scenario': name, 'metric': metric, 'baseline': base[metric], 'current': current[metric]})
+        if current['queries'] > base['queries']:
+            regressions.append({'scenario': name, 'metric': 'queries', 'baseline': base['queries'], 'current': current['queries']})
+        if current['status'] != base['status']:
+            regressions.append({'scenario': name, 'metric': 'status', 'baseline': base['status'], 'current': current['status']})
+    return regressions
@@ -0,0 +1,136 @@
+"""
+Employee dashboard summary (LeaveRequestViewSet.dashboard).
+
+The dashboard is the first call after every login. Its summary figures come from a
+single conditional aggregate over the user's requests, and the whole payload is
+cached per user under a key embedding the versions of everything it is built from:
+
+- the per-employee leave data version, bumped by leaves.signals whenever one of the
+  user's requests, balances or interrupt records changes;
+- LEAVE_DATA_VERSION, bumped by bulk writes that bypass model signals (imports,
+  system reset, generated datasets);
+- the user's profile and the department/affiliate directory versions from
+  users.authentication, which drive the stage and status labels.
+
+aemployee_dashboard is the async variant served to ASGI deployments
+(leaves.async_views); it shares the cache entries.
+"""
+import asyncio
+from datetime import date
+from typing import Iterable
+
+from asgiref.sync import sync_to_async
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from leave_management.caching import bump_version, get_versions, versioned_cache
+from users.authentication import AUTH_DIRECTORY_VERSION, user_version_name
+
+
+LEAVE_DATA_VERSION = 'leave-data'
+EMPLOYEE_DASHBOARD_TTL = 60 * 10
+
+IN_FLIGHT_STATUSES = ('pending', 'manager_approved', 'hr_approved', 'ceo_approved')
+
+
+def employee_version_name(employee_id) -> str:
+    return f'leave-data:{employee_id}'
+
+
+def bump_employee_versions(employee_ids: Iterable) -> None:
+    """Invalidate cached leave payloads (dashboard) for the given employees."""
+    for employee_id in {e for e in employee_ids if e is not None}:
+        bump_version(employee_version_name(employee_id))
+
+
+def _summary_aggregates(year) -> dict:
+    this_year = Q(start_date__gte=date(year, 1, 1), start_date__lte=date(year, 12, 31))
+    return {
+        'total_requests': Count('id'),
+        'pending_requests': Count('id', filter=Q(status='pending')),
+        'approved_requests': Count('id', filter=Q(status='approved')),
+        'rejected_requests': Count('id', filter=Q(status='rejected')),
+        'total_days_taken_this_year': Coalesce(Sum('total_days', filter=this_year & Q(status='approved')), 0),
+        'pending_days': Coalesce(Sum('total_days', filter=this_year & Q(status='pending')), 0),
+    }
+
+
+def _recent_queryset(user):
+    from .models import LeaveRequest
+    from .serializers import with_timeline_relations
+
+    return with_timeline_relations(LeaveRequest.objects.filter(employee=user).order_by('-created_at'))[:5]
+
+
+def _dashboard_payload(user, summary, recent) -> dict:
+    from .serializers import LeaveRequestListSerializer
+
+    for lr in recent:
+        # Every row belongs to `user`; reuse it instead of joining the employee back in
+        lr.employee = user
+    recent_data = LeaveRequestListSerializer(recent, many=True).data
+    # Prefer stage_label when it indicates the next pending approver for better UX
+    for item in recent_data:
+        if item.get('stage_label') and item.get('status') in IN_FLIGHT_STATUSES:
+            item['status_display'] = item['stage_label']
+
+    return {
+        'summary': summary,
+        'recent_requests': [dict(item) for item in recent_data],
+    }
+
+
+def build_employee_dashboard(user, year=None) -> dict:
+    """Summary counts and the five most recent requests for `user` (three queries)."""
+    from .models import LeaveRequest
+
+    year = year or timezone.now().year
+    summary = LeaveRequest.objects.filter(employee=user).aggregate(**_summary_aggregates(year))
+    return _dashboard_payload(user, summary, list(_recent_queryset(user)))
+
+
+async def abuild_employee_dashboard(user, year=None) -> dict:
+    """Async build_employee_dashboard: the summary and the recent rows load concurrently."""
+    from .models import LeaveRequest
+
+    async def recent_rows():
+        return [lr async for lr in _recent_queryset(user)]
+
+    year = year or timezone.now().year
+    summary, recent = await asyncio.gather(
+        LeaveRequest.objects.filter(employee=user).aaggregate(**_summary_aggregates(year)),
+        recent_rows(),
+    )
+    # Serializer fields may still touch lazy relations, which the async context forbids
+    return await sync_to_async(_dashboard_payload)(user, summary, recent)
+
+
+def _cached_dashboard(user, year):
+    """(cache key, cached payload or None)"""
+    versions = get_versions(
+        employee_version_name(user.pk), LEAVE_DATA_VERSION, user_version_name(user.pk), AUTH_DIRECTORY_VERSION,
+    )
+    key = f"employee-dashboard:{user.pk}:{year}:" + ':'.join(str(v) for v in versions.values())
+    return key, versioned_cache().get(key)
+
+
+def employee_dashboard(user) -> dict:
+    """Cached build_employee_dashboard; repeat loads run no queries."""
+    year = timezone.now().year
+    key, data = _cached_dashboard(user, year)
+    if data is None:
+        data = build_employee_dashboard(user, year)
+        versioned_cache().set(key, data, EMPLOYEE_DASHBOARD_TTL)
+    return data
+
+
+async def aemployee_dashboard(user) -> dict:
+    """Async employee_dashboard, sharing its cache entries."""
+    year = timezone.now().year
+    # Django's async cache methods wrap the sync ones; look up versions and payload in one hop
+    key, data = await sync_to_async(_cached_dashboard)(user, year)
+    if data is None:
+        data = await abuild_employee_dashboard(user, year)
+        await versioned_cache().aset(key, data, EMPLOYEE_DASHBOARD_TTL)
+    return data
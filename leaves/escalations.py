@@ -0,0 +1,200 @@
+"""
+Approval SLA escalation (escalate_pending_approvals).
+
+Requests waiting at a stage (pending, manager_approved, hr_approved,
+ceo_approved) used to wait indefinitely. LeaveRequest.save() now restarts a
+request's SLA clock whenever its status changes: `next_escalation_at` becomes
+"now" at level 0, or None once the request leaves the workflow. The scheduler
+only ever reads rows whose `next_escalation_at` has passed, through its index,
+so a tick costs the same whether ten or a hundred thousand requests are open.
+
+Per stage:
+
+- level 0 -> 1: after ESCALATION_REMINDER_HOURS at the stage, the stage's
+  approver (ApprovalWorkflowService.get_next_approver) gets a reminder.
+- level 1 -> 2: after ESCALATION_FALLBACK_HOURS (and at least one reminder
+  interval after the reminder), the fallback approver
+  (ESCALATION_FALLBACK_APPROVER, by default every active admin) is notified and
+  the request is no longer scheduled at this stage.
+
+Thresholds are read at each tick from SiteSetting, with settings.py defaults,
+so a changed threshold applies to requests already waiting. Due rows are
+claimed in batches with SELECT ... FOR UPDATE SKIP LOCKED, so several
+schedulers never notify twice.
+"""
+import logging
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import LeaveRequest
+
+
+logger = logging.getLogger('leaves')
+
+# Statuses awaiting an approver, and the timestamp at which each stage started
+STAGE_STARTED = {
+    'pending': 'created_at',
+    'manager_approved': 'manager_approval_date',
+    'hr_approved': 'hr_approval_date',
+    'ceo_approved': 'ceo_approval_date',
+}
+REMINDED = 1
+ESCALATED = 2
+
+
+@dataclass(frozen=True)
+class EscalationPolicy:
+    enabled: bool
+    reminder_after: timedelta
+    fallback_after: timedelta
+    fallback_approver: str
+
+    @classmethod
+    def current(cls):
+        """Thresholds from SiteSetting, falling back to settings."""
+        from notifications.utils import get_site_setting
+
+        def setting(key, cast):
+            default = getattr(settings, key)
+            try:
+                return cast(get_site_setting(key, default))
+            except (TypeError, ValueError):
+                logger.warning('Ignoring invalid site setting %s', key)
+                return default
+
+        return cls(
+            enabled=setting('ESCALATION_ENABLED', lambda v: str(v).strip().lower() in ['1', 'true', 'yes', 'on']),
+            reminder_after=timedelta(hours=setting('ESCALATION_REMINDER_HOURS', float)),
+            fallback_after=timedelta(hours=setting('ESCALATION_FALLBACK_HOURS', float)),
+            fallback_approver=setting('ESCALATION_FALLBACK_APPROVER', lambda v: str(v or '').strip()),
+        )
+
+
+class ApprovalEscalationService:
+    """Schedules and runs approval reminders and escalations."""
+
+    BATCH_SIZE = 200
+
+    @classmethod
+    def schedule(cls, leave_request, now=None):
+        """Restart the SLA clock for the request's current stage (called by LeaveRequest.save)."""
+        leave_request.escalation_level = 0
+        awaiting = leave_request.status in STAGE_STARTED
+        leave_request.next_escalation_at = (now or timezone.now()) if awaiting else None
+
+    @staticmethod
+    def stage_started(leave_request):
+        started = getattr(leave_request, STAGE_STARTED[leave_request.status])
+        return started or leave_request.updated_at or leave_request.created_at
+
+    @classmethod
+    def fallback_approvers(cls, policy):
+        """The configured fallback approver (username or email), else every active admin."""
+        from users.models import CustomUser
+
+        active = CustomUser.objects.filter(is_active=True)
+        if policy.fallback_approver:
+            user = active.filter(
+                Q(username__iexact=policy.fallback_approver) | Q(email__iexact=policy.fallback_approver)
+            ).first()
+            if user:
+                return [user]
+            logger.warning('Escalation fallback approver %r not found; using admins', policy.fallback_approver)
+        return list(active.filter(Q(role='admin') | Q(is_superuser=True)))
+
+    @classmethod
+    def _advance(cls, leave_request, policy, now, fallback):
+        """Notify as the request's level requires; returns the action taken, if any."""
+        from notifications.services import LeaveNotificationService
+        from .services import ApprovalWorkflowService
+
+        if leave_request.status not in STAGE_STARTED:
+            # Left the workflow without save() (e.g. a bulk update)
+            leave_request.next_escalation_at = None
+            return None
+        started = cls.stage_started(leave_request)
+        waiting_hours = (now - started).total_seconds() / 3600
+
+        if leave_request.escalation_level < REMINDED:
+            due = started + policy.reminder_after
+            if due > now:
+                leave_request.next_escalation_at = due
+                return None
+            approver = ApprovalWorkflowService.get_next_approver(leave_request)
+            for recipient in [approver] if approver else fallback():
+                LeaveNotificationService.notify_approval_reminder(leave_request, recipient, waiting_hours)
+            leave_request.escalation_level = REMINDED
+            # A reminded approver gets at least one reminder interval before escalation
+            leave_request.next_escalation_at = max(started + policy.fallback_after, now + policy.reminder_after)
+            return 'reminded'
+
+        due = started + policy.fallback_after
+        if due > now:
+            leave_request.next_escalation_at = due
+            return None
+        approver = ApprovalWorkflowService.get_next_approver(leave_request)
+        LeaveNotificationService.notify_approval_escalated(leave_request, fallback(), approver, waiting_hours)
+        leave_request.escalation_level = ESCALATED
+        leave_request.next_escalation_at = None
+        return 'escalated'
+
+    @classmethod
+    def process_due(cls, now=None, batch_size=None, policy=None) -> dict:
+        """Handle one batch of due requests; returns {'processed', 'reminded', 'escalated'}."""
+        from .services import ApprovalRoutingService
+
+        now = now or timezone.now()
+        policy = policy or EscalationPolicy.current()
+        counts = {'processed': 0, 'reminded': 0, 'escalated': 0}
+        if not policy.enabled:
+            return counts
+
+        ids = list(
+            LeaveRequest.objects.filter(next_escalation_at__lte=now)
+            .order_by('next_escalation_at').values_list('pk', flat=True)[:batch_size or cls.BATCH_SIZE]
+        )
+        if not ids:
+            return counts
+        fallback_cache = []
+
+        def fallback():
+            if not fallback_cache:
+                fallback_cache.append(cls.fallback_approvers(policy))
+            return fallback_cache[0]
+
+        with transaction.atomic(), ApprovalRoutingService.cached_ceo_lookups():
+            # SKIP LOCKED: rows another scheduler is handling wait for its commit
+            due = list(
+                LeaveRequest.objects.select_for_update(skip_locked=True, of=('self',))
+                .filter(pk__in=ids, next_escalation_at__lte=now)
+                .select_related(
+                    'employee', 'employee__manager', 'employee__affiliate', 'employee__department',
+                    'employee__department__hod', 'employee__department__affiliate', 'leave_type',
+                )
+            )
+            for leave_request in due:
+                action = cls._advance(leave_request, policy, now, fallback)
+                if action:
+                    counts[action] += 1
+            # Bookkeeping only: bulk_update leaves updated_at (and the analytics snapshot) alone
+            LeaveRequest.objects.bulk_update(due, ['next_escalation_at', 'escalation_level'])
+        counts['processed'] = len(due)
+        return counts
+
+    @classmethod
+    def run(cls, now=None, batch_size=None) -> dict:
+        """Process batches until no due request is left; returns the summed counts."""
+        batch_size = batch_size or cls.BATCH_SIZE
+        policy = EscalationPolicy.current()
+        totals = {'processed': 0, 'reminded': 0, 'escalated': 0}
+        while True:
+            counts = cls.process_due(now=now, batch_size=batch_size, policy=policy)
+            for key, value in counts.items():
+                totals[key] += value
+            if counts['processed'] < batch_size:
+                return totals
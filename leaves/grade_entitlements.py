@@ -1,5 +1,4 @@
-from django.db import transaction
-from .models import LeaveType, LeaveBalance
+from .balances import LeaveBalanceService
 from users.models import EmploymentGrade, CustomUser
 
 
@@ -9,26 +8,18 @@ def apply_grade_entitlements(grade: EmploymentGrade, year=None):
     Args:
         grade: EmploymentGrade whose entitlements we apply.
         year: Optional year; defaults to current year of LeaveBalance logic.
+
+    Returns the number of balance rows created or changed.
     """
     from django.utils import timezone
     if year is None:
         year = timezone.now().year
 
-    ent_map = {ge.leave_type_id: ge.entitled_days for ge in grade.entitlements.select_related('leave_type')}
+    # LeaveBalance stores whole days; grade entitlements are decimals
+    ent_map = {lt_id: int(days) for lt_id, days in grade.entitlements.values_list('leave_type_id', 'entitled_days')}
     if not ent_map:
         return 0
 
-    users = CustomUser.objects.filter(grade=grade, is_active=True)
-    count = 0
-    with transaction.atomic():
-        for user in users:
-            for lt_id, entitled in ent_map.items():
-                lb, _ = LeaveBalance.objects.get_or_create(
-                    user=user, leave_type_id=lt_id, year=year,
-                    defaults={'entitled_days': entitled}
-                )
-                if lb.entitled_days != entitled:
-                    lb.entitled_days = entitled
-                    lb.save(update_fields=['entitled_days'])
-                    count += 1
-    return count
+    user_ids = CustomUser.objects.filter(grade=grade, is_active=True).values_list('id', flat=True)
+    counts = LeaveBalanceService.upsert_entitlements(user_ids, ent_map, year)
+    return counts['created'] + counts['updated']
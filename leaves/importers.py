@@ -0,0 +1,269 @@
+"""
+Bulk import of historical leave records (affiliate onboarding / data migrations).
+
+Records are streamed from CSV or Parquet and handled in batches: employees are
+resolved with one query per batch, working days are computed for the whole batch
+with numpy's business-day calendar (Mon-Fri, matching
+LeaveRequest.calculate_working_days), and rows are written with bulk_create.
+LeaveRequest.save()/clean() are bypassed on purpose - past dates are the point -
+and no notifications or overlap checks run. Affected LeaveBalance rows are
+rebuilt once at the end.
+
+Columns (header names, case-insensitive):
+    employee_id | email, leave_type (name or id), start_date, end_date,
+    status (approved/rejected/cancelled, default approved), reason, approval_date
+"""
+import csv
+import logging
+from datetime import date, datetime
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from leave_management.conditional import bump_resources
+from users.models import CustomUser
+from .balances import LeaveBalanceService
+from .dashboard import bump_employee_versions
+from .models import LeaveRequest, LeaveType
+
+
+logger = logging.getLogger('leaves')
+
+HISTORICAL_STATUSES = {'approved', 'rejected', 'cancelled'}
+
+
+def _parse_date(value):
+    if value is None or value == '':
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value).strip()[:10])
+
+
+def working_days_between(starts, ends):
+    """Vectorized Mon-Fri working-day counts for inclusive date ranges."""
+    start_arr = np.array(starts, dtype='datetime64[D]')
+    end_arr = np.array(ends, dtype='datetime64[D]') + np.timedelta64(1, 'D')
+    return np.busday_count(start_arr, end_arr)
+
+
+def iter_csv_records(text_stream):
+    reader = csv.DictReader(text_stream)
+    if reader.fieldnames:
+        reader.fieldnames = [(h or '').strip().lower() for h in reader.fieldnames]
+    yield from reader
+
+
+def iter_parquet_records(source, batch_size=5000):
+    """Yield dict records from a Parquet file without loading it whole."""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as exc:  # pragma: no cover - pyarrow ships in requirements
+        raise ValueError('Parquet import requires pyarrow') from exc
+    parquet = pq.ParquetFile(source)
+    for batch in parquet.iter_batches(batch_size=batch_size):
+        for record in batch.to_pylist():
+            yield {str(k).strip().lower(): v for k, v in record.items()}
+
+
+class HistoricalLeaveImporter:
+    """Validate and bulk insert historical LeaveRequest rows."""
+
+    BATCH_SIZE = 1000
+
+    def __init__(self, dry_run=False, batch_size=None):
+        self.dry_run = dry_run
+        self.batch_size = batch_size or self.BATCH_SIZE
+        self.leave_types_by_name = {}
+        self.leave_types_by_id = {}
+        for lt in LeaveType.objects.all():
+            self.leave_types_by_name[lt.name.strip().lower()] = lt
+            self.leave_types_by_id[lt.id] = lt
+        self._touched_balances = set()
+        self.report = {
+            'dry_run': dry_run,
+            'total_rows': 0,
+            'valid_rows': 0,
+            'created': 0,
+            'skipped_duplicates': 0,
+            'balances_rebuilt': 0,
+            'errors': [],
+            'read_error': None,
+        }
+
+    def run(self, records):
+        """Import an iterable of dict records; returns the report dict.
+
+        Batches commit one at a time. If the file turns unreadable part way
+        (bad encoding, a corrupt Parquet batch), the rows read so far stay
+        imported, their balances are still rebuilt, and `read_error` says where
+        the import stopped.
+        """
+        batch = []
+        records = iter(records)
+        # Row numbers follow the CSV convention: line 1 is the header
+        row_number = 2
+        while True:
+            # Only reading is guarded: errors from processing a batch are not read errors
+            try:
+                record = next(records)
+            except StopIteration:
+                break
+            except (UnicodeDecodeError, ValueError) as exc:
+                self.report['read_error'] = f'at record {self.report["total_rows"] + 1}: {exc}'
+                logger.warning('Historical leave import stopped reading %s', self.report['read_error'])
+                break
+            self.report['total_rows'] += 1
+            batch.append((row_number, record))
+            row_number += 1
+            if len(batch) >= self.batch_size:
+                self._process_batch(batch)
+                batch = []
+        if batch:
+            self._process_batch(batch)
+
+        if self._touched_balances and not self.dry_run:
+            counts = LeaveBalanceService.rebuild_usage(self._touched_balances)
+            self.report['balances_rebuilt'] = counts['created'] + counts['updated']
+
+        logger.info(
+            'Historical leave import%s: rows=%s valid=%s created=%s duplicates=%s errors=%s',
+            ' (dry run)' if self.dry_run else '', self.report['total_rows'], self.report['valid_rows'],
+            self.report['created'], self.report['skipped_duplicates'], len(self.report['errors']),
+        )
+        return self.report
+
+    def _error(self, row_number, message):
+        self.report['errors'].append({'row': row_number, 'error': message})
+
+    def _resolve_leave_type(self, value):
+        if value is None or value == '':
+            return None
+        text = str(value).strip()
+        if text.isdigit():
+            return self.leave_types_by_id.get(int(text))
+        return self.leave_types_by_name.get(text.lower())
+
+    def _parse_record(self, row_number, record):
+        def get(key):
+            value = record.get(key)
+            return value.strip() if isinstance(value, str) else value
+
+        try:
+            start = _parse_date(get('start_date'))
+            end = _parse_date(get('end_date'))
+            approval_date = _parse_date(get('approval_date'))
+        except ValueError:
+            self._error(row_number, 'Dates must be YYYY-MM-DD')
+            return None
+        if not start or not end:
+            self._error(row_number, 'start_date and end_date are required')
+            return None
+        if start > end:
+            self._error(row_number, 'Start date cannot be after end date')
+            return None
+
+        leave_type = self._resolve_leave_type(get('leave_type'))
+        if leave_type is None:
+            self._error(row_number, f'Unknown leave type "{get("leave_type")}"')
+            return None
+
+        status = (get('status') or 'approved').lower()
+        if status not in HISTORICAL_STATUSES:
+            self._error(row_number, f'Status must be one of {", ".join(sorted(HISTORICAL_STATUSES))}')
+            return None
+
+        employee_id = str(get('employee_id') or '').strip()
+        email = str(get('email') or '').strip().lower()
+        if not employee_id and not email:
+            self._error(row_number, 'employee_id or email is required')
+            return None
+
+        return {
+            'row': row_number,
+            'employee_id': employee_id,
+            'email': email,
+            'leave_type': leave_type,
+            'start': start,
+            'end': end,
+            'status': status,
+            'reason': get('reason') or '',
+            'approval_date': approval_date,
+        }
+
+    def _process_batch(self, batch):
+        parsed = [p for p in (self._parse_record(n, rec) for n, rec in batch) if p]
+        if not parsed:
+            return
+
+        # Resolve employees for the whole batch in one query
+        emp_ids = {p['employee_id'] for p in parsed if p['employee_id']}
+        emails = {p['email'] for p in parsed if p['email']}
+        by_emp_id, by_email = {}, {}
+        for pk, emp_id, email in CustomUser.objects.filter(
+            Q(employee_id__in=emp_ids) | Q(email_normalized__in=emails)
+        ).values_list('id', 'employee_id', 'email_normalized'):
+            by_emp_id[emp_id] = pk
+            by_email[email] = pk
+
+        resolved = []
+        for p in parsed:
+            user_pk = by_emp_id.get(p['employee_id']) if p['employee_id'] else by_email.get(p['email'])
+            if user_pk is None:
+                self._error(p['row'], f"Unknown employee \"{p['employee_id'] or p['email']}\"")
+                continue
+            p['user_pk'] = user_pk
+            resolved.append(p)
+        if not resolved:
+            return
+
+        # Re-running an import must not duplicate records already loaded
+        existing = set(
+            LeaveRequest.objects.filter(
+                employee_id__in={p['user_pk'] for p in resolved},
+                start_date__gte=min(p['start'] for p in resolved),
+                start_date__lte=max(p['start'] for p in resolved),
+            ).values_list('employee_id', 'leave_type_id', 'start_date', 'end_date')
+        )
+        fresh = []
+        for p in resolved:
+            key = (p['user_pk'], p['leave_type'].id, p['start'], p['end'])
+            if key in existing:
+                self.report['skipped_duplicates'] += 1
+                continue
+            existing.add(key)
+            fresh.append(p)
+        self.report['valid_rows'] += len(fresh)
+        if not fresh or self.dry_run:
+            return
+
+        days = working_days_between([p['start'] for p in fresh], [p['end'] for p in fresh])
+        imported_at = timezone.now()
+        requests = []
+        for p, total in zip(fresh, days):
+            approved_at = None
+            if p['status'] == 'approved':
+                stamp = p['approval_date'] or p['start']
+                approved_at = timezone.make_aware(datetime.combine(stamp, datetime.min.time()))
+            requests.append(LeaveRequest(
+                employee_id=p['user_pk'],
+                leave_type=p['leave_type'],
+                start_date=p['start'],
+                end_date=p['end'],
+                total_days=int(total),
+                reason=p['reason'],
+                status=p['status'],
+                approval_date=approved_at,
+                approval_comments=f'Imported historical record ({imported_at:%Y-%m-%d})',
+            ))
+            self._touched_balances.add((p['user_pk'], p['leave_type'].id, p['start'].year))
+
+        with transaction.atomic():
+            LeaveRequest.objects.bulk_create(requests, batch_size=self.batch_size)
+            bump_employee_versions(lr.employee_id for lr in requests)
+            bump_resources('leave-requests')
+        self.report['created'] += len(requests)
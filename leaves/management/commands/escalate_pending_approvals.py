@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from leaves.escalations import ApprovalEscalationService
+
+
+class Command(BaseCommand):
+    help = (
+        "Send reminders for, and escalate, leave requests waiting too long at an approval stage. "
+        "Run it from cron, or with --loop as a long-running worker. Thresholds: ESCALATION_* site settings."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep running, one tick every --interval seconds.')
+        parser.add_argument('--interval', type=float, default=300.0, help='Seconds between ticks with --loop.')
+        parser.add_argument('--batch-size', type=int, default=ApprovalEscalationService.BATCH_SIZE,
+                            help='Due requests claimed per transaction.')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1 or options['interval'] <= 0:
+            raise CommandError('--batch-size and --interval must be positive')
+        while True:
+            started = time.monotonic()
+            counts = ApprovalEscalationService.run(batch_size=options['batch_size'])
+            elapsed = time.monotonic() - started
+            summary = '  '.join(f'{name}: {count}' for name, count in counts.items())
+            self.stdout.write(self.style.SUCCESS(f'Escalation tick in {elapsed:.2f}s  {summary}'))
+            if not options['loop']:
+                return
+            time.sleep(max(0.0, options['interval'] - elapsed))
@@ -0,0 +1,49 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from leaves.importers import HistoricalLeaveImporter, iter_csv_records, iter_parquet_records
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk import historical leave records from CSV or Parquet "
+        "(columns: employee_id|email, leave_type, start_date, end_date, status, reason, approval_date). "
+        "Skips notifications and overlap checks and rebuilds affected leave balances once at the end."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or Parquet file to import')
+        parser.add_argument('--format', choices=['csv', 'parquet'], help='Input format (default: from file extension).')
+        parser.add_argument('--dry-run', action='store_true', help='Validate every record without writing.')
+        parser.add_argument('--batch-size', type=int, default=HistoricalLeaveImporter.BATCH_SIZE,
+                            help='Records per validation/insert batch.')
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.exists():
+            raise CommandError(f'File not found: {path}')
+        fmt = options.get('format') or ('parquet' if path.suffix.lower() in ('.parquet', '.pq') else 'csv')
+
+        importer = HistoricalLeaveImporter(dry_run=options['dry_run'], batch_size=options['batch_size'])
+        if fmt == 'parquet':
+            report = importer.run(iter_parquet_records(str(path), batch_size=options['batch_size']))
+        else:
+            with path.open('r', encoding='utf-8-sig', newline='') as fh:
+                report = importer.run(iter_csv_records(fh))
+
+        for err in report['errors']:
+            self.stdout.write(self.style.WARNING(f"Row {err['row']}: {err['error']}"))
+        summary = (
+            f"Rows: {report['total_rows']}  valid: {report['valid_rows']}  created: {report['created']}  "
+            f"duplicates skipped: {report['skipped_duplicates']}  balances rebuilt: {report['balances_rebuilt']}  "
+            f"errors: {len(report['errors'])}"
+        )
+        if report['read_error']:
+            self.stdout.write(self.style.ERROR(
+                f"Could not read file {report['read_error']}; rows before it were imported."
+            ))
+        if report['dry_run']:
+            self.stdout.write(self.style.NOTICE(f"Dry run - nothing written. {summary}"))
+        else:
+            self.stdout.write(self.style.SUCCESS(summary))
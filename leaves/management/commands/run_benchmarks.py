@@ -0,0 +1,77 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from leaves.benchmarks import DEFAULT_TOLERANCE, SCENARIOS, BenchmarkSuite, compare_to_baseline
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the approval queues, history, export, staff directory and leave submission endpoints "
+        "against the current database (see generate_perf_dataset). Writes latency percentiles and query "
+        "counts as JSON and compares them with a saved baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20, help='Measured requests per scenario.')
+        parser.add_argument('--warmup', type=int, default=3, help='Unmeasured requests before measuring.')
+        parser.add_argument('--only', action='append', choices=sorted(SCENARIOS), metavar='SCENARIO',
+                            help='Run only this scenario (repeatable). Choices: ' + ', '.join(sorted(SCENARIOS)))
+        parser.add_argument('--prefix', default='perf', help='Prefix of generate_perf_dataset accounts to act as.')
+        parser.add_argument('--output', help='Write the results as JSON to this file.')
+        parser.add_argument('--baseline', help='JSON results of an earlier run to compare against.')
+        parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                            help='Allowed relative p50/p95 slowdown before flagging a regression (0.25 = 25%%).')
+        parser.add_argument('--fail-on-regression', action='store_true',
+                            help='Exit with an error when a regression is found.')
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1 or options['warmup'] < 0:
+            raise CommandError('--iterations must be positive and --warmup non-negative')
+        baseline = None
+        if options['baseline']:
+            try:
+                baseline = json.loads(Path(options['baseline']).read_text())
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Cannot read baseline {options['baseline']}: {exc}") from exc
+
+        suite = BenchmarkSuite(
+            iterations=options['iterations'],
+            warmup=options['warmup'],
+            prefix=options['prefix'],
+            progress=lambda message: self.stdout.write(f'  {message}'),
+        )
+        report = suite.run(options['only'])
+        dataset = report['dataset']
+        self.stdout.write(
+            f"{report['database']}: {dataset['users']} users, {dataset['leave_requests']} leave requests, "
+            f"{report['iterations']} iterations"
+        )
+
+        self.stdout.write(f"{'scenario':<28} {'status':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'queries':>8}")
+        for name, result in report['scenarios'].items():
+            status = ','.join(str(s) for s in result['status'])
+            self.stdout.write(
+                f"{name:<28} {status:>8} {result['p50_ms']:>7.1f}ms {result['p95_ms']:>7.1f}ms "
+                f"{result['p99_ms']:>7.1f}ms {result['queries']:>8}"
+            )
+        for name, reason in report['skipped'].items():
+            self.stdout.write(self.style.WARNING(f'{name:<28} skipped: {reason}'))
+
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(report, indent=2))
+            self.stdout.write(f"Results written to {options['output']}")
+
+        if baseline is None:
+            return
+        regressions = compare_to_baseline(report, baseline, tolerance=options['tolerance'])
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS('No regressions against baseline'))
+            return
+        for r in regressions:
+            self.stdout.write(self.style.ERROR(
+                f"REGRESSION {r['scenario']} {r['metric']}: {r['baseline']} -> {r['current']}"
+            ))
+        if options['fail_on_regression']:
+            raise CommandError(f'{len(regressions)} regression(s) against baseline')
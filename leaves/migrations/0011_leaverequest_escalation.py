@@ -0,0 +1,31 @@
+from django.db import migrations, models
+from django.db.models.functions import Now
+
+
+def schedule_open_requests(apps, schema_editor):
+    # Requests already awaiting approval become due at the scheduler's next tick
+    LeaveRequest = apps.get_model('leaves', 'LeaveRequest')
+    LeaveRequest.objects.filter(
+        status__in=['pending', 'manager_approved', 'hr_approved', 'ceo_approved'],
+    ).update(next_escalation_at=Now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leaves', '0010_leaverequest_status_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='leaverequest',
+            name='next_escalation_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='leaverequest',
+            name='escalation_level',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.RunPython(schedule_open_requests, migrations.RunPython.noop),
+    ]
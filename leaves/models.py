@@ -92,6 +92,11 @@ class LeaveRequest(models.Model):
 
     # Actual resume tracking (user marks when they returned after leave end)
     actual_resume_date = models.DateField(null=True, blank=True)
+
+    # SLA escalation (leaves.escalations): when the escalate_pending_approvals scheduler
+    # next looks at this request, and how far it has escalated at the current stage
+    next_escalation_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    escalation_level = models.PositiveSmallIntegerField(default=0)
     
     def clean(self):
         """Validate leave request data"""
@@ -107,13 +112,27 @@ class LeaveRequest(models.Model):
             if self.status == 'pending' and self.start_date < timezone.now().date():
                 raise ValidationError("Cannot request leave for past dates while pending")
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets save() notice a stage change
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
+
     def save(self, *args, **kwargs):
         # Always calculate total days from dates
         if self.start_date and self.end_date:
             self.total_days = self.calculate_working_days()
         
         self.clean()
+        if self._state.adding or self.status != getattr(self, '_loaded_status', self.status):
+            # Entering a stage (or leaving the workflow) restarts its SLA clock
+            from .escalations import ApprovalEscalationService
+            ApprovalEscalationService.schedule(self)
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'next_escalation_at', 'escalation_level'}
         super().save(*args, **kwargs)
+        self._loaded_status = self.status
     
     def calculate_working_days(self):
         """Calculate working days between start and end date (excluding weekends)"""
@@ -400,6 +419,10 @@ class LeaveRequest(models.Model):
         ordering = ['-created_at']
         verbose_name = 'Leave Request'
         verbose_name_plural = 'Leave Requests'
+        indexes = [
+            # Approval queues: filter by stage, newest first; also serves GROUP BY status
+            models.Index(fields=['status', '-created_at'], name='leaves_lr_status_created_idx'),
+        ]
 
 
 class LeaveBalance(models.Model):
@@ -445,7 +468,10 @@ class LeaveBalance(models.Model):
             req.total_days or 0 for req in current_year_requests.filter(status__in=pending_statuses)
         )
         
-        self.save()
+        if self.pk:
+            self.save(update_fields=['used_days', 'pending_days', 'updated_at'])
+        else:
+            self.save()
     
     def __str__(self):
         return f"{self.employee.get_full_name()} - {self.leave_type.name} {self.year} ({self.remaining_days} days remaining)"
@@ -0,0 +1,391 @@
+"""
+Synthetic dataset generator for performance work.
+
+Builds a production-shaped organisation across Merban Capital (departments with
+HODs: manager -> HR -> CEO), SDSL and SBL (CEO -> HR), plus several years of leave
+history with every workflow status, approver stamps, interrupts with audit logs
+and matching LeaveBalance rows. Everything is derived from one random seed, so
+two runs with the same options produce the same data, and every table is written
+with bulk_create in chunks of employees to keep memory flat.
+
+Generated accounts share a username prefix (default "perf") and an email domain
+(`<prefix>.example.com`); `generated_accounts` matches them by the domain, so
+`clear()` never touches a real account whose username happens to start with the
+prefix (perfect.mensah, say).
+"""
+import logging
+import random
+from datetime import date, datetime, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from leave_management.caching import bump_version
+from leave_management.conditional import bump_all_resources
+from users.backups import preserved_timestamps
+from users.models import Affiliate, CustomUser, Department
+from .balances import ENTITLEMENTS_VERSION
+from .dashboard import LEAVE_DATA_VERSION
+from .models import LeaveBalance, LeaveInterruptLog, LeaveInterruptRequest, LeaveRequest, LeaveType
+
+
+logger = logging.getLogger('leaves')
+
+FIRST_NAMES = [
+    'Kwame', 'Ama', 'Kofi', 'Akosua', 'Yaw', 'Abena', 'Kwesi', 'Efua', 'Kojo', 'Adwoa', 'Kwabena', 'Afua',
+    'Nana', 'Esi', 'Fiifi', 'Yaa', 'Selorm', 'Dzifa', 'Elikem', 'Mawuli', 'Ato', 'Araba', 'Nii', 'Naa',
+]
+LAST_NAMES = [
+    'Mensah', 'Owusu', 'Boateng', 'Asante', 'Osei', 'Agyeman', 'Appiah', 'Acheampong', 'Addo', 'Ofori',
+    'Darko', 'Amoah', 'Quaye', 'Tetteh', 'Lartey', 'Annan', 'Badu', 'Kuffour', 'Sarpong', 'Danso',
+]
+MERBAN_DEPARTMENTS = [
+    'Finance & Accounts', 'Government Securities', 'Pensions & Provident Fund', 'Private Wealth & Mutual Fund',
+    'HR & Admin', 'Client Service/Marketing', 'Corporate Finance', 'IT', 'Compliance', 'Audit',
+]
+# (name, entitled days, share of requests)
+LEAVE_TYPE_MIX = [
+    ('Annual', 25, 0.62), ('Sick', 10, 0.18), ('Casual', 5, 0.10),
+    ('Compassionate', 5, 0.05), ('Paternity', 7, 0.03), ('Maternity', 84, 0.02),
+]
+AFFILIATE_SHARE = [('MERBAN CAPITAL', 0.7), ('SDSL', 0.15), ('SBL', 0.15)]
+# Leave older than this is settled (approved/rejected/cancelled); newer may still be in flight
+IN_FLIGHT_WINDOW = timedelta(days=45)
+# Each employee-year is cut into two-week slots so one person's requests never overlap
+SLOT_DAYS = 14
+
+
+def generated_accounts(prefix):
+    """Accounts created by PerfDatasetGenerator with `prefix`, and no others."""
+    return CustomUser.objects.filter(email__iendswith=f'@{prefix}.example.com')
+
+
+class PerfDatasetGenerator:
+    """Bulk-generate employees, leave requests, balances and interrupts."""
+
+    def __init__(self, employees=2000, requests=50000, years=5, interrupt_rate=0.02, seed=42,
+                 prefix='perf', password='perf-pass-123', batch_size=5000, chunk_employees=1000, progress=None):
+        self.employees = employees
+        self.requests = requests
+        self.years = years
+        self.interrupt_rate = interrupt_rate
+        self.seed = seed
+        self.prefix = prefix
+        self.password_hash = make_password(password)
+        self.batch_size = batch_size
+        self.chunk_employees = chunk_employees
+        self.progress = progress or (lambda message: None)
+        self.rng = random.Random(seed)
+        self.today = timezone.now().date()
+        self.first_year = self.today.year - years + 1
+        self.counts = {'users': 0, 'leave_requests': 0, 'balances': 0, 'interrupts': 0, 'interrupt_logs': 0}
+
+    # -- cleanup -------------------------------------------------------------------
+
+    def clear(self):
+        """Delete previously generated accounts and everything hanging off them."""
+        users = generated_accounts(self.prefix)
+        with transaction.atomic():
+            Department.objects.filter(hod__in=users).update(hod=None)
+            LeaveInterruptLog.objects.filter(leave_request__employee__in=users).delete()
+            LeaveInterruptRequest.objects.filter(leave_request__employee__in=users).delete()
+            LeaveRequest.objects.filter(employee__in=users).delete()
+            LeaveBalance.objects.filter(employee__in=users).delete()
+            deleted, _ = users.delete()
+        return deleted
+
+    # -- generation ----------------------------------------------------------------
+
+    def run(self):
+        """Generate the dataset; returns row counts per table."""
+        self.leave_types = self._ensure_leave_types()
+        self.affiliates = self._ensure_affiliates()
+        self.departments = self._ensure_departments()
+        self._create_approvers()
+        employee_ids = self._create_employees()
+
+        per_employee = self._requests_per_employee(len(employee_ids))
+        for start in range(0, len(employee_ids), self.chunk_employees):
+            chunk = employee_ids[start:start + self.chunk_employees]
+            self._generate_chunk(chunk, per_employee[start:start + self.chunk_employees])
+            self.progress(
+                f"employees {min(start + len(chunk), len(employee_ids))}/{len(employee_ids)}  "
+                f"requests {self.counts['leave_requests']}"
+            )
+
+        bump_version(ENTITLEMENTS_VERSION)
+        bump_version(LEAVE_DATA_VERSION)
+        bump_all_resources()
+        logger.info('Generated performance dataset (seed=%s): %s', self.seed, self.counts)
+        return self.counts
+
+    def _ensure_leave_types(self):
+        types = []
+        for name, entitled, share in LEAVE_TYPE_MIX:
+            lt, _ = LeaveType.objects.get_or_create(
+                name=name, defaults={'description': f'{name} leave', 'max_days_per_request': 30, 'is_active': True},
+            )
+            types.append((lt, entitled, share))
+        return types
+
+    def _ensure_affiliates(self):
+        affiliates = {}
+        for name, _ in AFFILIATE_SHARE:
+            affiliate = Affiliate.objects.filter(name__iexact=name).first() or Affiliate.objects.create(name=name)
+            affiliates[name] = affiliate
+        return affiliates
+
+    def _ensure_departments(self):
+        merban = self.affiliates['MERBAN CAPITAL']
+        departments = []
+        for name in MERBAN_DEPARTMENTS:
+            dept = Department.objects.filter(name__iexact=name, affiliate=merban).first()
+            if dept is None:
+                dept = Department.objects.create(name=name, affiliate=merban)
+            departments.append(dept)
+        return departments
+
+    def _user(self, username, role, affiliate, department=None, manager_id=None, hire_year=None):
+        first, last = self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+        user = CustomUser(
+            username=username,
+            email=f'{username}@{self.prefix}.example.com',
+            first_name=first,
+            last_name=last,
+            employee_id=username.upper(),
+            role=role,
+            affiliate=affiliate,
+            department=department,
+            manager_id=manager_id,
+            hire_date=date(hire_year or self.first_year - self.rng.randint(0, 10), self.rng.randint(1, 12), 1),
+            password=self.password_hash,
+            is_active_employee=True,
+        )
+        user.refresh_search_fields()
+        return user
+
+    def _ids_by_username(self, usernames):
+        found = {}
+        names = list(usernames)
+        for start in range(0, len(names), self.batch_size):
+            found.update(
+                CustomUser.objects.filter(username__in=names[start:start + self.batch_size]).values_list('username', 'id')
+            )
+        return found
+
+    def _create_approvers(self):
+        """One CEO per affiliate, HR officers and one HOD per Merban department."""
+        p = self.prefix
+        approvers = [self._user(f'{p}-ceo-{name.split()[0].lower()}', 'ceo', aff) for name, aff in self.affiliates.items()]
+        approvers += [self._user(f'{p}-hr-{i}', 'hr', self.affiliates['MERBAN CAPITAL']) for i in range(1, 4)]
+        approvers += [
+            self._user(f'{p}-hod-{i:02d}', 'manager', dept.affiliate, dept)
+            for i, dept in enumerate(self.departments, start=1)
+        ]
+        CustomUser.objects.bulk_create(approvers, batch_size=self.batch_size)
+        ids = self._ids_by_username(u.username for u in approvers)
+        self.counts['users'] += len(approvers)
+
+        self.ceo_ids = {name: ids[f'{p}-ceo-{name.split()[0].lower()}'] for name in self.affiliates}
+        self.hr_ids = [ids[f'{p}-hr-{i}'] for i in range(1, 4)]
+        self.hod_ids = {}
+        for i, dept in enumerate(self.departments, start=1):
+            self.hod_ids[dept.id] = ids[f'{p}-hod-{i:02d}']
+            if dept.hod_id is None:
+                dept.hod_id = self.hod_ids[dept.id]
+                dept.save(update_fields=['hod', 'updated_at'])
+
+    def _create_employees(self):
+        names = [n for n, _ in AFFILIATE_SHARE]
+        weights = [w for _, w in AFFILIATE_SHARE]
+        self.employee_meta = {}
+        users = []
+        for n in range(1, self.employees + 1):
+            aff_name = self.rng.choices(names, weights)[0]
+            affiliate = self.affiliates[aff_name]
+            department = manager_id = None
+            if aff_name == 'MERBAN CAPITAL':
+                department = self.rng.choice(self.departments)
+                manager_id = self.hod_ids[department.id]
+            role = 'senior_staff' if self.rng.random() < 0.3 else 'junior_staff'
+            username = f'{self.prefix}{n:06d}'
+            users.append(self._user(username, role, affiliate, department, manager_id))
+            self.employee_meta[username] = (aff_name, manager_id)
+            if len(users) >= self.batch_size:
+                CustomUser.objects.bulk_create(users, batch_size=self.batch_size)
+                users = []
+        if users:
+            CustomUser.objects.bulk_create(users, batch_size=self.batch_size)
+        self.counts['users'] += self.employees
+
+        ids = self._ids_by_username(self.employee_meta)
+        self.employee_meta = {ids[name]: meta for name, meta in self.employee_meta.items()}
+        return sorted(self.employee_meta)
+
+    def _requests_per_employee(self, employee_count):
+        """Spread the request total over employees (some take far more leave than others)."""
+        if not employee_count:
+            return []
+        max_per_employee = self.years * (366 // SLOT_DAYS)
+        weights = [self.rng.uniform(0.5, 1.5) for _ in range(employee_count)]
+        total_weight = sum(weights)
+        counts = [min(max_per_employee, int(self.requests * w / total_weight)) for w in weights]
+        # Hand out the rounding remainder deterministically
+        shortfall = self.requests - sum(counts)
+        i = 0
+        while shortfall > 0 and i < employee_count * max_per_employee:
+            idx = i % employee_count
+            if counts[idx] < max_per_employee:
+                counts[idx] += 1
+                shortfall -= 1
+            i += 1
+        return counts
+
+    def _pick_status(self, aff_name, start):
+        if start < self.today - IN_FLIGHT_WINDOW:
+            roll = self.rng.random()
+            return 'approved' if roll < 0.85 else 'rejected' if roll < 0.93 else 'cancelled'
+        if aff_name == 'MERBAN CAPITAL':
+            return self.rng.choice(['pending', 'manager_approved', 'hr_approved', 'approved', 'rejected', 'cancelled'])
+        return self.rng.choice(['pending', 'ceo_approved', 'approved', 'rejected', 'cancelled'])
+
+    def _stamp(self, day, hours):
+        return timezone.make_aware(datetime.combine(day, datetime.min.time()) + timedelta(hours=hours))
+
+    def _build_request(self, employee_id, start, working_days):
+        aff_name, manager_id = self.employee_meta[employee_id]
+        end, remaining = start, working_days - 1
+        while remaining > 0:
+            end += timedelta(days=1)
+            if end.weekday() < 5:
+                remaining -= 1
+        types = self.leave_types
+        leave_type, _, _ = self.rng.choices(types, [share for _, _, share in types])[0]
+        status = self._pick_status(aff_name, start)
+        submitted = min(start - timedelta(days=self.rng.randint(3, 30)), self.today)
+        lr = LeaveRequest(
+            employee_id=employee_id, leave_type=leave_type, start_date=start, end_date=end,
+            total_days=working_days, reason='Generated for performance testing', status=status,
+            created_at=self._stamp(submitted, 9), updated_at=self._stamp(submitted + timedelta(days=2), 12),
+        )
+        ceo_first = aff_name != 'MERBAN CAPITAL'
+        hr_id = self.rng.choice(self.hr_ids)
+        ceo_id = self.ceo_ids[aff_name]
+        reached = {
+            'pending': 0, 'manager_approved': 1, 'ceo_approved': 1, 'hr_approved': 2, 'approved': 3,
+        }.get(status, self.rng.randint(0, 1))  # rejected/cancelled stop somewhere early
+        if not ceo_first and reached >= 1:
+            lr.manager_approved_by_id, lr.manager_approval_date = manager_id or hr_id, self._stamp(submitted, 30)
+        if ceo_first and reached >= 1:
+            lr.ceo_approved_by_id, lr.ceo_approval_date = ceo_id, self._stamp(submitted, 30)
+        if reached >= 2 or (ceo_first and status == 'approved'):
+            lr.hr_approved_by_id, lr.hr_approval_date = hr_id, self._stamp(submitted, 54)
+        if status == 'approved':
+            if not ceo_first:
+                lr.ceo_approved_by_id, lr.ceo_approval_date = ceo_id, self._stamp(submitted, 78)
+            lr.approved_by_id = hr_id if ceo_first else ceo_id
+            lr.approval_date = lr.hr_approval_date if ceo_first else lr.ceo_approval_date
+        elif status == 'rejected':
+            lr.approved_by_id = ceo_id if ceo_first else (manager_id or hr_id)
+            lr.approval_date = self._stamp(submitted, 30)
+            lr.approval_comments = 'Operational cover not available'
+        return lr
+
+    def _generate_chunk(self, employee_ids, request_counts):
+        requests = []
+        slots_per_year = 366 // SLOT_DAYS
+        for employee_id, count in zip(employee_ids, request_counts):
+            slots = self.rng.sample(range(self.years * slots_per_year), count)
+            for slot in sorted(slots):
+                year = self.first_year + slot // slots_per_year
+                slot_start = date(year, 1, 1) + timedelta(days=(slot % slots_per_year) * SLOT_DAYS)
+                start = slot_start + timedelta(days=self.rng.randint(0, 4))
+                while start.weekday() >= 5:
+                    start += timedelta(days=1)
+                requests.append(self._build_request(employee_id, start, self.rng.randint(1, 8)))
+
+        with transaction.atomic():
+            with preserved_timestamps(LeaveRequest):
+                LeaveRequest.objects.bulk_create(requests, batch_size=self.batch_size)
+            self.counts['leave_requests'] += len(requests)
+            self._create_balances(requests)
+            self._create_interrupts(employee_ids)
+
+    def _create_balances(self, requests):
+        usage = {}
+        for lr in requests:
+            entry = usage.setdefault((lr.employee_id, lr.leave_type_id, lr.start_date.year), [0, 0])
+            if lr.status == 'approved':
+                entry[0] += lr.total_days
+            elif lr.status in ('pending', 'manager_approved', 'hr_approved', 'ceo_approved'):
+                entry[1] += lr.total_days
+
+        entitled_by_type = {lt.id: entitled for lt, entitled, _ in self.leave_types}
+        employee_ids = sorted({lr.employee_id for lr in requests})
+        balances = []
+        for employee_id in employee_ids:
+            for year in range(self.first_year, self.today.year + 1):
+                for lt, _, _ in self.leave_types:
+                    used, pending = usage.get((employee_id, lt.id, year), (0, 0))
+                    balances.append(LeaveBalance(
+                        employee_id=employee_id, leave_type=lt, year=year,
+                        entitled_days=max(entitled_by_type[lt.id], used + pending),
+                        used_days=used, pending_days=pending,
+                    ))
+        LeaveBalance.objects.bulk_create(balances, batch_size=self.batch_size, ignore_conflicts=True)
+        self.counts['balances'] += len(balances)
+
+    def _create_interrupts(self, employee_ids):
+        """Recall/early-return records on a slice of approved leave, with their audit logs."""
+        if self.interrupt_rate <= 0:
+            return
+        # Re-read ids: bulk_create does not return primary keys on every backend (MySQL)
+        approved = list(
+            LeaveRequest.objects.filter(employee_id__in=employee_ids, status='approved')
+            .order_by('id').values_list('id', 'employee_id', 'start_date', 'end_date', 'approval_date')
+        )
+        picked = [row for row in approved if self.rng.random() < self.interrupt_rate and row[3] > row[2]]
+        if not picked:
+            return
+
+        interrupts = []
+        for lr_id, employee_id, start, end, approved_at in picked:
+            kind = self.rng.choice(['staff_return', 'manager_recall'])
+            aff_name, manager_id = self.employee_meta[employee_id]
+            resume = start + timedelta(days=self.rng.randint(1, (end - start).days))
+            stamp = approved_at or self._stamp(start, 9)
+            ir = LeaveInterruptRequest(
+                leave_request_id=lr_id, type=kind, status=self.rng.choice(['approved', 'approved', 'rejected']),
+                requested_resume_date=resume, reason='Generated interrupt',
+                initiated_by_id=employee_id if kind == 'staff_return' else (manager_id or self.ceo_ids[aff_name]),
+                initiated_role='staff' if kind == 'staff_return' else 'manager',
+                created_at=stamp, updated_at=stamp,
+            )
+            if ir.status == 'approved':
+                ir.credited_working_days = sum(
+                    1 for d in range((end - resume).days + 1) if (resume + timedelta(days=d)).weekday() < 5
+                )
+                ir.applied_at = stamp
+            interrupts.append(ir)
+        with preserved_timestamps(LeaveInterruptRequest):
+            LeaveInterruptRequest.objects.bulk_create(interrupts, batch_size=self.batch_size)
+        self.counts['interrupts'] += len(interrupts)
+
+        ids = dict(
+            LeaveInterruptRequest.objects.filter(leave_request_id__in=[row[0] for row in picked])
+            .values_list('leave_request_id', 'id')
+        )
+        logs = []
+        for ir in interrupts:
+            events = ['requested', 'staff_accepted' if ir.type == 'manager_recall' else 'manager_approved']
+            events.append('applied' if ir.status == 'approved' else 'manager_rejected')
+            for event in events:
+                logs.append(LeaveInterruptLog(
+                    leave_request_id=ir.leave_request_id, interrupt_request_id=ids[ir.leave_request_id],
+                    actor_id=ir.initiated_by_id, event=event, credited_days=ir.credited_working_days
+                    if event == 'applied' else 0, created_at=ir.created_at,
+                ))
+        with preserved_timestamps(LeaveInterruptLog):
+            LeaveInterruptLog.objects.bulk_create(logs, batch_size=self.batch_size)
+        self.counts['interrupt_logs'] += len(logs)
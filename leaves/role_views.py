@@ -10,17 +10,20 @@ from rest_framework.permissions import IsAuthenticated
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 
-from leaves.models import LeaveType, LeaveBalance
+from leave_management import reference_data
+from leave_management.conditional import ConditionalGetMixin
 from users.models import CustomUser
 from leaves.serializers import LeaveTypeSerializer
+from leaves.balances import LeaveBalanceService
 
 
-class RoleEntitlementViewSet(viewsets.ViewSet):
+class RoleEntitlementViewSet(ConditionalGetMixin, viewsets.ViewSet):
     """
     ViewSet for managing role-based leave entitlements.
     HR can configure entitlements for different roles (junior_staff, senior_staff, etc.)
     """
     permission_classes = [IsAuthenticated]
+    conditional_resources = {'list': ('leave-types', 'entitlements')}
 
     def _is_hr(self, request) -> bool:
         """Check if user is HR or admin"""
@@ -29,69 +32,44 @@ class RoleEntitlementViewSet(viewsets.ViewSet):
             hasattr(user, 'role') and getattr(user, 'role') in ['hr', 'admin']
         )
 
+    @staticmethod
+    def _entitlement_rows(leave_types, stats):
+        """One row per active leave type; `entitled_days` is the most common value in the role."""
+        rows = []
+        for leave_type in leave_types:
+            lt_stats = stats.get(leave_type.id, {})
+            rows.append({
+                'leave_type_id': leave_type.id,
+                'leave_type_name': leave_type.name,
+                'entitled_days': lt_stats.get('entitled_days', 0),
+                'min_days': lt_stats.get('min_days', 0),
+                'max_days': lt_stats.get('max_days', 0),
+                'users_with_balance': lt_stats.get('user_count', 0),
+            })
+        return rows
+
     def list(self, request):
         """Get list of all roles and their current entitlements"""
         if not self._is_hr(request):
             return Response({'detail': 'Only HR can access this resource'}, status=status.HTTP_403_FORBIDDEN)
 
-        User = get_user_model()
         current_year = timezone.now().year
         # If HR is tied to an affiliate, scope the counts to that affiliate (via department or direct affiliate)
         user_affiliate = getattr(getattr(request.user, 'affiliate', None), 'id', None)
-        from django.db.models import Q
-        
-        # Get all role choices
-        role_choices = CustomUser.ROLE_CHOICES
-        leave_types = LeaveType.objects.filter(is_active=True)
-        
+        if getattr(request.user, 'is_superuser', False):
+            user_affiliate = None
+
+        leave_types = reference_data.leave_types.active()
+        overview = LeaveBalanceService.role_entitlement_overview(current_year, user_affiliate)
+
         roles_data = []
-        legacy_map = {
-            'junior_staff': ['employee', 'staff'],
-            'manager': ['hod'],
-        }
-        for role_code, role_display in role_choices:
-            # Get users with this role, including legacy aliases
-            legacy_aliases = legacy_map.get(role_code, [])
-            role_filter = Q(role=role_code)
-            for alias in legacy_aliases:
-                role_filter |= Q(role=alias)
-            users_with_role = User.objects.filter(is_active=True).filter(role_filter)
-            if user_affiliate and not getattr(request.user, 'is_superuser', False):
-                users_with_role = users_with_role.filter(
-                    Q(department__affiliate_id=user_affiliate) | Q(affiliate_id=user_affiliate)
-                )
-            user_count = users_with_role.count()
-            
-            # Get current entitlements for this role (sample from first user)
-            entitlements = {}
-            if user_count > 0:
-                sample_user = users_with_role.first()
-                balances = LeaveBalance.objects.filter(
-                    employee=sample_user,
-                    year=current_year
-                ).select_related('leave_type')
-                
-                for balance in balances:
-                    entitlements[balance.leave_type.id] = {
-                        'leave_type_id': balance.leave_type.id,
-                        'leave_type_name': balance.leave_type.name,
-                        'entitled_days': balance.entitled_days
-                    }
-            
-            # Fill in missing leave types with 0
-            for leave_type in leave_types:
-                if leave_type.id not in entitlements:
-                    entitlements[leave_type.id] = {
-                        'leave_type_id': leave_type.id,
-                        'leave_type_name': leave_type.name,
-                        'entitled_days': 0
-                    }
-            
+        for role_code, role_display in CustomUser.ROLE_CHOICES:
+            role_stats = overview.get(role_code, {})
             roles_data.append({
                 'role_code': role_code,
                 'role_display': role_display,
-                'user_count': user_count,
-                'entitlements': list(entitlements.values())
+                'user_count': role_stats.get('user_count', 0),
+                'entitlements': self._entitlement_rows(leave_types, role_stats.get('entitlements', {})),
             })
         
         return Response({
@@ -144,8 +122,8 @@ class RoleEntitlementViewSet(viewsets.ViewSet):
 
         # Validate entitlements data
         errors = []
-        entitlements_to_apply = []
-        
+        parsed = []
+
         for idx, entitlement in enumerate(entitlements_data):
             try:
                 leave_type_id = int(entitlement.get('leave_type_id'))
@@ -157,45 +135,31 @@ class RoleEntitlementViewSet(viewsets.ViewSet):
             if entitled_days < 0:
                 errors.append({'index': idx, 'error': 'entitled_days must be non-negative'})
                 continue
-            
-            try:
-                leave_type = LeaveType.objects.get(pk=leave_type_id, is_active=True)
-                entitlements_to_apply.append((leave_type, entitled_days))
-            except LeaveType.DoesNotExist:
+            parsed.append((idx, leave_type_id, entitled_days))
+
+        # Resolve all referenced leave types in one query
+        leave_types = LeaveBalanceService.active_leave_types(lt_id for _, lt_id, _ in parsed)
+        entitlements_to_apply = {}
+        for idx, leave_type_id, entitled_days in parsed:
+            if leave_type_id not in leave_types:
                 errors.append({'index': idx, 'error': f'LeaveType {leave_type_id} not found or inactive'})
                 continue
+            entitlements_to_apply[leave_type_id] = entitled_days
 
         if errors:
+            errors.sort(key=lambda e: e['index'])
             return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
 
         # Apply entitlements to all users with this role
-        updated_count = 0
-        created_count = 0
-        
-        for user in users_with_role:
-            for leave_type, entitled_days in entitlements_to_apply:
-                balance, was_created = LeaveBalance.objects.get_or_create(
-                    employee=user,
-                    leave_type=leave_type,
-                    year=current_year,
-                    defaults={
-                        'entitled_days': entitled_days,
-                        'used_days': 0,
-                        'pending_days': 0
-                    }
-                )
-                
-                if was_created:
-                    created_count += 1
-                elif balance.entitled_days != entitled_days:
-                    balance.entitled_days = entitled_days
-                    balance.save(update_fields=['entitled_days', 'updated_at'])
-                    updated_count += 1
+        user_ids = list(users_with_role.values_list('id', flat=True))
+        counts = LeaveBalanceService.upsert_entitlements(user_ids, entitlements_to_apply, current_year)
+        updated_count = counts['updated']
+        created_count = counts['created']
 
         return Response({
             'message': f'Entitlements updated for role: {role_code}',
             'role_code': role_code,
-            'users_affected': users_with_role.count(),
+            'users_affected': len(user_ids),
             'balances_updated': updated_count,
             'balances_created': created_count,
             'year': current_year
@@ -212,58 +176,19 @@ class RoleEntitlementViewSet(viewsets.ViewSet):
         if role_code not in valid_roles:
             return Response({'error': f'Invalid role: {role_code}'}, status=status.HTTP_400_BAD_REQUEST)
 
-        User = get_user_model()
         current_year = timezone.now().year
         user_affiliate = getattr(getattr(request.user, 'affiliate', None), 'id', None)
-        from django.db.models import Q
-        
-        legacy_map = {
-            'junior_staff': ['employee', 'staff'],
-            'manager': ['hod'],
-        }
-        legacy_aliases = legacy_map.get(role_code, [])
-        role_filter = Q(role=role_code)
-        for alias in legacy_aliases:
-            role_filter |= Q(role=alias)
-        users_with_role = User.objects.filter(is_active=True).filter(role_filter)
-        if user_affiliate and not getattr(request.user, 'is_superuser', False) and getattr(request.user, 'role', None) not in ['hr']:
-            users_with_role = users_with_role.filter(
-                Q(department__affiliate_id=user_affiliate) | Q(affiliate_id=user_affiliate)
-            )
-        
+        if getattr(request.user, 'is_superuser', False) or getattr(request.user, 'role', None) in ['hr']:
+            user_affiliate = None
+
         role_display = dict(CustomUser.ROLE_CHOICES).get(role_code, role_code)
-        
-        # Get leave types and current entitlements
-        leave_types = LeaveType.objects.filter(is_active=True)
-        entitlements = []
-        
-        if users_with_role.exists():
-            sample_user = users_with_role.first()
-            balances = LeaveBalance.objects.filter(
-                employee=sample_user,
-                year=current_year
-            ).select_related('leave_type')
-            
-            balance_dict = {b.leave_type.id: b.entitled_days for b in balances}
-            
-            for leave_type in leave_types:
-                entitlements.append({
-                    'leave_type_id': leave_type.id,
-                    'leave_type_name': leave_type.name,
-                    'entitled_days': balance_dict.get(leave_type.id, 0)
-                })
-        else:
-            for leave_type in leave_types:
-                entitlements.append({
-                    'leave_type_id': leave_type.id,
-                    'leave_type_name': leave_type.name,
-                    'entitled_days': 0
-                })
+        leave_types = reference_data.leave_types.active()
+        role_stats = LeaveBalanceService.role_entitlement_overview(current_year, user_affiliate).get(role_code, {})
 
         return Response({
             'role_code': role_code,
             'role_display': role_display,
-            'user_count': users_with_role.count(),
-            'entitlements': entitlements,
+            'user_count': role_stats.get('user_count', 0),
+            'entitlements': self._entitlement_rows(leave_types, role_stats.get('entitlements', {})),
             'year': current_year
-        })
\ No newline at end of file
+        })
@@ -1,7 +1,9 @@
 from rest_framework import serializers
 from django.utils import timezone
-from django.db.models import Q
-from .models import LeaveRequest, LeaveType, LeaveBalance, LeaveGradeEntitlement, LeaveInterruptRequest, LeaveResumeEvent
+from django.db.models import Prefetch, Q
+from .models import (
+    LeaveRequest, LeaveType, LeaveBalance, LeaveGradeEntitlement, LeaveInterruptRequest, LeaveInterruptLog, LeaveResumeEvent,
+)
 from users.models import EmploymentGrade
 from django.contrib.auth import get_user_model
 from django.utils import timezone as dj_timezone
@@ -9,6 +11,15 @@ from django.utils import timezone as dj_timezone
 User = get_user_model()
 
 
+def with_timeline_relations(queryset):
+    """Load what _build_timeline_events and the list serializers read, in constant queries."""
+    return queryset.select_related(
+        'leave_type', 'manager_approved_by', 'hr_approved_by', 'ceo_approved_by', 'approved_by',
+    ).prefetch_related(
+        Prefetch('interrupt_logs', queryset=LeaveInterruptLog.objects.select_related('actor', 'interrupt_request'))
+    )
+
+
 def _build_timeline_events(obj, viewer=None):
     """Assemble chronological approval/interrupt events for UI timelines."""
     events = []
@@ -48,7 +59,10 @@ def _build_timeline_events(obj, viewer=None):
         add_event('finalized', approval_actor, getattr(approval_actor, 'role', None), approval_ts, getattr(obj, 'approval_comments', '') or '')
 
     try:
-        logs = list(getattr(obj, 'interrupt_logs', []).all().select_related('actor', 'interrupt_request'))
+        if 'interrupt_logs' in getattr(obj, '_prefetched_objects_cache', {}):
+            logs = list(obj.interrupt_logs.all())
+        else:
+            logs = list(obj.interrupt_logs.all().select_related('actor', 'interrupt_request'))
     except Exception:
         logs = []
 
@@ -478,6 +492,32 @@ class LeaveRequestListSerializer(serializers.ModelSerializer):
     # total_days is computed in model.save() (working days). Expose as read-only.
 
 
+def with_queue_relations(queryset):
+    """Load what LeaveRequestQueueSerializer reads in the same query."""
+    return queryset.select_related('employee__department__affiliate', 'employee__affiliate', 'leave_type')
+
+
+class LeaveRequestQueueSerializer(serializers.ModelSerializer):
+    """Lightweight rows for approval queues and activity lists: no timelines or per-row lookups.
+
+    Use with `with_queue_relations` so serializing a page runs no extra queries.
+    """
+    employee_name = serializers.CharField(source='employee.get_full_name', read_only=True)
+    employee_email = serializers.CharField(source='employee.email', read_only=True)
+    employee_department = serializers.CharField(source='employee.department.name', read_only=True, default=None)
+    leave_type_name = serializers.CharField(source='leave_type.name', read_only=True)
+    status_display = serializers.CharField(source='get_dynamic_status_display', read_only=True)
+
+    class Meta:
+        model = LeaveRequest
+        fields = [
+            'id', 'employee', 'employee_name', 'employee_email', 'employee_department',
+            'leave_type', 'leave_type_name', 'start_date', 'end_date', 'total_days',
+            'status', 'status_display', 'created_at', 'updated_at',
+        ]
+        read_only_fields = fields
+
+
 class LeaveApprovalSerializer(serializers.ModelSerializer):
     """Serializer for manager approval/rejection actions"""
     
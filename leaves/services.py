@@ -4,6 +4,8 @@ Leave management services implementing business logic with OOP patterns.
 Uses Strategy Pattern and Inheritance for different approval workflows.
 """
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
 from typing import Optional, Dict, Any
 from django.db import models, transaction
 import logging
@@ -14,6 +16,9 @@ from users.models import Affiliate, CustomUser
 
 User = get_user_model()
 
+# {affiliate_id: CEO} while ApprovalRoutingService.cached_ceo_lookups() is active
+_ceo_lookup_cache: ContextVar[Optional[dict]] = ContextVar('ceo_lookup_cache', default=None)
+
 
 class ApprovalRoutingService:
     """
@@ -54,6 +59,30 @@ class ApprovalRoutingService:
             logger.debug(f"No affiliate found for employee {getattr(employee, 'email', '?')}, using default CEO")
             return cls._get_default_ceo()
 
+        memo = _ceo_lookup_cache.get()
+        if memo is not None:
+            if affiliate.id not in memo:
+                memo[affiliate.id] = cls._get_affiliate_ceo(affiliate)
+            return memo[affiliate.id]
+        return cls._get_affiliate_ceo(affiliate)
+
+    @classmethod
+    @contextmanager
+    def cached_ceo_lookups(cls):
+        """Memoize CEO lookups per affiliate inside the block.
+
+        Approval queues check the expected CEO for every candidate request; with this
+        active the lookup runs once per affiliate instead of once per request.
+        """
+        token = _ceo_lookup_cache.set({})
+        try:
+            yield
+        finally:
+            _ceo_lookup_cache.reset(token)
+
+    @classmethod
+    def _get_affiliate_ceo(cls, affiliate) -> Optional[CustomUser]:
+        logger = logging.getLogger('leaves')
         # CEOs are looked up strictly by their affiliate
         try:
             ceo = (
@@ -68,12 +97,17 @@ class ApprovalRoutingService:
                 logger.warning(f"No CEO found for affiliate {getattr(affiliate, 'name', '?')} (id={getattr(affiliate, 'id', None)}), using default CEO")
                 return cls._get_default_ceo()
         except Exception as e:
-            logger.exception("Failed to determine CEO for employee %s: %s", getattr(employee, 'id', None), e)
+            logger.exception("Failed to determine CEO for affiliate %s: %s", getattr(affiliate, 'id', None), e)
             return cls._get_default_ceo()
     
     @classmethod
     def _get_default_ceo(cls) -> Optional[CustomUser]:
         """Fallback CEO: any active CEO user (first)."""
+        memo = _ceo_lookup_cache.get()
+        if memo is not None:
+            if None not in memo:
+                memo[None] = User.objects.filter(role='ceo', is_active=True).first()
+            return memo[None]
         return User.objects.filter(role='ceo', is_active=True).first()
     
     @classmethod
@@ -0,0 +1,79 @@
+"""
+Cache invalidation hooks for leave data.
+
+Connected from LeavesConfig.ready().
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from leave_management import reference_data
+from leave_management.caching import bump_version
+from leave_management.conditional import bump_resources
+from .balances import ENTITLEMENTS_VERSION
+from .dashboard import bump_employee_versions
+from .models import (
+    LeaveBalance, LeaveGradeEntitlement, LeaveInterruptLog, LeaveInterruptRequest, LeaveRequest, LeaveResumeEvent,
+    LeaveType,
+)
+
+
+@receiver(post_save, sender=LeaveBalance, dispatch_uid='leaves.balance_entitlement_saved')
+def balance_entitlement_saved(sender, instance, created, update_fields=None, **kwargs):
+    # Usage-only refreshes (update_balance) do not change entitlements
+    if created or update_fields is None or 'entitled_days' in update_fields:
+        bump_version(ENTITLEMENTS_VERSION)
+        bump_resources('entitlements')
+
+
+@receiver(post_delete, sender=LeaveBalance, dispatch_uid='leaves.balance_deleted')
+def balance_deleted(sender, instance, **kwargs):
+    bump_version(ENTITLEMENTS_VERSION)
+    bump_resources('entitlements')
+
+
+@receiver(post_save, sender='users.CustomUser', dispatch_uid='leaves.user_saved_entitlements')
+@receiver(post_delete, sender='users.CustomUser', dispatch_uid='leaves.user_deleted_entitlements')
+def user_changed(sender, instance, update_fields=None, **kwargs):
+    # Role, affiliate and active-flag changes move users between overview buckets
+    if update_fields is None or {'role', 'is_active', 'affiliate', 'department'} & set(update_fields):
+        bump_version(ENTITLEMENTS_VERSION)
+        bump_resources('entitlements')
+
+
+@receiver(post_save, sender=LeaveRequest, dispatch_uid='leaves.request_saved_employee_data')
+@receiver(post_delete, sender=LeaveRequest, dispatch_uid='leaves.request_deleted_employee_data')
+@receiver(post_save, sender=LeaveBalance, dispatch_uid='leaves.balance_saved_employee_data')
+@receiver(post_delete, sender=LeaveBalance, dispatch_uid='leaves.balance_deleted_employee_data')
+def employee_leave_data_changed(sender, instance, **kwargs):
+    bump_employee_versions([instance.employee_id])
+    if sender is LeaveRequest:
+        bump_resources('leave-requests')
+    else:
+        bump_resources(f'leave-balances:{instance.employee_id}')
+
+
+@receiver(post_save, sender=LeaveInterruptRequest, dispatch_uid='leaves.interrupt_saved_employee_data')
+@receiver(post_delete, sender=LeaveInterruptRequest, dispatch_uid='leaves.interrupt_deleted_employee_data')
+@receiver(post_save, sender=LeaveInterruptLog, dispatch_uid='leaves.interrupt_log_saved_employee_data')
+@receiver(post_save, sender=LeaveResumeEvent, dispatch_uid='leaves.resume_saved_employee_data')
+def leave_activity_changed(sender, instance, **kwargs):
+    # Interrupts and resumes change the owning request's timeline
+    if sender.leave_request.is_cached(instance):
+        employee_id = instance.leave_request.employee_id
+    else:
+        employee_id = LeaveRequest.objects.filter(pk=instance.leave_request_id).values_list('employee_id', flat=True).first()
+    bump_employee_versions([employee_id])
+    bump_resources('leave-requests')
+
+
+@receiver(post_save, sender=LeaveType, dispatch_uid='leaves.reference_leave_type_saved')
+@receiver(post_delete, sender=LeaveType, dispatch_uid='leaves.reference_leave_type_deleted')
+def reference_leave_type_changed(sender, instance, **kwargs):
+    reference_data.leave_types.changed()
+    bump_resources('leave-types')
+
+
+@receiver(post_save, sender=LeaveGradeEntitlement, dispatch_uid='leaves.grade_entitlement_saved')
+@receiver(post_delete, sender=LeaveGradeEntitlement, dispatch_uid='leaves.grade_entitlement_deleted')
+def grade_entitlement_changed(sender, instance, **kwargs):
+    bump_resources('grade-entitlements')
@@ -0,0 +1,259 @@
+"""
+Columnar snapshot of leave data for analytics (build_analytics_snapshot).
+
+Analytics and reports used to re-read the OLTP tables on every call. The snapshot
+builder materializes the columns they need from leave requests, balances and
+users into Arrow IPC files under ANALYTICS_SNAPSHOT_DIR, plus a manifest.json
+naming the snapshot generation. Readers memory-map the files: the operating
+system shares the pages between every gunicorn worker, Arrow buffers point into
+the mapping without copying, and only the rows a report filters to (one year of
+requests, say) are materialized as pandas frames.
+
+Refreshes are incremental. Rows whose `updated_at` is at or after the previous
+high-water mark replace their old versions, and rows no longer in the table
+(one narrow id query per table) are dropped. QuerySet.update() bypasses
+`updated_at`, so a change of the global resource version, which every bulk
+write path bumps (leave_management.conditional), forces a full rebuild, as
+does --full. The command can only see those versions through a shared cache;
+with the default per-process cache every run is a full rebuild.
+
+Files are replaced atomically, and the manifest last; mapped readers keep
+their old inode until they reopen.
+"""
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.ipc as ipc
+from django.conf import settings
+from django.utils import timezone
+
+from leave_management.caching import get_version
+from leave_management.conditional import ALL_RESOURCES, resource_version_name
+from users.models import CustomUser
+from .models import LeaveBalance, LeaveRequest
+
+
+logger = logging.getLogger('leaves')
+
+MANIFEST = 'manifest.json'
+
+
+@dataclass(frozen=True)
+class SnapshotTable:
+    name: str
+    model: type
+    schema: pa.Schema
+
+    @property
+    def filename(self) -> str:
+        return f'{self.name}.arrow'
+
+    def queryset(self):
+        return self.model.objects.order_by()
+
+
+_UTC_TIMESTAMP = pa.timestamp('us', tz='UTC')
+
+TABLES = (
+    SnapshotTable('leave_requests', LeaveRequest, pa.schema([
+        ('id', pa.int64()), ('employee_id', pa.int64()), ('leave_type_id', pa.int64()), ('status', pa.string()),
+        ('start_date', pa.date32()), ('end_date', pa.date32()), ('total_days', pa.int64()),
+        ('interruption_credited_days', pa.int64()), ('created_at', _UTC_TIMESTAMP),
+        ('approval_date', _UTC_TIMESTAMP), ('updated_at', _UTC_TIMESTAMP),
+    ])),
+    SnapshotTable('leave_balances', LeaveBalance, pa.schema([
+        ('id', pa.int64()), ('employee_id', pa.int64()), ('leave_type_id', pa.int64()), ('year', pa.int64()),
+        ('entitled_days', pa.int64()), ('used_days', pa.int64()), ('pending_days', pa.int64()),
+        ('updated_at', _UTC_TIMESTAMP),
+    ])),
+    SnapshotTable('users', CustomUser, pa.schema([
+        ('id', pa.int64()), ('department_id', pa.int64()), ('affiliate_id', pa.int64()), ('grade_id', pa.int64()),
+        ('is_active', pa.bool_()), ('updated_at', _UTC_TIMESTAMP),
+    ])),
+)
+
+
+def snapshot_dir() -> str:
+    return str(getattr(settings, 'ANALYTICS_SNAPSHOT_DIR', os.path.join(settings.BASE_DIR, 'data', 'analytics')))
+
+
+def _all_version() -> int:
+    return get_version(resource_version_name(ALL_RESOURCES))
+
+
+def _write_atomic(path, write):
+    tmp = f'{path}.tmp'
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def _read(path) -> pa.Table:
+    """Memory-map an Arrow IPC file; the table's buffers point into the mapping."""
+    return ipc.open_file(pa.memory_map(path, 'r')).read_all()
+
+
+class AnalyticsSnapshotBuilder:
+    """Build or incrementally refresh the snapshot files in `directory`."""
+
+    BATCH_SIZE = 50000
+    # Rows committed while a refresh runs may carry an earlier updated_at; the windows overlap
+    OVERLAP = timedelta(seconds=60)
+
+    def __init__(self, directory=None, batch_size=None):
+        self.directory = directory or snapshot_dir()
+        self.batch_size = batch_size or self.BATCH_SIZE
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def read_manifest(self):
+        try:
+            with open(self._path(MANIFEST)) as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return None
+
+    def _fetch(self, table, queryset) -> pa.Table:
+        """Arrow table of `queryset` rows, converted in batches of columns."""
+        names = table.schema.names
+        batches = []
+        rows = queryset.values_list(*names).iterator(chunk_size=self.batch_size)
+        while True:
+            chunk = [row for _, row in zip(range(self.batch_size), rows)]
+            if not chunk:
+                break
+            columns = list(zip(*chunk))
+            batches.append(pa.record_batch(
+                [pa.array(col, type=field.type) for col, field in zip(columns, table.schema)], schema=table.schema,
+            ))
+        return pa.Table.from_batches(batches, schema=table.schema)
+
+    def _refresh(self, table, previous, since):
+        """Previous rows minus changed and deleted ones, plus the changed rows."""
+        changed = self._fetch(table, table.queryset().filter(updated_at__gte=since))
+        live_ids = pa.array(table.queryset().values_list('id', flat=True), type=pa.int64())
+        keep = pc.and_(
+            pc.is_in(previous['id'], value_set=live_ids),
+            pc.invert(pc.is_in(previous['id'], value_set=changed['id'].combine_chunks())),
+        )
+        return pa.concat_tables([previous.filter(keep), changed]), changed.num_rows
+
+    def build(self, full=False) -> dict:
+        """Write the snapshot; returns {'mode', 'generation', '<table>': rows, '<table>_changed': rows}."""
+        os.makedirs(self.directory, exist_ok=True)
+        manifest = self.read_manifest()
+        all_version = _all_version()
+        incremental = (
+            not full and manifest is not None and manifest.get('all_version') == all_version
+            and all(os.path.exists(self._path(t.filename)) for t in TABLES)
+        )
+        started = timezone.now() - self.OVERLAP
+
+        summary = {'mode': 'incremental' if incremental else 'full'}
+        tables = {}
+        for table in TABLES:
+            if incremental:
+                since = datetime.fromisoformat(manifest['tables'][table.name]['high_water'])
+                data, changed = self._refresh(table, _read(self._path(table.filename)), since)
+            else:
+                data = self._fetch(table, table.queryset())
+                changed = data.num_rows
+
+            def write(path, data=data):
+                with pa.OSFile(path, 'wb') as sink, ipc.new_file(sink, data.schema) as writer:
+                    writer.write_table(data, max_chunksize=self.batch_size)
+
+            _write_atomic(self._path(table.filename), write)
+            tables[table.name] = {'file': table.filename, 'rows': data.num_rows, 'high_water': started.isoformat()}
+            summary[table.name] = data.num_rows
+            summary[f'{table.name}_changed'] = changed
+
+        generation = (manifest or {}).get('generation', 0) + 1
+        new_manifest = {
+            'generation': generation, 'built_at': timezone.now().isoformat(), 'all_version': all_version,
+            'tables': tables,
+        }
+
+        def write_manifest(path):
+            with open(path, 'w') as fh:
+                json.dump(new_manifest, fh, indent=2)
+
+        _write_atomic(self._path(MANIFEST), write_manifest)
+        summary['generation'] = generation
+        return summary
+
+
+class AnalyticsSnapshot:
+    """A memory-mapped snapshot generation."""
+
+    def __init__(self, directory, manifest):
+        self.directory = directory
+        self.generation = manifest['generation']
+        self.built_at = datetime.fromisoformat(manifest['built_at'])
+        self.tables = {
+            name: _read(os.path.join(directory, meta['file'])) for name, meta in manifest['tables'].items()
+        }
+
+    def requests_frame(self, year):
+        """Approved requests overlapping `year`, in leaves.analytics.REQUEST_COLUMNS order."""
+        table = self.tables['leave_requests']
+        mask = pc.and_(
+            pc.and_(pc.equal(table['status'], 'approved'), pc.less_equal(table['start_date'], date(year, 12, 31))),
+            pc.greater_equal(table['end_date'], date(year, 1, 1)),
+        )
+        frame = table.filter(mask).select([
+            'employee_id', 'leave_type_id', 'start_date', 'end_date', 'total_days', 'interruption_credited_days',
+            'created_at', 'approval_date',
+        ]).to_pandas(date_as_object=True)
+        return frame.rename(columns={'interruption_credited_days': 'credited_days'})
+
+    def users_frame(self):
+        """User ids and dimension keys, in leaves.analytics.USER_COLUMNS order."""
+        table = self.tables['users'].select(['id', 'department_id', 'affiliate_id', 'grade_id', 'is_active'])
+        return table.rename_columns(['employee_id', 'department_id', 'affiliate_id', 'grade_id', 'is_active']).to_pandas()
+
+    def entitlements_frame(self, year):
+        table = self.tables['leave_balances']
+        return table.filter(pc.equal(table['year'], year)).select(
+            ['employee_id', 'leave_type_id', 'entitled_days']
+        ).to_pandas()
+
+
+_current = {'key': None, 'snapshot': None}
+_lock = threading.Lock()
+
+
+def current_snapshot():
+    """The latest snapshot younger than ANALYTICS_SNAPSHOT_MAX_AGE, or None (read the database).
+
+    Reopened only when the manifest changes; each worker maps the same files.
+    """
+    if not getattr(settings, 'ANALYTICS_SNAPSHOT_ENABLED', True):
+        return None
+    directory = snapshot_dir()
+    path = os.path.join(directory, MANIFEST)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    key = (path, stat.st_ino, stat.st_mtime_ns)
+    with _lock:
+        if _current['key'] != key:
+            try:
+                with open(path) as fh:
+                    snapshot = AnalyticsSnapshot(directory, json.load(fh))
+            except (OSError, ValueError, KeyError, pa.ArrowException):
+                logger.warning('Analytics snapshot in %s is unreadable; using the database', directory, exc_info=True)
+                snapshot = None
+            _current.update(key=key, snapshot=snapshot)
+        snapshot = _current['snapshot']
+    max_age = getattr(settings, 'ANALYTICS_SNAPSHOT_MAX_AGE', 900)
+    if snapshot is None or timezone.now() - snapshot.built_at > timedelta(seconds=max_age):
+        return None
+    return snapshot
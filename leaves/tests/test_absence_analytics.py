@@ -0,0 +1,91 @@
+from datetime import date, datetime, timezone as dt_timezone
+
+import pandas as pd
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from leave_management.testing import seed_query_budget_dataset
+from leaves.analytics import REQUEST_COLUMNS, compute_absence_analytics
+from leaves.models import LeaveType
+from users.models import CustomUser
+
+
+class AbsenceAnalyticsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_query_budget_dataset(staff_per_group=2)
+
+    def test_metrics_from_frames(self):
+        sick = LeaveType.objects.get(name='Sick').pk
+        annual = LeaveType.objects.get(name='Annual').pk
+        users = pd.DataFrame([
+            {'employee_id': 1, 'department': 'Finance', 'affiliate': 'Merban', 'grade': 'A', 'is_active': True},
+            {'employee_id': 2, 'department': 'Finance', 'affiliate': 'Merban', 'grade': 'A', 'is_active': True},
+        ])
+        submitted = datetime(2026, 1, 1, 8, tzinfo=dt_timezone.utc)
+        approved = datetime(2026, 1, 2, 8, tzinfo=dt_timezone.utc)
+        requests = pd.DataFrame.from_records([
+            # Fri 30 Jan - Mon 2 Feb: one working day in each month
+            (1, sick, date(2026, 1, 30), date(2026, 2, 2), 2, 0, submitted, approved),
+            (1, sick, date(2026, 3, 2), date(2026, 3, 2), 1, 0, submitted, approved),
+            # Four working days, two credited back by an early return
+            (2, annual, date(2026, 3, 9), date(2026, 3, 12), 4, 2, submitted, approved),
+        ], columns=REQUEST_COLUMNS)
+        entitlements = pd.DataFrame({'employee_id': [1, 2], 'leave_type_id': [annual, annual], 'entitled_days': [20, 20]})
+
+        result = compute_absence_analytics(
+            2026, as_of=date(2026, 3, 31), users=users, requests=requests, entitlements=entitlements,
+        )
+        finance = result['by_department'][0]
+        self.assertEqual(finance['key'], 'Finance')
+        self.assertEqual((finance['headcount'], finance['spells'], finance['absence_days']), (2, 3, 5.0))
+        self.assertEqual(finance['absence_rate'], round(5 / (2 * result['working_days']), 4))
+        # Employee 1: two spells, three days -> 2^2 x 3 = 12
+        self.assertEqual((finance['bradford_max'], finance['bradford_mean']), (12.0, 6.0))
+        self.assertEqual(finance['utilization'], 0.05)
+        self.assertEqual(finance['approval_hours_p50'], 24.0)
+
+        months = {row['key']: row for row in result['by_month']}
+        self.assertEqual([months[m]['absence_days'] for m in ('2026-01', '2026-02', '2026-03')], [1.0, 1.0, 3.0])
+        self.assertEqual(months['2026-04']['working_days'], 0)
+        self.assertIsNone(months['2026-04']['absence_rate'])
+
+    def test_future_year_has_no_elapsed_days(self):
+        annual = LeaveType.objects.get(name='Annual').pk
+        users = pd.DataFrame([
+            {'employee_id': 1, 'department': 'Finance', 'affiliate': 'Merban', 'grade': 'A', 'is_active': True},
+        ])
+        submitted = datetime(2026, 10, 1, 8, tzinfo=dt_timezone.utc)
+        requests = pd.DataFrame.from_records([
+            (1, annual, date(2027, 1, 4), date(2027, 1, 8), 5, 0, submitted, submitted),
+        ], columns=REQUEST_COLUMNS)
+        entitlements = pd.DataFrame({'employee_id': [1], 'leave_type_id': [annual], 'entitled_days': [20]})
+
+        result = compute_absence_analytics(
+            2027, as_of=date(2026, 10, 19), users=users, requests=requests, entitlements=entitlements,
+        )
+        self.assertEqual((result['as_of'], result['working_days']), ('2026-12-31', 0))
+        finance = result['by_department'][0]
+        self.assertEqual((finance['absence_days'], finance['absence_rate']), (0.0, None))
+        self.assertEqual({row['working_days'] for row in result['by_month']}, {0})
+
+    def test_endpoint_is_hr_only_and_cached(self):
+        cache.clear()
+        url = '/api/leaves/analytics/absence/?group=department'
+        staff = APIClient()
+        staff.force_authenticate(self.data.staff[0])
+        self.assertEqual(staff.get(url).status_code, 403)
+
+        hr = APIClient()
+        hr.force_authenticate(self.data.hr)
+        first = hr.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual({'by_department'}, {k for k in first.data if k.startswith('by_')})
+        self.assertEqual(sum(row['headcount'] for row in first.data['by_department']),
+                         CustomUser.objects.filter(is_active=True).count())
+        with self.assertNumQueries(0):
+            again = hr.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(again.status_code, 304)
+        with self.assertNumQueries(0):
+            self.assertEqual(hr.get('/api/leaves/analytics/absence/').status_code, 200)
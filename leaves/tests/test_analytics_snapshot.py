@@ -0,0 +1,64 @@
+import tempfile
+from datetime import date, timedelta
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from leave_management.testing import seed_query_budget_dataset
+from leaves.analytics import absence_analytics
+from leaves.models import LeaveRequest, LeaveType
+from leaves.snapshots import AnalyticsSnapshotBuilder, current_snapshot
+
+
+class AnalyticsSnapshotTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_query_budget_dataset(staff_per_group=2)
+
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.settings_override = override_settings(ANALYTICS_SNAPSHOT_DIR=directory.name)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        self.builder = AnalyticsSnapshotBuilder()
+
+    def _approved(self, employee, start):
+        return LeaveRequest.objects.create(
+            employee=employee, leave_type=LeaveType.objects.get(name='Annual'), start_date=start,
+            end_date=start + timedelta(days=1), status='approved', approval_date=timezone.now(),
+        )
+
+    def test_incremental_refresh_tracks_updates_and_deletes(self):
+        year = timezone.localdate().year
+        first = self._approved(self.data.staff[0], date(year, 1, 6))
+        summary = self.builder.build()
+        self.assertEqual((summary['mode'], summary['generation']), ('full', 1))
+
+        second = self._approved(self.data.staff[1], date(year, 1, 13))
+        first.delete()
+        summary = self.builder.build()
+        self.assertEqual((summary['mode'], summary['generation']), ('incremental', 2))
+        self.assertEqual(summary['leave_requests'], LeaveRequest.objects.count())
+
+        snapshot = current_snapshot()
+        self.assertEqual(snapshot.generation, 2)
+        rows = set(snapshot.requests_frame(year)[['employee_id', 'start_date']].itertuples(index=False, name=None))
+        self.assertIn((second.employee_id, second.start_date), rows)
+        self.assertNotIn((first.employee_id, date(year, 1, 6)), rows)
+
+    def test_analytics_from_snapshot_match_database(self):
+        year = timezone.localdate().year
+        self._approved(self.data.staff[0], date(year, 1, 6))
+        with override_settings(ANALYTICS_SNAPSHOT_ENABLED=False):
+            from_db = absence_analytics(year)
+        self.builder.build()
+        from_snapshot = absence_analytics(year)
+
+        self.assertEqual((from_db['source'], from_snapshot['source']), ('database', 'snapshot'))
+        for key in ('by_department', 'by_affiliate', 'by_grade', 'by_month'):
+            self.assertEqual(from_snapshot[key], from_db[key])
+        with override_settings(ANALYTICS_SNAPSHOT_MAX_AGE=-1):
+            self.assertIsNone(current_snapshot())
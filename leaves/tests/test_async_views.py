@@ -0,0 +1,68 @@
+import json
+
+from asgiref.sync import async_to_sync
+from django.test import RequestFactory, TestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from leave_management.testing import seed_query_budget_dataset
+from leaves import async_views
+from notifications import async_views as notification_async_views
+from notifications.models import Notification
+
+
+class AsyncReadViewTests(TestCase):
+    """The async read views return exactly what their DRF counterparts return."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_query_budget_dataset(staff_per_group=2)
+        Notification.objects.bulk_create([
+            Notification(recipient=cls.data.staff[0], notification_type='system', title=f'Note {i}',
+                         message='Seeded', is_read=i % 2 == 0)
+            for i in range(3)
+        ])
+
+    def _async_get(self, view, user, path='/', **headers):
+        request = RequestFactory().get(path, HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}', **headers)
+        return async_to_sync(view)(request)
+
+    def _sync_get(self, user, path):
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.get(path)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content)
+
+    def test_matches_sync_views(self):
+        cases = [
+            (async_views.dashboard, '/api/leaves/requests/dashboard/', [self.data.staff[0]]),
+            (async_views.current_year_full, '/api/leaves/balances/current_year_full/', [self.data.staff[0]]),
+            (notification_async_views.inbox, '/api/notifications/inbox/', [self.data.staff[0], self.data.hr]),
+            (async_views.approval_counts, '/api/leaves/manager/approval_counts/', [
+                self.data.staff[0], self.data.hods[0], self.data.hr, self.data.ceos['Merban Capital'],
+            ]),
+        ]
+        for view, path, users in cases:
+            for user in users:
+                with self.subTest(path=path, role=user.role):
+                    response = self._async_get(view, user, path)
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(json.loads(response.content), self._sync_get(user, path))
+
+        counts = json.loads(self._async_get(async_views.approval_counts, self.data.hods[0]).content)
+        self.assertGreater(counts['manager_approvals'], 0)
+        inbox = json.loads(self._async_get(notification_async_views.inbox, self.data.staff[0]).content)
+        self.assertEqual((inbox['unread_count'], inbox['count']), (1, 3))
+
+    def test_authentication_and_revalidation(self):
+        unauthenticated = async_to_sync(async_views.current_year_full)(RequestFactory().get('/'))
+        self.assertEqual(unauthenticated.status_code, 401)
+        bad_token = async_to_sync(async_views.current_year_full)(RequestFactory().get('/', HTTP_AUTHORIZATION='Bearer nope'))
+        self.assertEqual(bad_token.status_code, 401)
+
+        user = self.data.staff[0]
+        first = self._async_get(async_views.current_year_full, user)
+        with self.assertNumQueries(0):
+            again = self._async_get(async_views.current_year_full, user, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(again.status_code, 304)
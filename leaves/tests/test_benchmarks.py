@@ -0,0 +1,35 @@
+from django.test import TestCase
+
+from leave_management.testing import seed_query_budget_dataset
+from leaves.benchmarks import BenchmarkSuite, compare_to_baseline
+from leaves.models import LeaveRequest
+
+
+class BenchmarkSuiteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_query_budget_dataset(staff_per_group=2)
+
+    def test_runs_scenarios_and_rolls_back(self):
+        before = LeaveRequest.objects.count()
+        report = BenchmarkSuite(iterations=2, warmup=0, prefix='qb').run(
+            ['pending_approvals.hr', 'ceo_approvals_categorized', 'history_combined', 'submit_leave']
+        )
+        self.assertEqual(LeaveRequest.objects.count(), before)
+        for name, result in report['scenarios'].items():
+            with self.subTest(scenario=name):
+                self.assertEqual(result['samples'], 2)
+                self.assertIn(result['status'], ([200], [201]))
+                self.assertGreater(result['queries'], 0)
+        self.assertEqual(set(report['scenarios']) | set(report['skipped']), {
+            'pending_approvals.hr', 'ceo_approvals_categorized', 'history_combined', 'submit_leave',
+        })
+
+    def test_compare_flags_slowdowns_and_extra_queries(self):
+        base = {'scenarios': {'a': {'p50_ms': 20.0, 'p95_ms': 40.0, 'queries': 4, 'status': [200]}}}
+        same = {'scenarios': {'a': {'p50_ms': 23.0, 'p95_ms': 44.0, 'queries': 4, 'status': [200]}}}
+        worse = {'scenarios': {'a': {'p50_ms': 40.0, 'p95_ms': 44.0, 'queries': 5, 'status': [200]}}}
+        self.assertEqual(compare_to_baseline(same, base), [])
+        self.assertEqual(
+            [r['metric'] for r in compare_to_baseline(worse, base)], ['p50_ms', 'queries']
+        )
@@ -0,0 +1,70 @@
+from django.core.checks import run_checks
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from leave_management.testing import seed_query_budget_dataset
+from leaves.models import LeaveBalance, LeaveRequest
+
+
+class ConditionalGetTests(TestCase):
+    """Unchanged resources are answered with 304 before the view touches the database."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_query_budget_dataset(staff_per_group=2)
+
+    def _client(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def test_leave_types_revalidate_without_queries(self):
+        client = self._client(self.data.staff[0])
+        first = client.get('/api/leaves/types/')
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first['Cache-Control'], 'private, no-cache')
+        with self.assertNumQueries(0):
+            again = client.get('/api/leaves/types/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again['ETag'], first['ETag'])
+
+        annual = self.data.leave_types[0]
+        annual.description = 'Renamed'
+        annual.save()
+        changed = client.get('/api/leaves/types/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], first['ETag'])
+
+    def test_balances_are_tagged_per_employee(self):
+        owner, other = self.data.staff[0], self.data.staff[1]
+        url = '/api/leaves/balances/current_year_full/'
+        client = self._client(owner)
+        etag = client.get(url)['ETag']
+        self.assertNotEqual(self._client(other).get(url)['ETag'], etag)
+
+        LeaveBalance.objects.filter(employee=other).first().save()
+        self.assertEqual(client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        balance = LeaveBalance.objects.filter(employee=owner).first()
+        balance.entitled_days += 1
+        balance.save()
+        self.assertEqual(client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_approval_queue_changes_with_requests(self):
+        client = self._client(self.data.hr)
+        url = '/api/leaves/manager/pending_approvals/'
+        etag = client.get(url)['ETag']
+        self.assertEqual(client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        LeaveRequest.objects.filter(status='pending').first().delete()
+        self.assertEqual(client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_process_local_cache_with_several_workers_disables_tags(self):
+        client = self._client(self.data.staff[0])
+        with override_settings(WEB_WORKERS=4):
+            response = client.get('/api/leaves/types/')
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse(response.has_header('ETag'))
+            self.assertIn('leave_management.W001', [w.id for w in run_checks()])
+        with override_settings(WEB_WORKERS=4, VERSIONED_CACHES=True):
+            self.assertTrue(client.get('/api/leaves/types/').has_header('ETag'))
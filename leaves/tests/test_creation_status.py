@@ -6,7 +6,7 @@ from django.urls import reverse
 from rest_framework.test import APIClient
 
 from users.models import CustomUser, Department, Affiliate
-from leaves.models import LeaveType, LeaveRequest
+from leaves.models import LeaveBalance, LeaveType, LeaveRequest
 
 
 class CreationStatusEscalationTests(TestCase):
@@ -74,6 +74,12 @@ class CreationStatusEscalationTests(TestCase):
         self.tomorrow = (timezone.now() + timedelta(days=1)).date()
         self.day_after = (timezone.now() + timedelta(days=2)).date()
 
+        # Requests are validated against the balance of their start year
+        for user in (
+            self.manager_merban, self.hr_merban, self.hr_sdsl, self.staff_with_manager, self.staff_no_mgr_no_hod,
+        ):
+            LeaveBalance.objects.create(employee=user, leave_type=self.annual, year=self.tomorrow.year, entitled_days=20)
+
     def _post_request(self, user):
         self.client.force_authenticate(user=user)
         payload = {
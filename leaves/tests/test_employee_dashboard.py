@@ -0,0 +1,48 @@
+from datetime import date, timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from leave_management.testing import QueryBudgetTestMixin, seed_query_budget_dataset
+from leaves.models import LeaveRequest
+
+
+class EmployeeDashboardTests(QueryBudgetTestMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_query_budget_dataset(staff_per_group=2)
+        cls.employee = cls.data.staff[0]
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.employee)
+
+    def test_summary_matches_requests(self):
+        response = self.assertQueryBudget(self.client, '/api/leaves/requests/dashboard/')
+        mine = LeaveRequest.objects.filter(employee=self.employee)
+        summary = response.data['summary']
+        self.assertEqual(summary['total_requests'], mine.count())
+        self.assertEqual(summary['pending_requests'], mine.filter(status='pending').count())
+        self.assertEqual(summary['approved_requests'], mine.filter(status='approved').count())
+        self.assertEqual(summary['rejected_requests'], 0)
+        self.assertEqual(summary['total_days_taken_this_year'], 3)
+        self.assertEqual(summary['pending_days'], 3)
+        self.assertEqual(len(response.data['recent_requests']), 4)
+
+    def test_repeat_loads_are_cached_until_requests_change(self):
+        url = '/api/leaves/requests/dashboard/'
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            cached = self.client.get(url)
+        self.assertEqual(cached.data['summary']['total_requests'], 4)
+
+        start = date.today().replace(month=12, day=1) + timedelta(days=7)
+        LeaveRequest.objects.create(
+            employee=self.employee, leave_type=self.data.leave_types[0], start_date=start, end_date=start,
+            status='rejected', reason='Changed',
+        )
+        refreshed = self.client.get(url)
+        self.assertEqual(refreshed.data['summary']['total_requests'], 5)
+        self.assertEqual(refreshed.data['summary']['rejected_requests'], 1)
@@ -0,0 +1,122 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from users.models import CustomUser, Affiliate, EmploymentGrade
+from leaves.models import LeaveType, LeaveBalance, LeaveGradeEntitlement
+from leaves.balances import LeaveBalanceService
+from leaves.grade_entitlements import apply_grade_entitlements
+
+
+class EntitlementUpsertTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.year = timezone.now().year
+        self.aff = Affiliate.objects.create(name="Merban Capital")
+        self.annual = LeaveType.objects.create(name="Annual")
+        self.sick = LeaveType.objects.create(name="Sick")
+        self.retired = LeaveType.objects.create(name="Retired", is_active=False)
+        self.hr = CustomUser.objects.create_user(
+            username="hr", password="x", employee_id="HR001", role="hr", affiliate=self.aff,
+        )
+        self.staff = [
+            CustomUser.objects.create_user(
+                username=f"staff{i}", password="x", employee_id=f"STF00{i}",
+                role="junior_staff", affiliate=self.aff,
+            )
+            for i in range(3)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(self.hr)
+
+    def test_upsert_counts_and_preserves_usage(self):
+        LeaveBalance.objects.create(
+            employee=self.staff[0], leave_type=self.annual, year=self.year,
+            entitled_days=10, used_days=4, pending_days=2,
+        )
+        ids = [u.id for u in self.staff]
+        counts = LeaveBalanceService.upsert_entitlements(ids, {self.annual.id: 20, self.sick.id: 5}, self.year)
+        self.assertEqual(counts, {'created': 5, 'updated': 1})
+
+        b = LeaveBalance.objects.get(employee=self.staff[0], leave_type=self.annual, year=self.year)
+        self.assertEqual((b.entitled_days, b.used_days, b.pending_days), (20, 4, 2))
+        self.assertEqual(LeaveBalance.objects.filter(year=self.year).count(), 6)
+
+        # Re-applying identical values is a no-op
+        counts = LeaveBalanceService.upsert_entitlements(ids, {self.annual.id: 20, self.sick.id: 5}, self.year)
+        self.assertEqual(counts, {'created': 0, 'updated': 0})
+
+    def test_active_leave_types_excludes_inactive(self):
+        found = LeaveBalanceService.active_leave_types([self.annual.id, self.retired.id, 9999])
+        self.assertEqual(set(found), {self.annual.id})
+
+    def test_role_endpoint_uses_upsert(self):
+        resp = self.client.post(
+            '/api/leaves/role-entitlements/junior_staff/set_entitlements/',
+            {'entitlements': [{'leave_type_id': self.annual.id, 'entitled_days': 18}]},
+            format='json',
+        )
+        self.assertEqual(resp.status_code, 200, resp.content)
+        self.assertEqual(resp.data['balances_created'], 3)
+        self.assertEqual(resp.data['users_affected'], 3)
+
+    def test_employee_endpoint_reports_item_errors(self):
+        resp = self.client.post(
+            f'/api/leaves/balances/employee/{self.staff[1].id}/set_entitlements/',
+            {'items': [
+                {'leave_type': self.annual.id, 'entitled_days': 12},
+                {'leave_type': self.retired.id, 'entitled_days': 3},
+                {'leave_type': self.sick.id, 'entitled_days': -1},
+            ]},
+            format='json',
+        )
+        self.assertEqual(resp.status_code, 200, resp.content)
+        self.assertEqual(resp.data['created'], 1)
+        self.assertEqual([e['index'] for e in resp.data['errors']], [1, 2])
+
+    def test_apply_grade_entitlements(self):
+        grade = EmploymentGrade.objects.create(name="Senior", slug="senior")
+        LeaveGradeEntitlement.objects.create(grade=grade, leave_type=self.annual, entitled_days=Decimal('22.0'))
+        for u in self.staff[:2]:
+            u.grade = grade
+            u.save(update_fields=['grade'])
+        self.assertEqual(apply_grade_entitlements(grade, self.year), 2)
+        self.assertEqual(
+            set(LeaveBalance.objects.filter(leave_type=self.annual).values_list('entitled_days', flat=True)), {22}
+        )
+
+    def test_role_overview_reports_mode_min_max(self):
+        ids = [u.id for u in self.staff]
+        LeaveBalanceService.upsert_entitlements(ids, {self.annual.id: 20}, self.year)
+        LeaveBalanceService.upsert_entitlements([ids[0]], {self.annual.id: 25}, self.year)
+        legacy = CustomUser.objects.create_user(
+            username="legacy", password="x", employee_id="LEG001", role="staff", affiliate=self.aff,
+        )
+        LeaveBalanceService.upsert_entitlements([legacy.id], {self.annual.id: 20}, self.year)
+
+        stats = LeaveBalanceService.role_entitlement_overview(self.year)['junior_staff']
+        self.assertEqual(stats['user_count'], 4)
+        self.assertEqual(
+            stats['entitlements'][self.annual.id],
+            {'entitled_days': 20, 'min_days': 20, 'max_days': 25, 'user_count': 4},
+        )
+
+    def test_role_overview_cache_invalidated_by_writes(self):
+        ids = [u.id for u in self.staff]
+        LeaveBalanceService.upsert_entitlements(ids, {self.annual.id: 20}, self.year)
+        resp = self.client.get('/api/leaves/role-entitlements/')
+        junior = next(r for r in resp.data['roles'] if r['role_code'] == 'junior_staff')
+        annual = next(e for e in junior['entitlements'] if e['leave_type_id'] == self.annual.id)
+        self.assertEqual(annual['entitled_days'], 20)
+
+        self.client.post(
+            '/api/leaves/role-entitlements/junior_staff/set_entitlements/',
+            {'entitlements': [{'leave_type_id': self.annual.id, 'entitled_days': 24}]},
+            format='json',
+        )
+        resp = self.client.get('/api/leaves/role-entitlements/junior_staff/summary/')
+        annual = next(e for e in resp.data['entitlements'] if e['leave_type_id'] == self.annual.id)
+        self.assertEqual(annual['entitled_days'], 24)
@@ -0,0 +1,79 @@
+import io
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from leave_management.testing import seed_query_budget_dataset
+from leaves.escalations import ESCALATED, REMINDED, ApprovalEscalationService
+from leaves.models import LeaveRequest
+from notifications.models import Notification, SiteSetting
+from users.models import CustomUser
+
+
+class ApprovalEscalationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_query_budget_dataset(staff_per_group=1)
+        cls.admin = CustomUser.objects.create_user(username='escadmin', password='x', role='admin')
+
+    def _submit(self):
+        start = timezone.localdate() + timedelta(days=14)
+        start += timedelta(days=(7 - start.weekday()) % 7)  # next Monday
+        return LeaveRequest.objects.create(
+            employee=self.data.staff[0], leave_type=self.data.leave_types[0],
+            start_date=start, end_date=start + timedelta(days=1),
+        )
+
+    def test_reminds_then_escalates_due_requests(self):
+        SiteSetting.objects.create(key='ESCALATION_REMINDER_HOURS', value='24')
+        SiteSetting.objects.create(key='ESCALATION_FALLBACK_HOURS', value='72')
+        request = self._submit()
+        self.assertEqual(request.escalation_level, 0)
+        self.assertIsNotNone(request.next_escalation_at)
+        submitted = request.created_at
+
+        # The first tick only schedules the reminder
+        counts = ApprovalEscalationService.run(now=submitted + timedelta(hours=1))
+        self.assertEqual((counts['reminded'], counts['escalated']), (0, 0))
+        request.refresh_from_db()
+        self.assertEqual(request.next_escalation_at, submitted + timedelta(hours=24))
+
+        counts = ApprovalEscalationService.run(now=submitted + timedelta(hours=25))
+        self.assertEqual(counts['reminded'], 1)
+        reminder = Notification.objects.get(notification_type='approval_reminder', leave_request=request)
+        self.assertEqual(reminder.recipient, self.data.staff[0].manager)
+        request.refresh_from_db()
+        self.assertEqual(request.escalation_level, REMINDED)
+
+        counts = ApprovalEscalationService.run(now=submitted + timedelta(hours=73))
+        self.assertEqual(counts['escalated'], 1)
+        escalated = Notification.objects.filter(notification_type='approval_escalated', leave_request=request)
+        self.assertEqual(list(escalated.values_list('recipient', flat=True)), [self.admin.pk])
+        request.refresh_from_db()
+        self.assertEqual((request.escalation_level, request.next_escalation_at), (ESCALATED, None))
+
+        # Nothing is due any more
+        with self.assertNumQueries(5):
+            self.assertEqual(ApprovalEscalationService.run(now=submitted + timedelta(days=30))['processed'], 0)
+
+    def test_stage_changes_restart_or_stop_the_clock(self):
+        request = self._submit()
+        LeaveRequest.objects.filter(pk=request.pk).update(escalation_level=ESCALATED, next_escalation_at=None)
+        request = LeaveRequest.objects.get(pk=request.pk)
+        request.manager_approve(self.data.hods[0])
+        request.refresh_from_db()
+        self.assertEqual(request.escalation_level, 0)
+        self.assertIsNotNone(request.next_escalation_at)
+
+        request.reject(self.data.hr, 'No cover')
+        request.refresh_from_db()
+        self.assertIsNone(request.next_escalation_at)
+
+        # Disabled through SiteSetting, a tick touches nothing
+        SiteSetting.objects.create(key='ESCALATION_ENABLED', value='false')
+        LeaveRequest.objects.filter(pk=request.pk).update(next_escalation_at=timezone.now())
+        out = io.StringIO()
+        call_command('escalate_pending_approvals', stdout=out)
+        self.assertIn('processed: 0', out.getvalue())
@@ -0,0 +1,109 @@
+import io
+from datetime import date
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from users.models import CustomUser
+from leaves.models import LeaveType, LeaveRequest, LeaveBalance
+from leaves.importers import HistoricalLeaveImporter, iter_parquet_records, working_days_between
+
+
+class HistoricalLeaveImportTests(TestCase):
+    CSV = (
+        "employee_id,leave_type,start_date,end_date,status,reason\n"
+        "EMP001,Annual,2023-03-06,2023-03-10,approved,Holiday\n"   # Mon-Fri: 5 days
+        "EMP001,annual,2023-03-10,2023-03-13,approved,\n"          # Fri-Mon: 2 days
+        "EMP002,Sick,2023-05-01,2023-05-02,rejected,\n"
+        "EMP404,Annual,2023-01-02,2023-01-03,approved,\n"
+        "EMP002,Annual,2023-02-10,2023-02-01,approved,\n"
+    )
+
+    def setUp(self):
+        self.annual = LeaveType.objects.create(name="Annual")
+        self.sick = LeaveType.objects.create(name="Sick")
+        self.hr = CustomUser.objects.create_user(username="hr", password="x", employee_id="HR001", role="hr")
+        self.emp1 = CustomUser.objects.create_user(username="e1", password="x", employee_id="EMP001")
+        self.emp2 = CustomUser.objects.create_user(
+            username="e2", password="x", employee_id="EMP002", email="e2@example.com",
+        )
+        LeaveBalance.objects.create(employee=self.emp1, leave_type=self.annual, year=2023, entitled_days=20)
+        self.client = APIClient()
+        self.client.force_authenticate(self.hr)
+
+    def _post(self, dry_run=False):
+        upload = SimpleUploadedFile('history.csv', self.CSV.encode(), content_type='text/csv')
+        return self.client.post(
+            '/api/leaves/import-history/', {'file': upload, 'dry_run': str(dry_run).lower()}, format='multipart'
+        )
+
+    def test_working_days_match_model_calendar(self):
+        starts = [date(2023, 3, 6), date(2023, 3, 10), date(2023, 3, 11)]
+        ends = [date(2023, 3, 10), date(2023, 3, 13), date(2023, 3, 12)]
+        expected = [LeaveRequest(start_date=s, end_date=e).calculate_working_days() for s, e in zip(starts, ends)]
+        self.assertEqual(list(working_days_between(starts, ends)), expected)
+
+    def test_import_creates_requests_and_rebuilds_balances(self):
+        resp = self._post()
+        self.assertEqual(resp.status_code, 201, resp.content)
+        self.assertEqual(resp.data['created'], 3)
+        self.assertEqual(sorted(e['row'] for e in resp.data['errors']), [5, 6])
+
+        balance = LeaveBalance.objects.get(employee=self.emp1, leave_type=self.annual, year=2023)
+        self.assertEqual((balance.entitled_days, balance.used_days, balance.pending_days), (20, 7, 0))
+        # Missing balance rows are created for the affected year
+        self.assertTrue(LeaveBalance.objects.filter(employee=self.emp2, leave_type=self.sick, year=2023).exists())
+
+        # Re-importing the same file is idempotent
+        resp = self._post()
+        self.assertEqual(resp.data['created'], 0)
+        self.assertEqual(resp.data['skipped_duplicates'], 3)
+
+    def test_dry_run_writes_nothing(self):
+        resp = self._post(dry_run=True)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data['valid_rows'], 3)
+        self.assertEqual(LeaveRequest.objects.count(), 0)
+
+    def test_parquet_input(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.table({
+            'email': ['e2@example.com'],
+            'leave_type': ['Annual'],
+            'start_date': [date(2022, 12, 1)],
+            'end_date': [date(2022, 12, 2)],
+        })
+        buf = io.BytesIO()
+        pq.write_table(table, buf)
+        buf.seek(0)
+        report = HistoricalLeaveImporter().run(iter_parquet_records(buf))
+        self.assertEqual(report['created'], 1)
+        self.assertEqual(LeaveRequest.objects.get(employee=self.emp2).total_days, 2)
+
+    def test_unreadable_tail_keeps_earlier_batches_consistent(self):
+        def records():
+            yield {'employee_id': 'EMP001', 'leave_type': 'Annual', 'start_date': '2023-03-06', 'end_date': '2023-03-10'}
+            yield {'employee_id': 'EMP002', 'leave_type': 'Sick', 'start_date': '2023-05-01', 'end_date': '2023-05-02'}
+            raise ValueError('corrupt batch')
+
+        report = HistoricalLeaveImporter(batch_size=1).run(records())
+        self.assertEqual((report['created'], report['read_error']), (2, 'at record 3: corrupt batch'))
+        # Rows imported before the failure still count against the balance
+        balance = LeaveBalance.objects.get(employee=self.emp1, leave_type=self.annual, year=2023)
+        self.assertEqual(balance.used_days, 5)
+
+        # A failure while processing a batch propagates instead of passing as a read error
+        with mock.patch.object(HistoricalLeaveImporter, '_process_batch', side_effect=ValueError('boom')) as process:
+            with self.assertRaisesMessage(ValueError, 'boom'):
+                HistoricalLeaveImporter(batch_size=1).run(records())
+        self.assertEqual(process.call_count, 1)
+
+        upload = SimpleUploadedFile('history.csv', self.CSV.encode() + b'EMP002,Sick,\xff\xfe,2023-05-02\n')
+        resp = self.client.post('/api/leaves/import-history/', {'file': upload}, format='multipart')
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn('Could not read file at record', resp.data['error'])
+        self.assertIn('skipped_duplicates', resp.data)
@@ -0,0 +1,36 @@
+from django.db.models import Sum
+from django.test import TestCase
+
+from leaves.models import LeaveBalance, LeaveInterruptLog, LeaveRequest
+from leaves.perf_dataset import PerfDatasetGenerator, generated_accounts
+from users.models import CustomUser
+
+
+class PerfDatasetGeneratorTests(TestCase):
+    def _snapshot(self):
+        return list(
+            LeaveRequest.objects.order_by('employee__username', 'start_date')
+            .values_list('employee__username', 'leave_type__name', 'start_date', 'end_date', 'status', 'total_days')
+        )
+
+    def test_generates_requested_volume_deterministically(self):
+        # A real account that merely shares the prefix
+        real = CustomUser.objects.create_user(username='perfect.mensah', email='perfect.mensah@company.com')
+        generator = PerfDatasetGenerator(employees=40, requests=600, years=3, interrupt_rate=0.2, seed=7)
+        counts = generator.run()
+        self.assertEqual(counts['leave_requests'], 600)
+        self.assertEqual(generated_accounts('perf').count(), counts['users'])
+        self.assertTrue(LeaveInterruptLog.objects.exists())
+        statuses = set(LeaveRequest.objects.values_list('status', flat=True))
+        self.assertTrue({'approved', 'rejected', 'cancelled'} <= statuses)
+
+        # Balances agree with the approved requests they summarize
+        approved = LeaveRequest.objects.filter(status='approved').aggregate(days=Sum('total_days'))['days']
+        self.assertEqual(LeaveBalance.objects.aggregate(days=Sum('used_days'))['days'], approved)
+
+        first = self._snapshot()
+        generator.clear()
+        self.assertFalse(generated_accounts('perf').exists())
+        self.assertTrue(CustomUser.objects.filter(pk=real.pk).exists())
+        PerfDatasetGenerator(employees=40, requests=600, years=3, interrupt_rate=0.2, seed=7).run()
+        self.assertEqual(self._snapshot(), first)
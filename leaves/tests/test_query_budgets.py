@@ -0,0 +1,69 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from leave_management.middleware import QueryBudgetExceeded
+from leave_management.testing import QueryBudgetTestMixin, seed_query_budget_dataset
+
+
+class QueryBudgetTests(QueryBudgetTestMixin, TestCase):
+    """Approval queues and history feeds must not scale their query count with data size."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_query_budget_dataset(staff_per_group=6)
+
+    def _client(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def test_pending_approvals_per_role(self):
+        approvers = [self.data.hods[0], self.data.hr, self.data.ceos['Merban Capital'], self.data.ceos['SDSL']]
+        for user in approvers:
+            with self.subTest(role=user.role, user=user.username):
+                response = self.assertQueryBudget(self._client(user), '/api/leaves/manager/pending_approvals/')
+                self.assertGreater(response.data['count'], 0)
+
+    def test_hr_approvals_categorized(self):
+        response = self.assertQueryBudget(self._client(self.data.hr), '/api/leaves/manager/hr_approvals_categorized/')
+        self.assertGreater(response.data['total'], 0)
+
+    def test_history_combined(self):
+        response = self.assertQueryBudget(self._client(self.data.staff[0]), '/api/leaves/requests/history_combined/')
+        self.assertEqual(
+            sorted(e['request_number'] for e in response.data if e['record_type'] == 'leave'), [1, 2, 3, 4]
+        )
+
+    def test_staff_directory(self):
+        self.assertQueryBudget(self._client(self.data.hr), '/api/users/staff/')
+
+    def test_server_timing_header(self):
+        response = self._client(self.data.hr).get('/api/leaves/manager/pending_approvals/')
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ queries", app;dur=[\d.]+$')
+
+    @override_settings(QUERY_BUDGET_STRICT=True)
+    def test_strict_mode_raises_when_over_budget(self):
+        from leaves.views import ManagerLeaveViewSet
+
+        action = ManagerLeaveViewSet.pending_approvals
+        original = action.query_budget
+        action.query_budget = 1
+        try:
+            with self.assertRaises(QueryBudgetExceeded):
+                self._client(self.data.hr).get('/api/leaves/manager/pending_approvals/')
+        finally:
+            action.query_budget = original
+
+    def test_approval_dashboard_paginates_role_queue(self):
+        cache.clear()
+        client = self._client(self.data.hr)
+        response = self.assertQueryBudget(client, '/api/leaves/approval-dashboard/', data={'page_size': 2})
+        queue = response.data['my_pending_approvals']
+        self.assertEqual(queue['count'], response.data['approval_stages']['pending_hr_approval'])
+        self.assertEqual(len(queue['requests']), 2)
+        self.assertEqual(queue['next'], 2)
+        self.assertEqual(len(response.data['recent_activity']), 10)
+        # Stage counts are cached: later pages run only the page and recent-activity queries
+        response = self.assertQueryBudget(client, '/api/leaves/approval-dashboard/', data={'page_size': 2, 'page': 2}, budget=2)
+        self.assertEqual(response.data['my_pending_approvals']['previous'], 1)
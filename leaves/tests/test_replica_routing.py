@@ -0,0 +1,46 @@
+import time
+
+from django.conf import settings
+from django.db import router
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from leave_management.db_router import PIN_COOKIE, PIN_HEADER, ReplicaRoutingMiddleware, read_replica
+from leaves.models import LeaveRequest
+
+
+@read_replica
+def report_view(request):
+    return HttpResponse(router.db_for_read(LeaveRequest))
+
+
+def plain_view(request):
+    return HttpResponse(router.db_for_read(LeaveRequest))
+
+
+@override_settings(DATABASES={**settings.DATABASES, 'replica': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}})
+class ReplicaRoutingTests(SimpleTestCase):
+    def _call(self, view, method='get', **extra):
+        middleware = ReplicaRoutingMiddleware(
+            lambda req: middleware.process_view(req, view, (), {}) or view(req)
+        )
+        return middleware(getattr(RequestFactory(), method)('/report/', **extra))
+
+    def test_opted_in_reads_use_the_replica(self):
+        self.assertEqual(self._call(report_view).content, b'replica')
+        self.assertEqual(self._call(plain_view).content, b'default')
+        # Routing ends with the request
+        self.assertEqual(router.db_for_read(LeaveRequest), 'default')
+        self.assertEqual(router.db_for_write(LeaveRequest), 'default')
+
+    def test_writers_are_pinned_to_the_primary(self):
+        response = self._call(plain_view, method='post')
+        until = response.cookies[PIN_COOKIE].value
+        self.assertGreater(float(until), time.time())
+
+        pinned = self._call(report_view, HTTP_COOKIE=f'{PIN_COOKIE}={until}')
+        self.assertEqual(pinned.content, b'default')
+        by_header = self._call(report_view, headers={PIN_HEADER: response[PIN_HEADER]})
+        self.assertEqual(by_header.content, b'default')
+        expired = self._call(report_view, headers={PIN_HEADER: str(time.time() - 1)})
+        self.assertEqual(expired.content, b'replica')
@@ -0,0 +1,87 @@
+import csv
+import io
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+
+import pandas as pd
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from leave_management.testing import seed_query_budget_dataset
+from leaves.workflow_metrics import EXPORT_COLUMNS, REQUEST_COLUMNS, WORKFLOW_METRICS_TTL, compute_workflow_metrics
+
+
+class WorkflowMetricsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.data = seed_query_budget_dataset(staff_per_group=2)
+
+    def test_stage_durations_follow_each_workflow(self):
+        t0 = datetime(2026, 3, 2, 8, tzinfo=dt_timezone.utc)
+        hours = lambda n: t0 + timedelta(hours=n)  # noqa: E731
+        users = pd.DataFrame({'employee_id': [1, 2, 3], 'affiliate': ['Merban Capital', 'Merban Capital', 'SDSL']})
+        requests = pd.DataFrame.from_records([
+            # Merban: manager 2h, HR 4h, CEO 10h
+            (1, 1, 'approved', t0, hours(2), hours(6), hours(16), 10, 20, 30),
+            # Merban, still with the CEO after manager 4h and HR 2h
+            (2, 2, 'hr_approved', t0, hours(4), hours(6), None, 10, 20, None),
+            # SDSL: CEO 8h, then HR 1h
+            (3, 3, 'approved', t0, None, hours(9), hours(8), None, 20, 40),
+        ], columns=REQUEST_COLUMNS)
+        for column in ('created_at', 'manager_at', 'hr_at', 'ceo_at'):
+            requests[column] = pd.to_datetime(requests[column], utc=True)
+
+        result = compute_workflow_metrics(2026, now=hours(30), users=users, requests=requests)
+        stages = {(row['affiliate'], row['stage']): row for row in result['by_stage']}
+        self.assertEqual([(row['affiliate'], row['stage']) for row in result['by_stage']], [
+            ('Merban Capital', 'manager'), ('Merban Capital', 'hr'), ('Merban Capital', 'ceo'),
+            ('SDSL', 'ceo'), ('SDSL', 'hr'),
+        ])
+        manager = stages[('Merban Capital', 'manager')]
+        self.assertEqual((manager['count'], manager['p50_hours'], manager['max_hours']), (2, 3.0, 4.0))
+        # The waiting request has been with the CEO since hour 6
+        ceo = stages[('Merban Capital', 'ceo')]
+        self.assertEqual((ceo['count'], ceo['max_hours'], ceo['open'], ceo['oldest_open_hours']), (1, 10.0, 1, 24.0))
+        self.assertEqual((stages[('SDSL', 'ceo')]['max_hours'], stages[('SDSL', 'hr')]['max_hours']), (8.0, 1.0))
+
+        approvers = {(row['stage'], row['approver_id']): row['count'] for row in result['by_approver']}
+        self.assertEqual(approvers, {('manager', 10): 2, ('hr', 20): 3, ('ceo', 30): 1, ('ceo', 40): 1})
+        self.assertEqual({row['month'] for row in result['by_month']}, {'2026-03'})
+
+    def test_endpoint_permissions_and_csv_export(self):
+        cache.clear()
+        url = '/api/leaves/analytics/workflow/'
+        staff = APIClient()
+        staff.force_authenticate(self.data.staff[0])
+        self.assertEqual(staff.get(url).status_code, 403)
+
+        ceo = APIClient()
+        ceo.force_authenticate(next(iter(self.data.ceos.values())))
+        response = ceo.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['workflows'], {'standard': ['manager', 'hr', 'ceo'], 'ceo_first': ['ceo', 'hr']})
+
+        export = ceo.get(url, {'export': 'csv'})
+        self.assertEqual(export['Content-Type'], 'text/csv')
+        rows = list(csv.reader(io.StringIO(export.content.decode())))
+        self.assertEqual(rows[0][:4], ['section', 'affiliate', 'workflow', 'stage'])
+        sections = [row[0] for row in rows[1:]]
+        self.assertEqual(sections.count('stage'), len(response.data['by_stage']))
+        self.assertEqual(ceo.get(url, {'export': 'xlsx'}).status_code, 400)
+
+        # Backlog ages move with the clock: a new time bucket retires the ETag
+        self.assertEqual(ceo.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        with mock.patch('leaves.workflow_metrics.time.time', return_value=time.time() + WORKFLOW_METRICS_TTL):
+            self.assertEqual(ceo.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+    def test_year_without_requests_is_empty(self):
+        cache.clear()
+        hr = APIClient()
+        hr.force_authenticate(self.data.hr)
+        response = hr.get('/api/leaves/analytics/workflow/', {'year': 2001})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['by_stage'], response.data['by_approver'], response.data['by_month']), ([], [], []))
+        export = hr.get('/api/leaves/analytics/workflow/', {'year': 2001, 'export': 'csv'})
+        self.assertEqual(export.content.decode().strip(), ','.join(EXPORT_COLUMNS))
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
@@ -12,6 +13,9 @@ from .views import (
 from .role_views import RoleEntitlementViewSet
 from .approval_dashboard import approval_dashboard
 from .views_overlap import OverlapAPIView, OverlapSummaryAPIView
+from .views_import import LeaveHistoryImportView
+from .views_analytics import AbsenceAnalyticsAPIView, WorkflowMetricsAPIView
+from . import async_views
 
 router = DefaultRouter()
 router.register(r'requests', LeaveRequestViewSet, basename='leave-requests')
@@ -32,4 +36,15 @@ urlpatterns = [
     path('approval-dashboard/', approval_dashboard, name='approval-dashboard'),
     path('overlaps/', OverlapAPIView.as_view(), name='leave-overlaps'),
     path('overlaps/summary/', OverlapSummaryAPIView.as_view(), name='leave-overlaps-summary'),
-]
\ No newline at end of file
+    path('import-history/', LeaveHistoryImportView.as_view(), name='leave-history-import'),
+    path('analytics/absence/', AbsenceAnalyticsAPIView.as_view(), name='leave-absence-analytics'),
+    path('analytics/workflow/', WorkflowMetricsAPIView.as_view(), name='leave-workflow-metrics'),
+]
+
+if settings.ASYNC_READ_VIEWS:
+    # Async versions of router actions; listed first so they take precedence
+    urlpatterns = [
+        path('requests/dashboard/', async_views.dashboard, name='leave-requests-dashboard-async'),
+        path('balances/current_year_full/', async_views.current_year_full, name='leave-balances-current-year-full-async'),
+        path('manager/approval_counts/', async_views.approval_counts, name='manager-leaves-approval-counts-async'),
+    ] + urlpatterns
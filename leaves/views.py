@@ -24,10 +24,25 @@ from .serializers import (
     EmploymentGradeSerializer,
     LeaveGradeEntitlementSerializer,
     _build_timeline_events,
+    with_timeline_relations,
 )
 from users.models import EmploymentGrade
 from .grade_entitlements import apply_grade_entitlements
 from .services import ApprovalRoutingService
+from .approval_counts import approval_counts, approver_queryset
+from .balances import LeaveBalanceService
+from leave_management import reference_data
+from leave_management.conditional import ConditionalGetMixin
+from leave_management.db_router import read_replica
+from leave_management.middleware import query_budget
+
+
+class CeoLookupCacheMixin:
+    """Memoize affiliate CEO lookups for the lifetime of one request (approval queues)."""
+
+    def dispatch(self, request, *args, **kwargs):
+        with ApprovalRoutingService.cached_ceo_lookups():
+            return super().dispatch(request, *args, **kwargs)
 
 
 def _perform_cancel_action(leave_request, user, comments, balance_updater):
@@ -65,7 +80,7 @@ def _perform_cancel_action(leave_request, user, comments, balance_updater):
     return True, status.HTTP_200_OK, ''
 
 
-class LeaveTypeViewSet(viewsets.ModelViewSet):
+class LeaveTypeViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet for leave types.
     Read access is available to authenticated users (active types only for non-HR).
@@ -74,6 +89,7 @@ class LeaveTypeViewSet(viewsets.ModelViewSet):
     queryset = LeaveType.objects.filter(is_active=True)
     serializer_class = LeaveTypeSerializer
     permission_classes = [permissions.IsAuthenticated]
+    conditional_resources = {'list': ('leave-types',), 'retrieve': ('leave-types',)}
 
     def get_queryset(self):  # type: ignore[override]
         """Return all leave types for HR, only active for others"""
@@ -81,6 +97,14 @@ class LeaveTypeViewSet(viewsets.ModelViewSet):
             return LeaveType.objects.all()
         return LeaveType.objects.filter(is_active=True)
 
+    def list(self, request, *args, **kwargs):
+        """Served from the reference-data registry (same rows as get_queryset)."""
+        rows = reference_data.leave_types.all() if self._is_hr(request) else reference_data.leave_types.active()
+        page = self.paginate_queryset(list(rows))
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer(rows, many=True).data)
+
     def _is_hr(self, request) -> bool:
         user = request.user
         # Narrow user type to CustomUser when possible to satisfy static analysis
@@ -164,33 +188,15 @@ class LeaveTypeViewSet(viewsets.ModelViewSet):
             Q(is_active_employee=True) | Q(role__in=['manager', 'hr', 'ceo'])
         )
 
-        updated = 0
-        created = 0
-        balances = LeaveBalance.objects.filter(leave_type=leave_type, year=current_year)
-
-        # Update existing balances
-        for b in balances:
-            if b.entitled_days != entitled_days:
-                b.entitled_days = entitled_days
-                b.save(update_fields=['entitled_days', 'updated_at'])
-                updated += 1
-
-        # Create missing balances for active employees
-        existing_user_ids = set(b.employee_id for b in balances)
-        to_create = []
-        for emp in employees:
-            if emp.id not in existing_user_ids:
-                to_create.append(LeaveBalance(
-                    employee=emp,
-                    leave_type=leave_type,
-                    year=current_year,
-                    entitled_days=entitled_days,
-                    used_days=0,
-                    pending_days=0,
-                ))
-        if to_create:
-            LeaveBalance.objects.bulk_create(to_create)
-            created = len(to_create)
+        # Existing balances for this type are updated regardless of the holder's status;
+        # missing balances are created for active workers only.
+        employee_ids = set(
+            LeaveBalance.objects.filter(leave_type=leave_type, year=current_year).values_list('employee_id', flat=True)
+        )
+        employee_ids.update(employees.values_list('id', flat=True))
+        counts = LeaveBalanceService.upsert_entitlements(employee_ids, {leave_type.id: entitled_days}, current_year)
+        updated = counts['updated']
+        created = counts['created']
 
         return Response({
             'message': 'Entitlements updated',
@@ -238,7 +244,7 @@ class LeaveTypeViewSet(viewsets.ModelViewSet):
         })
 
 
-class LeaveBalanceViewSet(viewsets.ReadOnlyModelViewSet):
+class LeaveBalanceViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for viewing leave balances - supports requirements R2, R3
     """
@@ -246,6 +252,13 @@ class LeaveBalanceViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['year', 'leave_type']
+    conditional_resources = {
+        **{
+            action: ('leave-balances', 'leave-balances:{user}', 'leave-types')
+            for action in ('list', 'retrieve', 'current_year', 'current_year_full', 'summary')
+        },
+        'employee_current_year': ('leave-balances', 'leave-balances:{employee_id}', 'leave-types', 'users'),
+    }
     
     def get_queryset(self):  # type: ignore[override]
         """Return balances for the current user only"""
@@ -284,30 +297,7 @@ class LeaveBalanceViewSet(viewsets.ReadOnlyModelViewSet):
             logger.info(f"current_year_full called - user={getattr(request, 'user', None)} auth_present={auth_present}")
         except Exception:
             logger.exception('Error logging current_year_full call')
-        user = request.user
-        current_year = timezone.now().year
-        types = list(LeaveType.objects.filter(is_active=True))
-        balances = LeaveBalance.objects.filter(employee=user, year=current_year)
-        by_lt = {getattr(b, 'leave_type_id'): b for b in balances}
-        items = []
-        for lt in types:
-            b = by_lt.get(getattr(lt, 'id'))
-            entitled = b.entitled_days if b else 0
-            used = b.used_days if b else 0
-            pending = b.pending_days if b else 0
-            remaining = max(0, entitled - used - pending)
-            items.append({
-                'leave_type': {
-                    'id': getattr(lt, 'id'),
-                    'name': lt.name,
-                },
-                'entitled_days': entitled,
-                'used_days': used,
-                'pending_days': pending,
-                'remaining_days': remaining,
-                'year': current_year,
-            })
-        return Response(items)
+        return Response(LeaveBalanceService.current_year_benefits(request.user))
 
     @action(detail=False, methods=['get'], url_path=r'employee/(?P<employee_id>[^/.]+)/current_year')
     def employee_current_year(self, request, employee_id: str):
@@ -325,7 +315,7 @@ class LeaveBalanceViewSet(viewsets.ReadOnlyModelViewSet):
             return Response({'detail': 'Employee not found'}, status=status.HTTP_404_NOT_FOUND)
 
         current_year = timezone.now().year
-        types = list(LeaveType.objects.filter(is_active=True))
+        types = reference_data.leave_types.active()
         balances = LeaveBalance.objects.filter(employee=employee, year=current_year)
         # Use getattr to appease static analyzers about dynamic ORM fields
         by_lt = {getattr(b, 'leave_type_id'): b for b in balances}
@@ -363,10 +353,9 @@ class LeaveBalanceViewSet(viewsets.ReadOnlyModelViewSet):
             return Response({'detail': 'Employee not found'}, status=status.HTTP_404_NOT_FOUND)
 
         current_year = timezone.now().year
-        updated = 0
-        created = 0
         errors = []
 
+        parsed = []
         for idx, it in enumerate(items):
             try:
                 lt_id = int(it.get('leave_type'))
@@ -377,26 +366,20 @@ class LeaveBalanceViewSet(viewsets.ReadOnlyModelViewSet):
             if days < 0:
                 errors.append({'index': idx, 'error': 'entitled_days must be non-negative'})
                 continue
+            parsed.append((idx, lt_id, days))
 
-            try:
-                lt = LeaveType.objects.get(pk=lt_id, is_active=True)
-            except LeaveType.DoesNotExist:
+        leave_types = LeaveBalanceService.active_leave_types(lt_id for _, lt_id, _ in parsed)
+        entitlements = {}
+        for idx, lt_id, days in parsed:
+            if lt_id not in leave_types:
                 errors.append({'index': idx, 'error': f'LeaveType {lt_id} not found or inactive'})
                 continue
+            entitlements[lt_id] = days
+        errors.sort(key=lambda e: e['index'])
 
-            b, was_created = LeaveBalance.objects.get_or_create(
-                employee=employee,
-                leave_type=lt,
-                year=current_year,
-                defaults={'entitled_days': days}
-            )
-            if was_created:
-                created += 1
-            else:
-                if b.entitled_days != days:
-                    b.entitled_days = days
-                    b.save(update_fields=['entitled_days', 'updated_at'])
-                    updated += 1
+        counts = LeaveBalanceService.upsert_entitlements([employee.id], entitlements, current_year)
+        updated = counts['updated']
+        created = counts['created']
 
         return Response({
             'message': 'Entitlements updated',
@@ -434,7 +417,7 @@ class LeaveBalanceViewSet(viewsets.ReadOnlyModelViewSet):
         return Response(summary_data)
 
 
-class LeaveRequestViewSet(viewsets.ModelViewSet):
+class LeaveRequestViewSet(CeoLookupCacheMixin, viewsets.ModelViewSet):
     """
     ViewSet for leave requests - supports requirements R1, R12
     """
@@ -481,7 +464,36 @@ class LeaveRequestViewSet(viewsets.ModelViewSet):
 
         return max(candidates, key=lambda c: c['timestamp'])
 
-    def _build_leave_entry(self, lr: LeaveRequest, viewer):
+    def _feed_context(self, leaves, interrupts):
+        """Per-feed lookups shared by the entry builders, two queries regardless of size.
+
+        - pending_recall_ids: leave ids with a manager recall awaiting the staff member
+        - request_numbers: {leave id: position in the employee's chronological requests}
+        """
+        from bisect import bisect_right
+
+        leave_ids = {lr.id for lr in leaves}
+        pending_recall_ids = set(
+            LeaveInterruptRequest.objects.filter(
+                leave_request_id__in=leave_ids, type='manager_recall', status='pending_staff'
+            ).values_list('leave_request_id', flat=True)
+        ) if leave_ids else set()
+
+        targets = list(leaves) + [ir.leave_request for ir in interrupts if ir.leave_request_id]
+        created_by_employee = {}
+        employee_ids = {lr.employee_id for lr in targets}
+        if employee_ids:
+            for employee_id, created_at in LeaveRequest.objects.filter(
+                employee_id__in=employee_ids
+            ).order_by('created_at').values_list('employee_id', 'created_at'):
+                created_by_employee.setdefault(employee_id, []).append(created_at)
+        request_numbers = {
+            lr.id: bisect_right(created_by_employee.get(lr.employee_id, []), lr.created_at)
+            for lr in targets
+        }
+        return {'pending_recall_ids': pending_recall_ids, 'request_numbers': request_numbers}
+
+    def _build_leave_entry(self, lr: LeaveRequest, viewer, context):
         final_ev = self._final_approver_event(lr)
         timeline = _build_timeline_events(lr, viewer)
         interruption = None
@@ -497,11 +509,7 @@ class LeaveRequestViewSet(viewsets.ModelViewSet):
             affiliate_name = None
 
         # Check for pending recall requests
-        has_pending_recall = LeaveInterruptRequest.objects.filter(
-            leave_request=lr,
-            type='manager_recall',
-            status='pending_staff'
-        ).exists()
+        has_pending_recall = lr.id in context['pending_recall_ids']
 
         # Check if user can cancel this request
         can_cancel = False
@@ -510,16 +518,8 @@ class LeaveRequestViewSet(viewsets.ModelViewSet):
         except Exception:
             pass
 
-        # Compute request number for this user (chronological order)
-        request_number = None
-        try:
-            # Count how many requests this user made before this one (inclusive)
-            request_number = LeaveRequest.objects.filter(
-                employee=lr.employee,
-                created_at__lte=lr.created_at
-            ).count()
-        except Exception:
-            pass
+        # Request number for this user (chronological order, inclusive)
+        request_number = context['request_numbers'].get(lr.id)
 
         return {
             'record_type': 'leave',
@@ -550,7 +550,7 @@ class LeaveRequestViewSet(viewsets.ModelViewSet):
             'sort_ts': lr.updated_at or lr.created_at,
         }
 
-    def _build_interrupt_entry(self, ir: LeaveInterruptRequest, viewer):
+    def _build_interrupt_entry(self, ir: LeaveInterruptRequest, viewer, context):
         lr = ir.leave_request
 
         def status_display():
@@ -584,16 +584,8 @@ class LeaveRequestViewSet(viewsets.ModelViewSet):
         except Exception:
             affiliate_name = None
 
-        # Compute linked leave request number
-        leave_request_number = None
-        if lr:
-            try:
-                leave_request_number = LeaveRequest.objects.filter(
-                    employee=lr.employee,
-                    created_at__lte=lr.created_at
-                ).count()
-            except Exception:
-                pass
+        # Linked leave request number
+        leave_request_number = context['request_numbers'].get(lr.id) if lr else None
 
         return {
             'record_type': 'interrupt',
@@ -830,61 +822,27 @@ class LeaveRequestViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
+    @query_budget(8)
     def history_combined(self, request):
         """Return leave history plus interrupt requests as separate entries for the current user."""
         user = request.user
         viewer = user
-        leaves_qs = self.get_queryset().select_related('leave_type', 'employee__department__affiliate', 'employee__affiliate')
+        leaves_qs = with_timeline_relations(self.get_queryset().select_related('employee__department__affiliate', 'employee__affiliate'))
         interrupts_qs = LeaveInterruptRequest.objects.filter(leave_request__employee=user).select_related('leave_request__leave_type', 'leave_request__employee__department__affiliate', 'leave_request__employee__affiliate')
 
-        entries = [self._build_leave_entry(lr, viewer) for lr in leaves_qs]
-        entries += [self._build_interrupt_entry(ir, viewer) for ir in interrupts_qs]
+        leaves, interrupts = list(leaves_qs), list(interrupts_qs)
+        context = self._feed_context(leaves, interrupts)
+        entries = [self._build_leave_entry(lr, viewer, context) for lr in leaves]
+        entries += [self._build_interrupt_entry(ir, viewer, context) for ir in interrupts]
         entries = sorted(entries, key=lambda e: e.get('sort_ts') or timezone.now(), reverse=True)
         return Response(entries)
     
     @action(detail=False, methods=['get'])
+    @query_budget(3)
     def dashboard(self, request):
         """Get dashboard summary - supports R2"""
-        current_year = timezone.now().year
-        user_requests = self.get_queryset()
-        
-        # Calculate statistics
-        total_requests = user_requests.count()
-        pending_requests = user_requests.filter(status='pending').count()
-        approved_requests = user_requests.filter(status='approved').count()
-        rejected_requests = user_requests.filter(status='rejected').count()
-        
-        # Current year statistics
-        current_year_requests = user_requests.filter(start_date__year=current_year)
-        total_days_taken = sum(req.total_days or 0 for req in current_year_requests.filter(status='approved'))
-        pending_days = sum(req.total_days or 0 for req in current_year_requests.filter(status='pending'))
-        
-        # Recent requests (last 5) with stage-aware labels
-        recent_requests = user_requests[:5]
-        recent_serializer = LeaveRequestListSerializer(recent_requests, many=True)
-        recent_data = recent_serializer.data
-        # Prefer stage_label when it indicates the next pending approver for better UX
-        for item in recent_data:
-            try:
-                if item.get('stage_label') and item.get('status') in ['pending', 'manager_approved', 'hr_approved', 'ceo_approved']:
-                    item['status_display'] = item['stage_label']
-            except Exception:
-                # Non-fatal; keep default labels
-                pass
-        
-        dashboard_data = {
-            'summary': {
-                'total_requests': total_requests,
-                'pending_requests': pending_requests,
-                'approved_requests': approved_requests,
-                'rejected_requests': rejected_requests,
-                'total_days_taken_this_year': total_days_taken,
-                'pending_days': pending_days,
-            },
-            'recent_requests': recent_data
-        }
-        
-        return Response(dashboard_data)
+        from .dashboard import employee_dashboard
+        return Response(employee_dashboard(request.user))
 
     @action(detail=False, methods=['get'])
     def recent_combined(self, request):
@@ -896,11 +854,13 @@ class LeaveRequestViewSet(viewsets.ModelViewSet):
         except Exception:
             limit = 5
 
-        leaves_qs = self.get_queryset().select_related('leave_type', 'employee__department__affiliate', 'employee__affiliate').order_by('-updated_at')[: limit * 3]
+        leaves_qs = with_timeline_relations(self.get_queryset().select_related('employee__department__affiliate', 'employee__affiliate')).order_by('-updated_at')[: limit * 3]
         interrupts_qs = LeaveInterruptRequest.objects.filter(leave_request__employee=user).select_related('leave_request__leave_type', 'leave_request__employee__department__affiliate', 'leave_request__employee__affiliate').order_by('-updated_at')[: limit * 3]
 
-        entries = [self._build_leave_entry(lr, viewer) for lr in leaves_qs]
-        entries += [self._build_interrupt_entry(ir, viewer) for ir in interrupts_qs]
+        leaves, interrupts = list(leaves_qs), list(interrupts_qs)
+        context = self._feed_context(leaves, interrupts)
+        entries = [self._build_leave_entry(lr, viewer, context) for lr in leaves]
+        entries += [self._build_interrupt_entry(ir, viewer, context) for ir in interrupts]
         entries = sorted(entries, key=lambda e: e.get('sort_ts') or timezone.now(), reverse=True)
         return Response(entries[:limit])
 
@@ -1052,7 +1012,7 @@ class LeaveRequestViewSet(viewsets.ModelViewSet):
         return Response({'detail': 'Resume recorded.', 'resume_date': resume_date})
 
 
-class ManagerLeaveViewSet(viewsets.ModelViewSet):
+class ManagerLeaveViewSet(ConditionalGetMixin, CeoLookupCacheMixin, viewsets.ModelViewSet):
     """
     ViewSet for Managers to view and approve leave requests - supports R4
     Note: Despite being ModelViewSet, actual create/update/delete are not exposed.
@@ -1060,6 +1020,13 @@ class ManagerLeaveViewSet(viewsets.ModelViewSet):
     """
     serializer_class = LeaveRequestListSerializer  # Use list serializer with employee_department, employee_role, etc.
     permission_classes = [permissions.IsAuthenticated]
+    # Approval queues: routing depends on the approver's and employees' profiles
+    conditional_resources = {
+        action: ('leave-requests', 'leave-types', 'users', 'departments', 'affiliates')
+        for action in (
+            'list', 'pending_approvals', 'approval_counts', 'hr_approvals_categorized', 'ceo_approvals_categorized',
+        )
+    }
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = [
         'status', 'leave_type', 'start_date', 'end_date', 'employee',
@@ -1125,44 +1092,8 @@ class ManagerLeaveViewSet(viewsets.ModelViewSet):
     http_method_names = ['get', 'put', 'post', 'head', 'options']  # Disable DELETE, PATCH
     
     def get_queryset(self):  # type: ignore[override]
-        """Return leave requests available to the current approver.
-
-        Rules:
-        - manager: only requests from their direct reports (employee__manager = self.user)
-        - hr: all requests that are at or beyond Manager stage
-        - ceo: all requests that are at or beyond HR stage
-        - admin/superuser: all requests
-        - others: none
-        """
-        user = self.request.user
-        qs = LeaveRequest.objects.select_related(
-            'employee', 
-            'employee__affiliate', 
-            'employee__department', 
-            'employee__department__affiliate'
-        )
-        role = getattr(user, 'role', None)
-
-        # Superuser/admin: full access
-        if getattr(user, 'is_superuser', False) or role == 'admin':
-            return qs
-
-        if role == 'manager':
-            # Direct reports or same department where user is HOD/Manager, but EXCLUDE own requests
-            return qs.filter(Q(employee__manager=user) | Q(employee__department__hod=user)).exclude(employee=user)
-
-        if role == 'hr':
-            # Items that have passed Manager stage or are pending (to allow visibility)
-            # Include 'ceo_approved' for SDSL/SBL CEO-first flow where HR gives final approval
-            return qs.filter(status__in=['pending', 'manager_approved', 'hr_approved', 'ceo_approved', 'approved', 'rejected'])
-
-        if role == 'ceo':
-            # Items that require or have passed CEO stage.
-            # Merban: hr_approved; SDSL/SBL: pending. Include approved/rejected for record views.
-            return qs.filter(status__in=['pending', 'hr_approved', 'approved', 'rejected'])
-
-        # Everyone else: no access
-        return qs.none()
+        """Return leave requests available to the current approver (see approver_queryset)."""
+        return approver_queryset(self.request.user)
     
     def get_permissions(self):
         """Custom permissions for different actions"""
@@ -1285,6 +1216,7 @@ class ManagerLeaveViewSet(viewsets.ModelViewSet):
             raise
     
     @action(detail=False, methods=['get'])
+    @query_budget(10)
     def pending_approvals(self, request):
         """Get leave requests pending approval for current user's role"""
         user = request.user
@@ -1392,7 +1324,7 @@ class ManagerLeaveViewSet(viewsets.ModelViewSet):
         """Manager-specific counts proxy so frontend can call /leaves/manager/approval_counts/.
 
         This mirrors the logic in `LeaveRequestViewSet.approval_counts` but uses
-        the Manager viewset's `get_queryset()` so counts reflect manager/HR/CEO visibility rules.
+        the Manager viewset's `approver_queryset()` so counts reflect manager/HR/CEO visibility rules.
         """
         import logging
         logger = logging.getLogger('leaves')
@@ -1403,54 +1335,12 @@ class ManagerLeaveViewSet(viewsets.ModelViewSet):
         except Exception:
             logger.exception('Failed to log manager.approval_counts call')
 
-        counts = {'manager_approvals': 0, 'hr_approvals': 0, 'ceo_approvals': 0, 'total': 0}
         try:
-            if user_role == 'manager':
-                counts['manager_approvals'] = self.get_queryset().filter(status='pending').exclude(
-                    Q(employee__department__affiliate__name__in=['SDSL', 'SBL']) |
-                    Q(employee__affiliate__name__in=['SDSL', 'SBL']) |
-                    Q(employee__role='ceo')
-                ).count()
-                # include early return interrupts awaiting manager
-                counts['manager_approvals'] += LeaveInterruptRequest.objects.filter(type='staff_return', status='pending_manager').count()
-            elif user_role == 'hr':
-                merban_count = self.get_queryset().filter(status='manager_approved').exclude(
-                    Q(employee__department__affiliate__name__in=['SDSL', 'SBL']) |
-                    Q(employee__affiliate__name__in=['SDSL', 'SBL'])
-                ).count()
-                ceo_approved_count = self.get_queryset().filter(status='ceo_approved').count()
-                pending_ceo_self = self.get_queryset().filter(status='pending', employee__role='ceo').count()
-                interrupts_hr = LeaveInterruptRequest.objects.filter(type='staff_return', status='pending_hr').count()
-                counts['hr_approvals'] = merban_count + ceo_approved_count + pending_ceo_self + interrupts_hr
-            elif user_role == 'ceo':
-                from .services import ApprovalWorkflowService
-                ceo_count = 0
-                candidate_qs = self.get_queryset().filter(status__in=['pending', 'hr_approved'])
-                for req in candidate_qs:
-                    handler = ApprovalWorkflowService.get_handler(req)
-                    if handler.can_approve(user, req.status):
-                        ceo_count += 1
-                counts['ceo_approvals'] = ceo_count
-            elif user_role == 'admin':
-                counts['manager_approvals'] = self.get_queryset().filter(status='pending').exclude(
-                    Q(employee__department__affiliate__name__in=['SDSL', 'SBL']) |
-                    Q(employee__affiliate__name__in=['SDSL', 'SBL']) |
-                    Q(employee__role='ceo')
-                ).count()
-                merban_count = self.get_queryset().filter(status='manager_approved').exclude(
-                    Q(employee__department__affiliate__name__in=['SDSL', 'SBL']) |
-                    Q(employee__affiliate__name__in=['SDSL', 'SBL'])
-                ).count()
-                ceo_approved_count = self.get_queryset().filter(status='ceo_approved').count()
-                pending_ceo_self = self.get_queryset().filter(status='pending', employee__role='ceo').count()
-                interrupts_hr = LeaveInterruptRequest.objects.filter(type='staff_return', status='pending_hr').count()
-                counts['hr_approvals'] = merban_count + ceo_approved_count + pending_ceo_self + interrupts_hr
-                counts['ceo_approvals'] = self.get_queryset().filter(status='hr_approved').count()
-
-            counts['total'] = counts['manager_approvals'] + counts['hr_approvals'] + counts['ceo_approvals']
+            counts = approval_counts(user)
         except Exception as e:
             logger.error(f'Error computing manager approval_counts for user={getattr(user, "username", None)}: {str(e)}', exc_info=True)
-            return Response({**counts, 'error': 'unable to compute counts'})
+            empty = {'manager_approvals': 0, 'hr_approvals': 0, 'ceo_approvals': 0, 'total': 0}
+            return Response({**empty, 'error': 'unable to compute counts'})
 
         return Response(counts)
 
@@ -1466,6 +1356,8 @@ class ManagerLeaveViewSet(viewsets.ModelViewSet):
         return Response({'recall_pending': count})
 
     @action(detail=False, methods=['get'])
+    @query_budget(8)
+    @read_replica
     def hr_approvals_categorized(self, request):
         """Expose HR categorization via manager prefix so HR UI can call `/leaves/manager/hr_approvals_categorized/`."""
         # Reuse the logic from LeaveRequestViewSet but operate on this viewset's queryset
@@ -1532,6 +1424,7 @@ class ManagerLeaveViewSet(viewsets.ModelViewSet):
         return Response({'groups': serialized_groups, 'counts': counts, 'total': sum(counts.values())})
 
     @action(detail=False, methods=['get'])
+    @read_replica
     def recent_activity(self, request):
         """Expose recent_activity via manager prefix so dashboard/CEO/HR calls succeed."""
         user = request.user
@@ -1559,6 +1452,7 @@ class ManagerLeaveViewSet(viewsets.ModelViewSet):
         return Response({'count': len(data), 'results': data})
 
     @action(detail=False, methods=['get'])
+    @read_replica
     def ceo_approvals_categorized(self, request):
         """CEO-specific endpoint exposed under manager prefix so frontend calls succeed.
 
@@ -1964,6 +1858,7 @@ class ManagerLeaveViewSet(viewsets.ModelViewSet):
         return Response({'detail': 'Early return rejected.'})
 
     @action(detail=False, methods=['get'], url_path='export_all/all')
+    @read_replica
     def export_all(self, request):
         """Export leave requests as CSV for audit.
 
@@ -1979,11 +1874,13 @@ class ManagerLeaveViewSet(viewsets.ModelViewSet):
     
 
     @action(detail=False, methods=['get'], url_path='export-all/all')
+    @read_replica
     def export_all_hyphen(self, request):
         """Alias endpoint for export_all to support hyphen URL used by some clients."""
         return self.export_all(request)
 
     @action(detail=False, methods=['get'], url_path='export_all_list')
+    @read_replica
     def export_all_list(self, request):
         """Safe alias endpoint that avoids DRF router pk collisions.
 
@@ -2031,6 +1928,7 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 
 
+@read_replica
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def export_all_proxy(request):
@@ -2283,6 +2181,7 @@ def export_all_handler(request):
         return Response(response_data)
 
     @action(detail=False, methods=['get'])
+    @query_budget(8)
     def hr_approvals_categorized(self, request):
         """HR-specific endpoint: categorize approvable pending requests by affiliate.
 
@@ -2669,6 +2568,11 @@ def export_all_handler(request):
                 LeaveRequest.objects.all().delete()
                 # Reset all leave balances to default state (keep entitled_days)
                 LeaveBalance.objects.all().update(used_days=0, pending_days=0)
+                from leave_management.caching import bump_version
+                from leave_management.conditional import bump_all_resources
+                from .dashboard import LEAVE_DATA_VERSION
+                bump_version(LEAVE_DATA_VERSION)
+                bump_all_resources()
 
             logger.info(f'System reset performed by {user.username}: {leave_requests_count} requests deleted, {balances_count} balances reset')
 
@@ -2741,9 +2645,10 @@ class IsHRAdminPermission(permissions.BasePermission):
         return bool(getattr(user, 'is_superuser', False) or role in ['hr', 'admin'])
 
 
-class EmploymentGradeViewSet(viewsets.ModelViewSet):
+class EmploymentGradeViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = EmploymentGrade.objects.filter(is_active=True)
     serializer_class = EmploymentGradeSerializer
+    conditional_resources = {'list': ('employment-grades',), 'retrieve': ('employment-grades',)}
     # Default relaxed auth; enforce HR/Admin for mutating actions in get_permissions
     permission_classes = [permissions.IsAuthenticated]
 
@@ -2755,12 +2660,15 @@ class EmploymentGradeViewSet(viewsets.ModelViewSet):
         return [permissions.IsAuthenticated(), IsHRAdminPermission()]
 
 
-class LeaveGradeEntitlementViewSet(viewsets.ModelViewSet):
+class LeaveGradeEntitlementViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = LeaveGradeEntitlement.objects.select_related('grade', 'leave_type')
     serializer_class = LeaveGradeEntitlementSerializer
     permission_classes = [permissions.IsAuthenticated, IsHRAdminPermission]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['grade', 'leave_type']
+    conditional_resources = {
+        action: ('grade-entitlements', 'employment-grades', 'leave-types') for action in ('list', 'retrieve')
+    }
 
     @action(detail=False, methods=['post'])
     def bulk_set(self, request):
@@ -2771,14 +2679,12 @@ class LeaveGradeEntitlementViewSet(viewsets.ModelViewSet):
         grade_id = request.data.get('grade_id')
         items = request.data.get('items', [])
         apply_now = bool(request.data.get('apply_now'))
-        try:
-            grade = EmploymentGrade.objects.get(pk=grade_id, is_active=True)
-        except EmploymentGrade.DoesNotExist:
+        grade = reference_data.employment_grades.get(grade_id)
+        if grade is None or not grade.is_active:
             return Response({'error': 'grade not found'}, status=404)
 
-        updated = 0
-        created = 0
         errors = []
+        parsed = []
         from decimal import Decimal
         for idx, it in enumerate(items):
             try:
@@ -2790,21 +2696,20 @@ class LeaveGradeEntitlementViewSet(viewsets.ModelViewSet):
             if days < 0:
                 errors.append({'index': idx, 'error': 'entitled_days must be non-negative'})
                 continue
-            try:
-                lt = LeaveType.objects.get(pk=lt_id, is_active=True)
-            except LeaveType.DoesNotExist:
+            parsed.append((idx, lt_id, days))
+
+        leave_types = LeaveBalanceService.active_leave_types(lt_id for _, lt_id, _ in parsed)
+        entitlements = {}
+        for idx, lt_id, days in parsed:
+            if lt_id not in leave_types:
                 errors.append({'index': idx, 'error': f'leave_type {lt_id} not found'})
                 continue
-            ent, created_flag = LeaveGradeEntitlement.objects.get_or_create(
-                grade=grade, leave_type=lt, defaults={'entitled_days': days}
-            )
-            if created_flag:
-                created += 1
-            else:
-                if ent.entitled_days != days:
-                    ent.entitled_days = days
-                    ent.save(update_fields=['entitled_days', 'updated_at'])
-                    updated += 1
+            entitlements[lt_id] = days
+        errors.sort(key=lambda e: e['index'])
+
+        counts = LeaveBalanceService.upsert_grade_entitlements(grade, entitlements)
+        updated = counts['updated']
+        created = counts['created']
 
         applied = 0
         if apply_now:
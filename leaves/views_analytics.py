@@ -0,0 +1,118 @@
+"""
+Views for HR absence analytics and approval workflow metrics.
+"""
+import csv
+import logging
+
+from django.http import HttpResponse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.permissions import BasePermission, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from leave_management.conditional import ConditionalGetMixin
+from leaves.analytics import ANALYTICS_RESOURCES, DIMENSIONS, absence_analytics
+from leaves.snapshots import current_snapshot
+from leaves.workflow_metrics import (
+    EXPORT_COLUMNS, WORKFLOW_METRICS_RESOURCES, metrics_bucket, metrics_rows, workflow_metrics,
+)
+from leaves.views import IsHRAdminPermission
+
+logger = logging.getLogger('leaves')
+
+
+def _year(request):
+    """The `year` query parameter (default: the current year), or an error Response."""
+    try:
+        year = int(request.query_params.get('year') or timezone.localdate().year)
+    except ValueError:
+        return None, Response({'error': 'year must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+    if not 2000 <= year <= timezone.localdate().year + 1:
+        return None, Response({'error': 'year is out of range'}, status=status.HTTP_400_BAD_REQUEST)
+    return year, None
+
+
+class IsHRAdminCEOPermission(BasePermission):
+    """HR, Admin, CEO or superuser (the roles that may export all requests)."""
+    def has_permission(self, request, view) -> bool:  # type: ignore[override]
+        user = request.user
+        return bool(getattr(user, 'is_superuser', False) or getattr(user, 'role', None) in ['hr', 'admin', 'ceo'])
+
+
+class AbsenceAnalyticsAPIView(ConditionalGetMixin, APIView):
+    """
+    HR-only absence analytics.
+
+    GET /api/leaves/analytics/absence/?year=YYYY&group=department
+
+    Query Parameters:
+    - year (optional): calendar year, default the current one
+    - group (optional): one of department, affiliate, grade, month; default all
+
+    Returns absence rate, average duration, Bradford factor, entitlement utilization
+    and approval lead times per group (see leaves.analytics), plus `source`
+    ('snapshot' or 'database') and `snapshot_at`.
+    """
+    permission_classes = [IsAuthenticated, IsHRAdminPermission]
+    conditional_resources = ANALYTICS_RESOURCES
+
+    def get_conditional_scope(self):
+        # A rebuilt snapshot changes the figures without a resource write
+        snapshot = current_snapshot()
+        return (snapshot.generation if snapshot else 'db',)
+
+    def get(self, request):
+        year, error = _year(request)
+        if error:
+            return error
+        group = request.query_params.get('group')
+        if group and group not in DIMENSIONS:
+            return Response(
+                {'error': f"group must be one of {', '.join(DIMENSIONS)}"}, status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        data = absence_analytics(year)
+        if group:
+            data = {key: value for key, value in data.items() if not key.startswith('by_') or key == f'by_{group}'}
+        return Response(data)
+
+
+class WorkflowMetricsAPIView(ConditionalGetMixin, APIView):
+    """
+    Time requests spend at each approval stage.
+
+    GET /api/leaves/analytics/workflow/?year=YYYY[&export=csv]
+
+    Query Parameters:
+    - year (optional): year the requests were submitted, default the current one
+    - export (optional): 'csv' for a flat file of every section, for dashboards
+
+    Returns count, p50/p90/max hours and open backlog per affiliate workflow stage
+    (by_stage), per approver (by_approver) and per month of decision (by_month);
+    see leaves.workflow_metrics.
+    """
+    permission_classes = [IsAuthenticated, IsHRAdminCEOPermission]
+    conditional_resources = WORKFLOW_METRICS_RESOURCES
+
+    def get_conditional_scope(self):
+        # Backlog ages (open, oldest_open_hours) change without a resource write
+        return (metrics_bucket(),)
+
+    def get(self, request):
+        year, error = _year(request)
+        if error:
+            return error
+        export = request.query_params.get('export')
+        if export and export != 'csv':
+            return Response({'error': 'export must be csv'}, status=status.HTTP_400_BAD_REQUEST)
+
+        data = workflow_metrics(year)
+        if not export:
+            return Response(data)
+        response = HttpResponse(content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="workflow_metrics_{year}.csv"'
+        writer = csv.writer(response)
+        writer.writerow(EXPORT_COLUMNS)
+        writer.writerows(metrics_rows(data))
+        return response
@@ -0,0 +1,59 @@
+"""
+Views for bulk data imports.
+"""
+import io
+
+from rest_framework import status
+from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from leaves.importers import HistoricalLeaveImporter, iter_csv_records, iter_parquet_records
+
+
+class LeaveHistoryImportView(APIView):
+    """
+    HR-only historical leave import.
+
+    POST /api/leaves/import-history/ (multipart)
+    - file (required): CSV or Parquet file
+    - format (optional): 'csv' or 'parquet'; inferred from the file name when omitted
+    - dry_run (optional): validate only
+    """
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser, FormParser]
+
+    def post(self, request):
+        user = request.user
+        if not (getattr(user, 'is_superuser', False) or getattr(user, 'role', None) in ['hr', 'admin']):
+            return Response({'detail': 'Only HR can import leave history'}, status=status.HTTP_403_FORBIDDEN)
+
+        upload = request.FILES.get('file')
+        if not upload:
+            return Response({'error': 'file is required'}, status=status.HTTP_400_BAD_REQUEST)
+        fmt = (request.data.get('format') or '').lower()
+        if not fmt:
+            fmt = 'parquet' if upload.name.lower().endswith(('.parquet', '.pq')) else 'csv'
+        if fmt not in ('csv', 'parquet'):
+            return Response({'error': "format must be 'csv' or 'parquet'"}, status=status.HTTP_400_BAD_REQUEST)
+        dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+
+        importer = HistoricalLeaveImporter(dry_run=dry_run)
+        if fmt == 'parquet':
+            report = importer.run(iter_parquet_records(upload.file))
+        else:
+            text = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+            try:
+                report = importer.run(iter_csv_records(text))
+            finally:
+                text.detach()
+
+        if report['read_error']:
+            # Rows before the unreadable part are imported (and their balances rebuilt)
+            return Response(
+                {**report, 'error': f"Could not read file {report['read_error']}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        code = status.HTTP_201_CREATED if report['created'] else status.HTTP_200_OK
+        return Response(report, status=code)
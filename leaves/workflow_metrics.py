@@ -0,0 +1,204 @@
+"""
+Approval workflow stage latency (WorkflowMetricsAPIView).
+
+LeaveRequest stamps each stage's decision (`manager_approval_date`,
+`hr_approval_date`, `ceo_approval_date`; rejections stamp the rejecting role's
+date). A stage's time is from the previous decision in the affiliate's workflow,
+or from submission for the first stage, to its own; stages a request skipped
+(a CEO's own request, say) are simply absent. Workflows follow
+ApprovalWorkflowService: Merban (and the default) is manager -> HR -> CEO,
+SDSL/SBL are CEO -> HR.
+
+One query loads the requests created in the year as columns; the stage events
+are array operations over them and the distributions (count, p50, p90, max
+hours) are pandas group-bys, per affiliate and stage, per approver and per
+month of the decision. `open` counts requests still waiting at a stage and the
+age of the oldest, which shows backlogs such as the CEO queue.
+
+`metrics_rows` flattens a report for the dashboard CSV export.
+"""
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+from django.utils import timezone
+
+from leave_management.caching import get_versions, versioned_cache
+from leave_management.conditional import ALL_RESOURCES, resource_version_name
+from users.models import CustomUser
+from .analytics import load_users
+from .approval_counts import CEO_FIRST_AFFILIATES
+from .models import LeaveRequest
+
+
+# Resources whose versions key the cache (and the endpoint's ETag)
+WORKFLOW_METRICS_RESOURCES = ('leave-requests', 'users', 'departments', 'affiliates')
+WORKFLOW_METRICS_TTL = 60 * 10
+WORKFLOWS = {
+    'standard': ('manager', 'hr', 'ceo'),
+    'ceo_first': ('ceo', 'hr'),
+}
+# The stage an open request waits at, by workflow and status
+WAITING_STAGE = {
+    'standard': {'pending': 'manager', 'manager_approved': 'hr', 'hr_approved': 'ceo'},
+    'ceo_first': {'pending': 'ceo', 'ceo_approved': 'hr'},
+}
+REQUEST_COLUMNS = [
+    'id', 'employee_id', 'status', 'created_at', 'manager_at', 'hr_at', 'ceo_at',
+    'manager_by', 'hr_by', 'ceo_by',
+]
+EXPORT_COLUMNS = ['section', 'affiliate', 'workflow', 'stage', 'month', 'approver_id', 'approver',
+                  'count', 'p50_hours', 'p90_hours', 'max_hours', 'open', 'oldest_open_hours']
+
+
+def workflow_for(affiliate_name) -> str:
+    """Workflow key of an affiliate, as ApprovalWorkflowService.get_handler picks it."""
+    return 'ceo_first' if (affiliate_name or '').strip().upper() in CEO_FIRST_AFFILIATES else 'standard'
+
+
+def load_requests(year) -> pd.DataFrame:
+    """Requests submitted in `year` with their stage timestamps and deciders (one query)."""
+    rows = LeaveRequest.objects.filter(
+        created_at__date__gte=date(year, 1, 1), created_at__date__lte=date(year, 12, 31),
+    ).exclude(status='cancelled').values_list(
+        'id', 'employee_id', 'status', 'created_at', 'manager_approval_date', 'hr_approval_date',
+        'ceo_approval_date', 'manager_approved_by_id', 'hr_approved_by_id', 'ceo_approved_by_id',
+    )
+    frame = pd.DataFrame.from_records(list(rows), columns=REQUEST_COLUMNS)
+    for column in ('created_at', 'manager_at', 'hr_at', 'ceo_at'):
+        frame[column] = pd.to_datetime(frame[column], utc=True)
+    return frame
+
+
+def stage_events(requests: pd.DataFrame, now) -> pd.DataFrame:
+    """One row per (request, stage) that was decided or is waiting.
+
+    Columns: affiliate, workflow, stage, approver_id, decided_at, hours (decided
+    stages) and waiting (True for the stage a request is queued at, hours = age).
+    """
+    now = pd.Timestamp(now)
+    events = []
+    for workflow, stages in WORKFLOWS.items():
+        frame = requests[requests['workflow'] == workflow]
+        if frame.empty:
+            continue
+        started = frame['created_at']
+        waits_at = frame['status'].map(WAITING_STAGE[workflow]).to_numpy()
+        for stage in stages:
+            decided = frame[f'{stage}_at']
+            done = decided.notna().to_numpy()
+            hours = ((decided - started).dt.total_seconds() / 3600).clip(lower=0)
+            queued = (waits_at == stage) & ~done
+            age = ((now - started).dt.total_seconds() / 3600).clip(lower=0)
+            events.append(pd.DataFrame({
+                'affiliate': frame['affiliate'],
+                'workflow': workflow,
+                'stage': stage,
+                'approver_id': frame[f'{stage}_by'],
+                'decided_at': decided,
+                'hours': np.where(done, hours, age),
+                'waiting': queued,
+            })[done | queued])
+            started = decided.fillna(started)
+    if not events:
+        # Typed, so the boolean masks and group-bys downstream still apply
+        return pd.DataFrame({
+            'affiliate': pd.Series(dtype=object), 'workflow': pd.Series(dtype=object),
+            'stage': pd.Series(dtype=object), 'approver_id': pd.Series(dtype=float),
+            'decided_at': pd.Series(dtype='datetime64[ns, UTC]'), 'hours': pd.Series(dtype=float),
+            'waiting': pd.Series(dtype=bool),
+        })
+    return pd.concat(events, ignore_index=True)
+
+
+def _hours(value):
+    return None if pd.isna(value) else round(float(value), 1)
+
+
+def _distributions(events: pd.DataFrame, keys) -> list:
+    """[{**keys, count, p50_hours, p90_hours, max_hours, open, oldest_open_hours}] per group of `keys`."""
+    decided = events[~events['waiting']].groupby(keys)['hours']
+    waiting = events[events['waiting']].groupby(keys)['hours']
+    frame = pd.DataFrame({
+        'count': decided.size(),
+        'p50_hours': decided.quantile(0.5),
+        'p90_hours': decided.quantile(0.9),
+        'max_hours': decided.max(),
+        'open': waiting.size(),
+        'oldest_open_hours': waiting.max(),
+    }).sort_index()
+    rows = []
+    for index, row in frame.iterrows():
+        index = index if isinstance(index, tuple) else (index,)
+        rows.append({
+            **{key: value.item() if hasattr(value, 'item') else value for key, value in zip(keys, index)},
+            'count': 0 if pd.isna(row['count']) else int(row['count']),
+            'p50_hours': _hours(row['p50_hours']),
+            'p90_hours': _hours(row['p90_hours']),
+            'max_hours': _hours(row['max_hours']),
+            'open': 0 if pd.isna(row['open']) else int(row['open']),
+            'oldest_open_hours': _hours(row['oldest_open_hours']),
+        })
+    return rows
+
+
+def _approver_names(ids) -> dict:
+    rows = CustomUser.objects.filter(pk__in=ids).values_list('id', 'first_name', 'last_name', 'username')
+    return {pk: f'{first} {last}'.strip() or username for pk, first, last, username in rows}
+
+
+def compute_workflow_metrics(year, now=None, users=None, requests=None) -> dict:
+    """Stage latency distributions for requests submitted in `year` (frames loaded when not given)."""
+    now = now or timezone.now()
+    users = load_users() if users is None else users
+    requests = load_requests(year) if requests is None else requests
+    requests = requests.merge(users[['employee_id', 'affiliate']], on='employee_id', how='left')
+    requests['affiliate'] = requests['affiliate'].fillna('Unassigned')
+    requests['workflow'] = requests['affiliate'].map(workflow_for)
+
+    events = stage_events(requests, now)
+    by_stage = _distributions(events, ['affiliate', 'workflow', 'stage'])
+    by_stage.sort(key=lambda row: (row['affiliate'], WORKFLOWS[row['workflow']].index(row['stage'])))
+
+    decided = events[~events['waiting'] & events['approver_id'].notna()].astype({'approver_id': 'int64'})
+    by_approver = _distributions(decided, ['stage', 'approver_id'])
+    names = _approver_names([row['approver_id'] for row in by_approver])
+    for row in by_approver:
+        row['approver'] = names.get(row['approver_id'], '')
+
+    dated = events[~events['waiting']].assign(month=lambda f: f['decided_at'].dt.strftime('%Y-%m'))
+    return {
+        'year': year,
+        'generated_at': now.isoformat(),
+        'workflows': {key: list(stages) for key, stages in WORKFLOWS.items()},
+        'by_stage': by_stage,
+        'by_approver': by_approver,
+        'by_month': _distributions(dated, ['month', 'workflow', 'stage']),
+    }
+
+
+def metrics_bucket() -> int:
+    """The current WORKFLOW_METRICS_TTL window; open backlog ages move with the clock."""
+    return int(time.time() // WORKFLOW_METRICS_TTL)
+
+
+def workflow_metrics(year=None) -> dict:
+    """Cached compute_workflow_metrics for `year` (default: the current year)."""
+    today = timezone.localdate()
+    year = year or today.year
+    names = [resource_version_name(r) for r in (ALL_RESOURCES, *WORKFLOW_METRICS_RESOURCES)]
+    versions = ':'.join(str(v) for v in get_versions(*names).values())
+    key = f'workflow-metrics:{year}:{metrics_bucket()}:{versions}'
+    data = versioned_cache().get(key)
+    if data is None:
+        data = compute_workflow_metrics(year)
+        versioned_cache().set(key, data, WORKFLOW_METRICS_TTL)
+    return data
+
+
+def metrics_rows(data: dict):
+    """Yield EXPORT_COLUMNS rows of every section, for the CSV export."""
+    for section in ('by_stage', 'by_approver', 'by_month'):
+        for row in data[section]:
+            yield [section[3:]] + [row.get(column, '') for column in EXPORT_COLUMNS[1:]]
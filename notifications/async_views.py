@@ -0,0 +1,10 @@
+"""Async read views for ASGI deployments (see leave_management.async_api)."""
+from leave_management.async_api import async_api_view
+
+from .inbox import abuild_inbox
+from .views import inbox_limit
+
+
+@async_api_view()
+async def inbox(request):
+    return await abuild_inbox(request.user, inbox_limit(request))
@@ -0,0 +1,35 @@
+"""
+Notification inbox for the header bell: unread and total counts plus the latest rows.
+
+`build_inbox` backs NotificationInboxView; `abuild_inbox` serves the async endpoint
+(notifications.async_views) and runs its three queries concurrently.
+"""
+import asyncio
+
+from .models import Notification
+
+INBOX_SIZE = 20
+INBOX_FIELDS = ('id', 'notification_type', 'title', 'message', 'leave_request_id', 'meta', 'is_read', 'created_at')
+
+
+def _inbox_querysets(user, limit):
+    mine = Notification.objects.filter(recipient=user)
+    return mine.filter(is_read=False), mine, mine.order_by('-created_at').values(*INBOX_FIELDS)[:limit]
+
+
+def _payload(unread, total, rows) -> dict:
+    return {'unread_count': unread, 'count': total, 'results': rows}
+
+
+def build_inbox(user, limit=INBOX_SIZE) -> dict:
+    unread, mine, latest = _inbox_querysets(user, limit)
+    return _payload(unread.count(), mine.count(), list(latest))
+
+
+async def abuild_inbox(user, limit=INBOX_SIZE) -> dict:
+    unread, mine, latest = _inbox_querysets(user, limit)
+
+    async def rows():
+        return [row async for row in latest]
+
+    return _payload(*await asyncio.gather(unread.acount(), mine.acount(), rows()))
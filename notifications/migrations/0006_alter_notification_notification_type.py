@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0005_sitesetting'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='notification',
+            name='notification_type',
+            field=models.CharField(choices=[('leave_submitted', 'Leave Request Submitted'), ('leave_manager_approved', 'Leave Request Approved by Manager'), ('leave_hr_approved', 'Leave Request Approved by HR'), ('leave_approved', 'Leave Request Fully Approved'), ('leave_rejected', 'Leave Request Rejected'), ('leave_cancelled', 'Leave Request Cancelled'), ('leave_overlap_detected', 'Leave Overlap Detected'), ('balance_low', 'Leave Balance Low'), ('approval_reminder', 'Approval Reminder'), ('approval_escalated', 'Approval Escalated'), ('system', 'System Notification')], max_length=30),
+        ),
+    ]
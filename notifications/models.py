@@ -16,6 +16,8 @@ class Notification(models.Model):
         ('leave_cancelled', 'Leave Request Cancelled'),
         ('leave_overlap_detected', 'Leave Overlap Detected'),
         ('balance_low', 'Leave Balance Low'),
+        ('approval_reminder', 'Approval Reminder'),
+        ('approval_escalated', 'Approval Escalated'),
         ('system', 'System Notification'),
     ]
     
@@ -300,4 +300,44 @@ class LeaveNotificationService:
             logger.info(f'Sent overlap notifications for leave request {leave_request.id} - {overlap_summary["total_overlaps"]} overlaps detected')
             
         except Exception as e:
-            logger.error(f'Error sending overlap notification: {str(e)}', exc_info=True)
\ No newline at end of file
+            logger.error(f'Error sending overlap notification: {str(e)}', exc_info=True)
+
+    @staticmethod
+    def notify_approval_reminder(leave_request, recipient, waiting_hours):
+        """Remind the approver of a request waiting at their stage"""
+        try:
+            Notification.objects.create(
+                recipient=recipient,
+                sender=None,
+                notification_type='approval_reminder',
+                title=f'Reminder: Leave Request from {leave_request.employee.get_full_name()} Awaits Your Approval',
+                message=f'The leave request from {leave_request.employee.get_full_name()} for {leave_request.leave_type.name} from {leave_request.start_date} to {leave_request.end_date} has been waiting for {waiting_hours:.0f} hours ({leave_request.get_status_display()}).',
+                leave_request=leave_request,
+                meta={'waiting_hours': round(waiting_hours, 1), 'status': leave_request.status}
+            )
+            logger.info(f'Sent approval reminder to {recipient.username} for leave request {leave_request.id}')
+        except Exception as e:
+            logger.error(f'Error sending approval reminder: {str(e)}', exc_info=True)
+
+    @staticmethod
+    def notify_approval_escalated(leave_request, recipients, approver, waiting_hours):
+        """Notify fallback approvers of a request that overran its approval SLA"""
+        try:
+            approver_name = approver.get_full_name() if approver else 'no approver assigned'
+            for recipient in recipients:
+                Notification.objects.create(
+                    recipient=recipient,
+                    sender=None,
+                    notification_type='approval_escalated',
+                    title=f'Escalated: Leave Request from {leave_request.employee.get_full_name()}',
+                    message=f'The leave request from {leave_request.employee.get_full_name()} for {leave_request.leave_type.name} from {leave_request.start_date} to {leave_request.end_date} has been waiting for {waiting_hours:.0f} hours ({leave_request.get_status_display()}, {approver_name}) and has been escalated to you.',
+                    leave_request=leave_request,
+                    meta={
+                        'waiting_hours': round(waiting_hours, 1),
+                        'status': leave_request.status,
+                        'approver_id': getattr(approver, 'pk', None),
+                    }
+                )
+            logger.info(f'Escalated leave request {leave_request.id} to {len(recipients)} fallback approver(s)')
+        except Exception as e:
+            logger.error(f'Error sending escalation notification: {str(e)}', exc_info=True)
@@ -1,6 +1,10 @@
+from django.conf import settings
 from django.urls import path
+from . import async_views
+from .views import NotificationInboxView
 from .views_settings import OverlapSettingsAPIView
 
 urlpatterns = [
     path('settings/overlap/', OverlapSettingsAPIView.as_view(), name='overlap-settings'),
+    path('inbox/', async_views.inbox if settings.ASYNC_READ_VIEWS else NotificationInboxView.as_view(), name='notification-inbox'),
 ]
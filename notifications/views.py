@@ -1,3 +1,20 @@
-from django.shortcuts import render
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-# Create your views here.
+from .inbox import INBOX_SIZE, build_inbox
+
+
+def inbox_limit(request) -> int:
+    try:
+        return max(1, min(int(request.GET.get('limit', INBOX_SIZE)), 100))
+    except ValueError:
+        return INBOX_SIZE
+
+
+class NotificationInboxView(APIView):
+    """Unread count and latest notifications for the current user."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return Response(build_inbox(request.user, inbox_limit(request)))
@@ -1,37 +1,37 @@
-import os, sys
-PROJECT_ROOT = os.path.dirname(os.path.dirname(__file__))
-if PROJECT_ROOT not in sys.path:
-    sys.path.insert(0, PROJECT_ROOT)
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'leave_management.settings')
-import django
-django.setup()
-import requests
-from users.models import CustomUser
-
-BASE = 'http://127.0.0.1:8000/api/auth/token/'
+"""
+Log every user in once against a local server and list the accounts that fail.
+
+Thin wrapper around scripts/load_harness.py (login journey only); use the harness
+directly for concurrent load and latency figures.
+"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from load_harness import LoadHarness, accounts_from_db, print_report  # noqa: E402
+
+BASE = 'http://127.0.0.1:8000'
 # Assuming all test accounts share the same seeded password
 DEFAULT_PASSWORD = 'AdminChangeMe123!'
 
+
 def main():
-    rows = []
-    for u in CustomUser.objects.all():
-        try:
-            r = requests.post(BASE, json={'username': u.email, 'password': DEFAULT_PASSWORD}, timeout=5)
-            rows.append((u.email, u.role, r.status_code))
-            print(f"{u.email} -> {r.status_code}")
-        except Exception as e:
-            rows.append((u.email, u.role, f'ERR:{e.__class__.__name__}'))
-            print(f"{u.email} -> ERR {e}")
-    # Summary
-    success = [r for r in rows if r[2] == 200]
-    failed = [r for r in rows if r[2] != 200]
-    print("\n=== Token Test Summary ===")
-    print(f"Successful ({len(success)}):")
-    for r in success: print("  ", r)
-    print(f"Failed ({len(failed)}):")
-    for r in failed: print("  ", r)
-    if failed:
+    accounts = accounts_from_db('', DEFAULT_PASSWORD)
+    # Email logins, as the original serial check used
+    from users.models import CustomUser
+    emails = dict(CustomUser.objects.filter(is_active=True).values_list('username', 'email'))
+    for account in accounts:
+        account.login = emails.get(account.login) or account.login
+
+    harness = LoadHarness(BASE, accounts, mix={'login': 1}, concurrency=10, journeys=len(accounts))
+    report = asyncio.run(harness.run())
+    print_report(report)
+    for _, status, login in harness.stats.failures:
+        print(f"  {login} -> {status}")
+    if harness.stats.failures:
         print("\nRun password reset script if needed.")
 
+
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,143 @@
+"""
+Compare read throughput of the WSGI and ASGI server modes at equal worker counts.
+
+Starts the app under gunicorn (sync workers, DRF views) and then under uvicorn
+(ASYNC_READ_VIEWS on, so the read endpoints are the async views), each with
+--workers processes on a local port, and replays the load harness 'reads' journey
+against both: dashboard summary, current balances, notification inbox and, for
+approvers, approval counts. Both runs use the same accounts, access tokens,
+concurrency and duration. A warm-up pass runs the journey once per account, so
+logins (password hashing) and cold caches stay out of the measured run.
+
+The servers use the current DJANGO_SETTINGS_MODULE (default
+leave_management.settings) and database, so generate a dataset first:
+
+  python manage.py generate_perf_dataset
+  python scripts/compare_wsgi_asgi.py --workers 2 --concurrency 50 --duration 30
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from load_harness import LoadHarness, accounts_from_csv, accounts_from_db, print_report  # noqa: E402
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+READS_MIX = {'reads': 1}
+
+
+def server_command(mode, workers, port, threads):
+    if mode == 'wsgi':
+        return [
+            sys.executable, '-m', 'gunicorn', 'leave_management.wsgi:application',
+            '--workers', str(workers), '--threads', str(threads), '--bind', f'127.0.0.1:{port}',
+        ]
+    return [
+        sys.executable, '-m', 'uvicorn', 'leave_management.asgi:application',
+        '--workers', str(workers), '--host', '127.0.0.1', '--port', str(port), '--no-access-log',
+    ]
+
+
+def wait_until_ready(url, process, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'server exited with code {process.returncode}')
+        try:
+            with urllib.request.urlopen(f'{url}/api/health/', timeout=2) as response:
+                if response.status == 200:
+                    return
+        except (urllib.error.URLError, OSError):
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f'server did not become ready within {timeout:.0f}s')
+
+
+def run_mode(mode, args, accounts, tokens):
+    env = {
+        **os.environ,
+        'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'leave_management.settings'),
+        'ASYNC_READ_VIEWS': '1' if mode == 'asgi' else '0',
+    }
+    url = f'http://127.0.0.1:{args.port}'
+    process = subprocess.Popen(
+        server_command(mode, args.workers, args.port, args.threads), cwd=PROJECT_ROOT, env=env,
+        stdout=subprocess.DEVNULL, stderr=None if args.verbose else subprocess.DEVNULL,
+    )
+    try:
+        wait_until_ready(url, process)
+
+        def harness(**limit):
+            h = LoadHarness(url, accounts, mix=READS_MIX, concurrency=args.concurrency, timeout=args.timeout,
+                            seed=args.seed, **limit)
+            h.tokens = tokens
+            return h
+
+        asyncio.run(harness(journeys=len(accounts)).run())
+        measured = harness(duration=args.duration)
+        report = asyncio.run(measured.run())
+        print(f'\n== {mode.upper()} ({args.workers} workers) ==')
+        print_report(report, measured.stats.failures)
+        return report
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def print_comparison(reports, out=sys.stdout):
+    wsgi, asgi = reports['wsgi'], reports['asgi']
+    print(f"\n{'endpoint':<48} {'WSGI req/s':>11} {'ASGI req/s':>11} {'WSGI p95':>9} {'ASGI p95':>9}", file=out)
+    for label in sorted(set(wsgi['endpoints']) | set(asgi['endpoints'])):
+        w, a = wsgi['endpoints'].get(label, {}), asgi['endpoints'].get(label, {})
+        print(f"{label:<48} {w.get('rps', 0):>11} {a.get('rps', 0):>11} "
+              f"{w.get('p95_ms', 0):>7.0f}ms {a.get('p95_ms', 0):>7.0f}ms", file=out)
+    ratio = asgi['rps'] / wsgi['rps'] if wsgi['rps'] else 0.0
+    print(f"{'total':<48} {wsgi['rps']:>11} {asgi['rps']:>11}   ASGI/WSGI = {ratio:.2f}x; "
+          f"errors {wsgi['errors']} / {asgi['errors']}", file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--workers', type=int, default=2, help='Worker processes for both servers.')
+    parser.add_argument('--threads', type=int, default=1, help='Threads per gunicorn worker (the Procfile uses 1).')
+    parser.add_argument('--port', type=int, default=8765, help='Local port the servers bind to.')
+    parser.add_argument('--concurrency', type=int, default=50, help='Virtual users running at once.')
+    parser.add_argument('--duration', type=float, default=30.0, help='Measured seconds per server.')
+    parser.add_argument('--users', type=int, default=100, help='Accounts to replay (sampled evenly across roles).')
+    parser.add_argument('--timeout', type=float, default=60.0, help='Per-request timeout in seconds.')
+    parser.add_argument('--accounts', help='CSV of login,password,role; default reads users from the database.')
+    parser.add_argument('--prefix', default='perf', help="Prefix of generate_perf_dataset accounts to read from the database ('' for all).")
+    parser.add_argument('--password', default='perf-pass-123', help='Password of database accounts.')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed for journey selection.')
+    parser.add_argument('--verbose', action='store_true', help='Show server logs.')
+    parser.add_argument('--json', help='Also write both reports to this file.')
+    args = parser.parse_args(argv)
+
+    accounts = accounts_from_csv(args.accounts) if args.accounts else accounts_from_db(args.prefix, args.password)
+    if not accounts:
+        parser.error('no accounts found')
+    if len(accounts) > args.users:
+        step = len(accounts) / args.users
+        accounts = [accounts[int(i * step)] for i in range(args.users)]
+
+    tokens = {}  # JWTs are valid on both servers; log in once
+    reports = {mode: run_mode(mode, args, accounts, tokens) for mode in ('wsgi', 'asgi')}
+    print_comparison(reports)
+    if args.json:
+        with open(args.json, 'w') as fh:
+            json.dump({'workers': args.workers, 'concurrency': args.concurrency, **reports}, fh, indent=2)
+    return reports
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,454 @@
+"""
+Concurrent load harness replaying weighted user journeys against a running server.
+
+Each virtual user is an asyncio task with its own keep-alive HTTP connection; it
+repeatedly picks a journey by weight, runs its requests and records per-endpoint
+latency and status codes. The report gives overall throughput and p50/p95/p99 per
+endpoint, which is what sizing gunicorn workers and spotting lock contention in
+ApprovalWorkflowService.approve_request (select_for_update) needs.
+
+Journeys:
+  login      POST /api/auth/token/ with a fresh login
+  dashboard  /users/me, current balances, recent requests and (approvers) activity
+  submit     a one-day leave request on a random future weekday
+  approve    an approver loads pending_approvals and approves one request
+  export     HR downloads the full export
+  reads      the endpoints with async versions: dashboard summary, current balances,
+             notification inbox and (approvers) approval counts
+
+Accounts come from --accounts (CSV: login,password,role) or, by default, from the
+local database: active accounts generate_perf_dataset created with --prefix, all
+sharing --password.
+
+Examples:
+  python scripts/load_harness.py --concurrency 50 --duration 60
+  python scripts/load_harness.py --mix login=1,dashboard=6,submit=2,approve=2 --json load.json
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import random
+import ssl
+import sys
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import date, timedelta
+from urllib.parse import urlsplit
+
+
+DEFAULT_MIX = {'login': 1, 'dashboard': 6, 'submit': 2, 'approve': 2, 'export': 0, 'reads': 0}
+STAFF_ROLES = ('junior_staff', 'senior_staff')
+APPROVER_ROLES = ('manager', 'hr', 'ceo')
+# Journeys and the roles that can run them
+JOURNEY_ROLES = {
+    'login': None,
+    'dashboard': None,
+    'submit': STAFF_ROLES,
+    'approve': APPROVER_ROLES,
+    'export': ('hr', 'admin'),
+    'reads': None,
+}
+
+
+@dataclass
+class Account:
+    login: str
+    password: str
+    role: str = ''
+
+
+# -- HTTP -------------------------------------------------------------------------
+
+class HttpConnection:
+    """Minimal HTTP/1.1 client over asyncio streams with keep-alive and reconnects."""
+
+    def __init__(self, base_url, timeout=60.0):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.secure = parts.scheme == 'https'
+        self.port = parts.port or (443 if self.secure else 80)
+        self.host_header = parts.netloc
+        self.timeout = timeout
+        self.reader = self.writer = None
+
+    async def _connect(self):
+        context = ssl.create_default_context() if self.secure else None
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port, ssl=context)
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except (OSError, ssl.SSLError):
+                pass
+        self.reader = self.writer = None
+
+    async def request(self, method, path, json_body=None, token=None):
+        """Send one request; returns (status, body bytes). Retries once on a stale connection."""
+        body = json.dumps(json_body).encode() if json_body is not None else b''
+        headers = [
+            f'{method} {path} HTTP/1.1', f'Host: {self.host_header}', 'Accept: application/json',
+            f'Content-Length: {len(body)}',
+        ]
+        if json_body is not None:
+            headers.append('Content-Type: application/json')
+        if token:
+            headers.append(f'Authorization: Bearer {token}')
+        payload = ('\r\n'.join(headers) + '\r\n\r\n').encode() + body
+
+        for attempt in (1, 2):
+            reused = self.writer is not None
+            if not reused:
+                await self._connect()
+            try:
+                self.writer.write(payload)
+                await self.writer.drain()
+                return await asyncio.wait_for(self._read_response(method), self.timeout)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                await self.close()
+                if not reused or attempt == 2:
+                    raise
+
+    async def _read_response(self, method):
+        status_line = await self.reader.readuntil(b'\r\n')
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readuntil(b'\r\n')
+            if line == b'\r\n':
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if method == 'HEAD' or status in (204, 304):
+            body = b''
+        elif headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await self.reader.readuntil(b'\r\n')).split(b';')[0], 16)
+                if size == 0:
+                    await self.reader.readuntil(b'\r\n')
+                    break
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readexactly(2)
+            body = b''.join(chunks)
+        elif 'content-length' in headers:
+            body = await self.reader.readexactly(int(headers['content-length']))
+        else:
+            body = await self.reader.read()
+            headers['connection'] = 'close'
+
+        if headers.get('connection', '').lower() == 'close':
+            await self.close()
+        return status, body
+
+
+# -- stats ------------------------------------------------------------------------
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.journeys = Counter()
+        self.failures = []
+
+    def record(self, label, status, elapsed_ms, account=None):
+        self.latencies[label].append(elapsed_ms)
+        self.statuses[label][status] += 1
+        if not isinstance(status, int) or status >= 400:
+            self.failures.append((label, status, account.login if account else None))
+
+    def report(self, elapsed_s):
+        endpoints = {}
+        for label, values in sorted(self.latencies.items()):
+            values = sorted(values)
+            endpoints[label] = {
+                'requests': len(values),
+                'rps': round(len(values) / elapsed_s, 2),
+                'p50_ms': round(percentile(values, 50), 1),
+                'p95_ms': round(percentile(values, 95), 1),
+                'p99_ms': round(percentile(values, 99), 1),
+                'max_ms': round(values[-1], 1),
+                'statuses': {str(k): v for k, v in sorted(self.statuses[label].items(), key=str)},
+            }
+        total = sum(len(v) for v in self.latencies.values())
+        return {
+            'elapsed_s': round(elapsed_s, 2),
+            'requests': total,
+            'rps': round(total / elapsed_s, 2) if elapsed_s else 0.0,
+            'journeys': dict(self.journeys),
+            'errors': len(self.failures),
+            'endpoints': endpoints,
+        }
+
+
+# -- journeys ---------------------------------------------------------------------
+
+class VirtualUser:
+    """One simulated browser session with its own connection."""
+
+    def __init__(self, harness):
+        self.harness = harness
+        self.conn = HttpConnection(harness.base_url, timeout=harness.timeout)
+
+    async def call(self, label, method, path, account, json_body=None, token=None):
+        started = time.perf_counter()
+        try:
+            status, body = await self.conn.request(method, path, json_body=json_body, token=token)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as exc:
+            await self.conn.close()
+            status, body = exc.__class__.__name__, b''
+        self.harness.stats.record(label, status, (time.perf_counter() - started) * 1000, account)
+        return status, body
+
+    async def login(self, account, fresh=False):
+        tokens = self.harness.tokens
+        if not fresh and account.login in tokens:
+            return tokens[account.login]
+        status, body = await self.call(
+            'POST /api/auth/token/', 'POST', '/api/auth/token/', account,
+            json_body={'username': account.login, 'password': account.password},
+        )
+        token = json.loads(body).get('access') if status == 200 else None
+        if token:
+            tokens[account.login] = token
+        return token
+
+    async def journey_login(self, account):
+        await self.login(account, fresh=True)
+
+    async def journey_dashboard(self, account):
+        token = await self.login(account)
+        if not token:
+            return
+        await self.call('GET /api/users/me/', 'GET', '/api/users/me/', account, token=token)
+        await self.call('GET /api/leaves/balances/current_year_full/', 'GET',
+                        '/api/leaves/balances/current_year_full/', account, token=token)
+        await self.call('GET /api/leaves/requests/recent_combined/', 'GET',
+                        '/api/leaves/requests/recent_combined/?limit=6', account, token=token)
+        if account.role in APPROVER_ROLES + ('admin',):
+            await self.call('GET /api/leaves/manager/recent_activity/', 'GET',
+                            '/api/leaves/manager/recent_activity/?limit=5', account, token=token)
+            await self.call('GET /api/leaves/manager/approval_counts/', 'GET',
+                            '/api/leaves/manager/approval_counts/', account, token=token)
+
+    async def journey_reads(self, account):
+        token = await self.login(account)
+        if not token:
+            return
+        for path in ('/api/leaves/requests/dashboard/', '/api/leaves/balances/current_year_full/',
+                     '/api/notifications/inbox/'):
+            await self.call(f'GET {path}', 'GET', path, account, token=token)
+        if account.role in APPROVER_ROLES + ('admin',):
+            await self.call('GET /api/leaves/manager/approval_counts/', 'GET',
+                            '/api/leaves/manager/approval_counts/', account, token=token)
+
+    async def journey_submit(self, account):
+        token = await self.login(account)
+        leave_type = await self.harness.leave_type_id(self, account, token)
+        if not token or leave_type is None:
+            return
+        day = date.today() + timedelta(days=self.harness.rng.randint(30, 300))
+        if day.weekday() >= 5:
+            day += timedelta(days=7 - day.weekday())
+        await self.call('POST /api/leaves/requests/', 'POST', '/api/leaves/requests/', account, token=token, json_body={
+            'leave_type': leave_type, 'start_date': day.isoformat(), 'end_date': day.isoformat(),
+            'reason': 'Load harness',
+        })
+
+    async def journey_approve(self, account):
+        token = await self.login(account)
+        if not token:
+            return
+        status, body = await self.call('GET /api/leaves/manager/pending_approvals/', 'GET',
+                                       '/api/leaves/manager/pending_approvals/', account, token=token)
+        if status != 200:
+            return
+        pending = json.loads(body).get('requests') or []
+        if not pending:
+            return
+        # Concurrent approvers converging on the head of the queue is the contended case
+        pick = pending[0] if self.harness.contend else self.harness.rng.choice(pending[:10])
+        await self.call('PUT /api/leaves/manager/{id}/approve/', 'PUT',
+                        f"/api/leaves/manager/{pick['id']}/approve/", account, token=token,
+                        json_body={'approval_comments': 'Load harness'})
+
+    async def journey_export(self, account):
+        token = await self.login(account)
+        if token:
+            await self.call('GET /api/leaves/requests/export_all_list/', 'GET',
+                            '/api/leaves/requests/export_all_list/', account, token=token)
+
+
+class LoadHarness:
+    def __init__(self, base_url, accounts, mix=None, concurrency=10, duration=None, journeys=None,
+                 think_time=0.0, timeout=60.0, contend=False, seed=None):
+        self.base_url = base_url.rstrip('/')
+        self.mix = {name: weight for name, weight in (mix or DEFAULT_MIX).items() if weight > 0}
+        self.concurrency = concurrency
+        self.duration = duration
+        self.remaining = journeys
+        self.think_time = think_time
+        self.timeout = timeout
+        self.contend = contend
+        self.rng = random.Random(seed)
+        self.stats = Stats()
+        self.tokens = {}  # access tokens by login, shared by all virtual users
+        self._leave_type = None
+
+        self.pools = {}
+        for name in self.mix:
+            roles = JOURNEY_ROLES[name]
+            pool = [a for a in accounts if roles is None or a.role in roles]
+            if not pool:
+                raise ValueError(f"No accounts can run the '{name}' journey (roles: {', '.join(roles)})")
+            self.pools[name] = pool
+        self._next_account = Counter()
+
+    def pick_account(self, journey):
+        # Round-robin so every account is used before any repeats
+        pool = self.pools[journey]
+        index = self._next_account[journey] % len(pool)
+        self._next_account[journey] += 1
+        return pool[index]
+
+    async def leave_type_id(self, user, account, token):
+        if self._leave_type is None and token:
+            status, body = await user.call('GET /api/leaves/types/', 'GET', '/api/leaves/types/', account, token=token)
+            if status == 200:
+                data = json.loads(body)
+                types = data.get('results', data) if isinstance(data, dict) else data
+                annual = [t for t in types if str(t.get('name', '')).lower() == 'annual']
+                self._leave_type = (annual or types or [{}])[0].get('id')
+        return self._leave_type
+
+    def _take_journey(self):
+        if self.remaining is not None:
+            if self.remaining <= 0:
+                return None
+            self.remaining -= 1
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            return None
+        names = list(self.mix)
+        return self.rng.choices(names, weights=[self.mix[n] for n in names])[0]
+
+    async def _worker(self):
+        user = VirtualUser(self)
+        try:
+            while True:
+                journey = self._take_journey()
+                if journey is None:
+                    break
+                await getattr(user, f'journey_{journey}')(self.pick_account(journey))
+                self.stats.journeys[journey] += 1
+                if self.think_time:
+                    await asyncio.sleep(self.rng.uniform(0, 2 * self.think_time))
+        finally:
+            await user.conn.close()
+
+    async def run(self):
+        self.deadline = time.monotonic() + self.duration if self.duration else None
+        started = time.perf_counter()
+        await asyncio.gather(*(self._worker() for _ in range(self.concurrency)))
+        return self.stats.report(time.perf_counter() - started)
+
+
+# -- CLI --------------------------------------------------------------------------
+
+def accounts_from_db(prefix, password):
+    """Active users from the local database (requires Django settings)."""
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if project_root not in sys.path:
+        sys.path.insert(0, project_root)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'leave_management.settings')
+    import django
+    django.setup()
+    from leaves.perf_dataset import generated_accounts
+    from users.models import CustomUser
+
+    users = (generated_accounts(prefix) if prefix else CustomUser.objects).filter(is_active=True).order_by('id')
+    return [Account(login, password, role or '') for login, role in users.values_list('username', 'role')]
+
+
+def accounts_from_csv(path):
+    with open(path, newline='') as fh:
+        return [Account(row[0], row[1], row[2] if len(row) > 2 else '') for row in csv.reader(fh) if row]
+
+
+def parse_mix(value):
+    mix = {name: 0 for name in JOURNEY_ROLES}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        if name.strip() not in JOURNEY_ROLES:
+            raise argparse.ArgumentTypeError(f"unknown journey '{name}' (choose from {', '.join(JOURNEY_ROLES)})")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def print_report(report, failures=(), out=sys.stdout):
+    print(f"\n{report['requests']} requests in {report['elapsed_s']}s = {report['rps']} req/s, "
+          f"{report['errors']} errors; journeys: {report['journeys']}", file=out)
+    print(f"{'endpoint':<48} {'count':>7} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8}  statuses", file=out)
+    for label, row in report['endpoints'].items():
+        statuses = ' '.join(f'{k}:{v}' for k, v in row['statuses'].items())
+        print(f"{label:<48} {row['requests']:>7} {row['rps']:>8} {row['p50_ms']:>6.0f}ms "
+              f"{row['p95_ms']:>6.0f}ms {row['p99_ms']:>6.0f}ms  {statuses}", file=out)
+    for label, status, login in list(failures)[:20]:
+        print(f'  failed: {label} -> {status} ({login})', file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--url', default='http://127.0.0.1:8000', help='Base URL of the server under test.')
+    parser.add_argument('--concurrency', type=int, default=10, help='Virtual users running at once.')
+    parser.add_argument('--duration', type=float, help='Stop after this many seconds.')
+    parser.add_argument('--journeys', type=int, help='Stop after this many journeys (default 200 without --duration).')
+    parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX,
+                        help='Journey weights, e.g. login=1,dashboard=6,submit=2,approve=2,export=0')
+    parser.add_argument('--think-time', type=float, default=0.0, help='Mean pause between journeys, in seconds.')
+    parser.add_argument('--timeout', type=float, default=60.0, help='Per-request timeout in seconds.')
+    parser.add_argument('--contend', action='store_true',
+                        help='Approvers all approve the head of their queue to provoke row-lock contention.')
+    parser.add_argument('--accounts', help='CSV of login,password,role; default reads users from the database.')
+    parser.add_argument('--prefix', default='perf', help="Prefix of generate_perf_dataset accounts to read from the database ('' for all).")
+    parser.add_argument('--password', default='perf-pass-123', help='Password of database accounts.')
+    parser.add_argument('--seed', type=int, help='Random seed for journey selection.')
+    parser.add_argument('--json', help='Also write the report to this file.')
+    args = parser.parse_args(argv)
+
+    if args.concurrency < 1:
+        parser.error('--concurrency must be positive')
+    journeys = args.journeys if args.journeys is not None or args.duration else 200
+    accounts = accounts_from_csv(args.accounts) if args.accounts else accounts_from_db(args.prefix, args.password)
+    if not accounts:
+        parser.error('no accounts found')
+
+    try:
+        harness = LoadHarness(
+            args.url, accounts, mix=args.mix, concurrency=args.concurrency, duration=args.duration,
+            journeys=journeys, think_time=args.think_time, timeout=args.timeout, contend=args.contend,
+            seed=args.seed,
+        )
+    except ValueError as exc:
+        parser.error(str(exc))
+    report = asyncio.run(harness.run())
+    print_report(report, harness.stats.failures)
+    if args.json:
+        with open(args.json, 'w') as fh:
+            json.dump(report, fh, indent=2)
+    return report
+
+
+if __name__ == '__main__':
+    main()
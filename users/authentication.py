@@ -0,0 +1,145 @@
+"""
+JWT authentication backed by a short-lived user snapshot cache.
+
+simplejwt's JWTAuthentication loads the user row on every request, and most views
+then follow `user.affiliate` and `user.department.affiliate` with more lazy
+queries. CachedJWTAuthentication keeps a compact snapshot of the user (all profile
+columns except the password hash, plus the affiliate and department the views read)
+and rebuilds the instance from it, so a warm request costs two cache reads and no
+queries.
+
+Snapshots are keyed by user id and a per-user version counter (bumped from
+users.signals on user saves) plus a shared directory version (bumped on department
+and affiliate saves). Writes made with QuerySet.update() bypass the signals; the
+short TTL bounds how long such a change can go unnoticed. Without versions
+shared by every worker (leave_management.caching.versions_shared) each request
+reads the row.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from leave_management.caching import get_versions, versions_shared
+from .models import Affiliate, CustomUser, Department
+
+
+AUTH_USER_CACHE_TTL = getattr(settings, 'AUTH_USER_CACHE_TTL', 60)
+# Shared by every snapshot: department/affiliate renames and HOD changes
+AUTH_DIRECTORY_VERSION = 'auth-directory'
+
+# Unsafe requests may write back to request.user, so they always read the row
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_USER_FIELDS = [f.attname for f in CustomUser._meta.concrete_fields if f.attname != 'password']
+_DEPARTMENT_FIELDS = ['id', 'name', 'affiliate_id', 'hod_id', 'approval_flow']
+_AFFILIATE_FIELDS = ['id', 'name']
+
+
+def user_version_name(user_id) -> str:
+    return f'auth-user:{user_id}'
+
+
+def _snapshot_key(user_id, versions) -> str:
+    return (
+        f'auth-user-snapshot:{user_id}:'
+        f'{versions[user_version_name(user_id)]}:{versions[AUTH_DIRECTORY_VERSION]}'
+    )
+
+
+def build_snapshot(user) -> dict:
+    """Serialize `user` (with affiliate/department loaded) into a cacheable dict."""
+    department = user.department
+    affiliate = user.affiliate
+    dept_affiliate = department.affiliate if department is not None else None
+    return {
+        'user': [getattr(user, name) for name in _USER_FIELDS],
+        'password_md5': get_md5_hash_password(user.password) if api_settings.CHECK_REVOKE_TOKEN else None,
+        'affiliate': [getattr(affiliate, name) for name in _AFFILIATE_FIELDS] if affiliate else None,
+        'department': [getattr(department, name) for name in _DEPARTMENT_FIELDS] if department else None,
+        'department_affiliate': (
+            [getattr(dept_affiliate, name) for name in _AFFILIATE_FIELDS] if dept_affiliate else None
+        ),
+    }
+
+
+def user_from_snapshot(snapshot, using='default'):
+    """Rebuild a CustomUser with its affiliate and department already cached.
+
+    Only the password is deferred; it is fetched on first access (e.g. when checking
+    the current password), and save() without update_fields leaves it untouched.
+    """
+    user = CustomUser.from_db(using, _USER_FIELDS, snapshot['user'])
+
+    affiliate_field = CustomUser._meta.get_field('affiliate')
+    department_field = CustomUser._meta.get_field('department')
+    if snapshot['affiliate'] is not None:
+        affiliate_field.set_cached_value(user, Affiliate.from_db(using, _AFFILIATE_FIELDS, snapshot['affiliate']))
+    elif user.affiliate_id is None:
+        affiliate_field.set_cached_value(user, None)
+
+    if snapshot['department'] is not None:
+        department = Department.from_db(using, _DEPARTMENT_FIELDS, snapshot['department'])
+        dept_affiliate_field = Department._meta.get_field('affiliate')
+        if snapshot['department_affiliate'] is not None:
+            dept_affiliate_field.set_cached_value(
+                department, Affiliate.from_db(using, _AFFILIATE_FIELDS, snapshot['department_affiliate'])
+            )
+        elif department.affiliate_id is None:
+            dept_affiliate_field.set_cached_value(department, None)
+        department_field.set_cached_value(user, department)
+    elif user.department_id is None:
+        department_field.set_cached_value(user, None)
+    return user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that resolves the user from a short-TTL snapshot cache."""
+
+    def authenticate(self, request):
+        self._use_cache = request.method in SAFE_METHODS
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        # Without shared versions another worker's save could not retire the snapshot
+        if not getattr(self, '_use_cache', False) or not versions_shared():
+            return self._load_user(user_id, validated_token)
+
+        versions = get_versions(user_version_name(user_id), AUTH_DIRECTORY_VERSION)
+        key = _snapshot_key(user_id, versions)
+        snapshot = cache.get(key)
+        if snapshot is None:
+            user = self._load_user(user_id, validated_token)
+            cache.set(key, build_snapshot(user), AUTH_USER_CACHE_TTL)
+            return user
+
+        user = user_from_snapshot(snapshot)
+        self._check_user(user, validated_token, snapshot['password_md5'])
+        return user
+
+    def _load_user(self, user_id, validated_token):
+        try:
+            user = (
+                self.user_model.objects
+                .select_related('affiliate', 'department__affiliate')
+                .get(**{api_settings.USER_ID_FIELD: user_id})
+            )
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        password_md5 = get_md5_hash_password(user.password) if api_settings.CHECK_REVOKE_TOKEN else None
+        self._check_user(user, validated_token, password_md5)
+        return user
+
+    def _check_user(self, user, validated_token, password_md5):
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != password_md5:
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
@@ -0,0 +1,44 @@
+"""
+Authentication backend accepting a username or an email address.
+
+Both branches hit an index: `username` is unique and `email_normalized` is the
+indexed lowercase copy maintained by CustomUser.save(), so a login costs one query
+instead of an iexact scan plus a second lookup by username.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.db.models import Case, IntegerField, Q, Value, When
+
+
+class EmailOrUsernameModelBackend(ModelBackend):
+    """ModelBackend that resolves the login against username or email in one query."""
+
+    # Emails are not unique; a couple of candidates covers legacy duplicates
+    MAX_CANDIDATES = 3
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        UserModel = get_user_model()
+        login = username if username is not None else kwargs.get(UserModel.USERNAME_FIELD)
+        if login is None or password is None:
+            return None
+        login = login.strip()
+
+        condition = Q(username=login)
+        if '@' in login:
+            condition |= Q(email_normalized=login.lower())
+        candidates = list(
+            UserModel._default_manager.filter(condition)
+            .annotate(
+                login_rank=Case(When(username=login, then=Value(0)), default=Value(1), output_field=IntegerField())
+            )
+            .order_by('login_rank', 'id')[:self.MAX_CANDIDATES]
+        )
+        if not candidates:
+            # Run the hasher anyway so response time does not reveal unknown logins
+            UserModel().set_password(password)
+            return None
+
+        for user in candidates:
+            if user.check_password(password) and self.user_can_authenticate(user):
+                return user
+        return None
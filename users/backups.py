@@ -0,0 +1,427 @@
+"""
+Streaming backup export and restore.
+
+`loaddata` parses the whole dump into memory and saves objects one at a time. The
+loader here reads records incrementally, spools them per model to temporary NDJSON
+files, then inserts each model in dependency order with bulk_create in fixed-size
+batches, one transaction per batch. Memory stays bounded by the batch size.
+
+Exports go the other way: each table is read with `.iterator(chunk_size=...)` and
+written as gzip-compressed NDJSON shards next to a manifest.json carrying row counts
+and SHA-256 checksums, so a backup can be verified and restored shard by shard.
+
+Nullable foreign keys that point "forward" (self references such as
+CustomUser.manager, or cycles such as Department.hod <-> CustomUser.department) are
+inserted as NULL and filled in with bulk_update once every model is loaded.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.core import serializers
+from django.core.management.color import no_style
+from django.core.serializers.python import Deserializer as PythonDeserializer, Serializer as PythonSerializer
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, models, transaction
+from django.utils import timezone
+
+from .signals import bulk_write_done
+
+
+logger = logging.getLogger('users')
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_EXPORT_APPS = ('users', 'leaves', 'notifications')
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_FORMAT = 'ndjson-gzip/1'
+
+
+def iter_json_array(fh, chunk_size=1 << 16):
+    """Yield the elements of a top-level JSON array of objects without reading it whole."""
+    decoder = json.JSONDecoder()
+    buf = fh.read(chunk_size)
+    pos = 0
+
+    def skip(chars):
+        nonlocal pos
+        while pos < len(buf) and buf[pos] in chars:
+            pos += 1
+
+    def fill():
+        nonlocal buf, pos
+        more = fh.read(chunk_size)
+        if not more:
+            return False
+        buf = buf[pos:] + more
+        pos = 0
+        return True
+
+    skip(' \t\r\n')
+    while pos >= len(buf):
+        if not fill():
+            return
+        skip(' \t\r\n')
+    if buf[pos] != '[':
+        raise ValueError('Backup must be a JSON array of objects')
+    pos += 1
+
+    while True:
+        skip(' \t\r\n,')
+        if pos >= len(buf):
+            if not fill():
+                raise ValueError('Unexpected end of file inside JSON array')
+            continue
+        if buf[pos] == ']':
+            return
+        try:
+            obj, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            # Object straddles the chunk boundary; read more and retry
+            if not fill():
+                raise
+            continue
+        yield obj
+        pos = end
+        if pos > chunk_size:
+            buf = buf[pos:]
+            pos = 0
+
+
+def iter_ndjson(fh):
+    for line in fh:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def read_ndjson(path):
+    """Lazily read an NDJSON file (plain or .gz); the file is opened on first iteration."""
+    opener = gzip.open if str(path).endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as fh:
+        yield from iter_ndjson(fh)
+
+
+def count_records(records):
+    """Return {model_label: count} for an iterable of serialized records."""
+    stats = {}
+    for rec in records:
+        label = rec.get('model', 'UNKNOWN')
+        stats[label] = stats.get(label, 0) + 1
+    return stats
+
+
+def dependency_order(model_list):
+    """Sort models so that non-nullable foreign key targets come first."""
+    by_app = {}
+    for model in model_list:
+        by_app.setdefault(model._meta.app_config, []).append(model)
+    return serializers.sort_dependencies(list(by_app.items()), allow_cycles=True)
+
+
+@contextmanager
+def preserved_timestamps(model):
+    """Stop auto_now/auto_now_add from overwriting restored timestamps during bulk_create."""
+    flipped = []
+    for field in model._meta.concrete_fields:
+        if isinstance(field, models.DateField) and (field.auto_now or field.auto_now_add):
+            flipped.append((field, field.auto_now, field.auto_now_add))
+            field.auto_now = field.auto_now_add = False
+    try:
+        yield [f for f, _, _ in flipped]
+    finally:
+        for field, auto_now, auto_now_add in flipped:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class BackupLoader:
+    """Restore serialized records (dumpdata format) in batches."""
+
+    def __init__(self, using='default', batch_size=DEFAULT_BATCH_SIZE, skip_existing=False, progress=None):
+        self.using = using
+        self.batch_size = batch_size
+        self.skip_existing = skip_existing
+        self.progress = progress or (lambda message: None)
+        self.loaded = {}
+
+    # -- entry points -------------------------------------------------------------
+
+    def load_records(self, records):
+        """Load an arbitrary stream of records; they are spooled per model first."""
+        with tempfile.TemporaryDirectory(prefix='restore-') as tmp:
+            paths, counts = {}, {}
+            handles = {}
+            try:
+                for rec in records:
+                    label = rec['model'].lower()
+                    if label not in handles:
+                        paths[label] = os.path.join(tmp, f'{label}.ndjson')
+                        handles[label] = open(paths[label], 'w', encoding='utf-8')
+                    handles[label].write(json.dumps(rec, separators=(',', ':')) + '\n')
+                    counts[label] = counts.get(label, 0) + 1
+            finally:
+                for fh in handles.values():
+                    fh.close()
+            self.progress(f'Spooled {sum(counts.values())} records for {len(counts)} models')
+
+            groups = [(label, read_ndjson(path), counts[label]) for label, path in paths.items()]
+            return self.load_groups(groups)
+
+    def load_groups(self, groups):
+        """Load (model_label, records, expected_count) groups; insertion order is decided here.
+
+        `records` should be lazy (e.g. a generator over a file) so only one batch is in memory.
+        """
+        return self._load_ordered(list(groups))
+
+    # -- internals ----------------------------------------------------------------
+
+    def _load_ordered(self, groups):
+        by_model = {}
+        for label, records, total in groups:
+            by_model[apps.get_model(label)] = (label, records, total)
+        ordered = dependency_order(list(by_model))
+
+        with tempfile.TemporaryDirectory(prefix='restore-fk-') as tmp:
+            deferred_paths = {}
+            loaded_models = set()
+            for model in ordered:
+                label, records, total = by_model[model]
+                deferred = self._deferred_fields(model, loaded_models)
+                path = os.path.join(tmp, f'{label}.deferred.ndjson')
+                with open(path, 'w', encoding='utf-8') as deferred_fh:
+                    self._load_model(model, label, records, total, deferred, deferred_fh)
+                if deferred:
+                    deferred_paths[model] = (path, deferred)
+                loaded_models.add(model)
+
+            for model, (path, deferred) in deferred_paths.items():
+                self._apply_deferred(model, path, deferred)
+
+        self._reset_sequences(ordered)
+        # bulk_create/bulk_update sent no signals; drop every cached view of the data
+        bulk_write_done()
+        return dict(self.loaded)
+
+    def _deferred_fields(self, model, loaded_models):
+        """Nullable FKs whose targets may not exist yet when `model` is inserted."""
+        deferred = []
+        for field in model._meta.concrete_fields:
+            if not field.is_relation or not field.many_to_one:
+                continue
+            target = field.related_model
+            if field.null and (target is model or target not in loaded_models):
+                deferred.append(field)
+        return deferred
+
+    def _load_model(self, model, label, records, total, deferred, deferred_fh):
+        deferred_names = {f.name for f in deferred}
+        batch, done = [], 0
+
+        def flush():
+            nonlocal batch, done
+            if batch:
+                self._insert_batch(model, batch)
+                done += len(batch)
+                self.progress(f'  {label}: {done}/{total}')
+                batch = []
+
+        for rec in records:
+            fields = rec.get('fields', {})
+            later = {name: fields.pop(name) for name in list(fields) if name in deferred_names and fields[name] is not None}
+            if later:
+                deferred_fh.write(json.dumps({'pk': rec.get('pk'), 'fields': later}, separators=(',', ':')) + '\n')
+            batch.append(rec)
+            if len(batch) >= self.batch_size:
+                flush()
+        flush()
+        self.loaded[label] = done
+
+    def _insert_batch(self, model, records):
+        objs, m2m = [], []
+        for deserialized in PythonDeserializer(records, using=self.using, ignorenonexistent=True):
+            obj = deserialized.object
+            if hasattr(obj, 'refresh_search_fields'):
+                obj.refresh_search_fields()
+            objs.append(obj)
+            if deserialized.m2m_data:
+                m2m.append((obj, deserialized.m2m_data))
+
+        with preserved_timestamps(model) as stamp_fields, transaction.atomic(using=self.using):
+            now = timezone.now()
+            for obj in objs:
+                # Older dumps may predate a timestamp column
+                for field in stamp_fields:
+                    if getattr(obj, field.attname) is None and not field.null:
+                        setattr(obj, field.attname, now if isinstance(field, models.DateTimeField) else now.date())
+            model._base_manager.using(self.using).bulk_create(
+                objs, batch_size=self.batch_size, ignore_conflicts=self.skip_existing
+            )
+            for obj, m2m_data in m2m:
+                for field_name, values in m2m_data.items():
+                    field = model._meta.get_field(field_name)
+                    through = field.remote_field.through
+                    source = field.m2m_field_name()
+                    target = field.m2m_reverse_field_name()
+                    through._base_manager.using(self.using).bulk_create(
+                        [through(**{f'{source}_id': obj.pk, f'{target}_id': v}) for v in values],
+                        ignore_conflicts=True,
+                    )
+
+    def _apply_deferred(self, model, path, deferred):
+        fields_by_name = {f.name: f for f in deferred}
+        batch = []
+        updated = 0
+
+        def flush():
+            nonlocal batch, updated
+            if not batch:
+                return
+            names = sorted({name for _, values in batch for name in values})
+            objs = []
+            for pk, values in batch:
+                obj = model(pk=pk)
+                for name in names:
+                    setattr(obj, fields_by_name[name].attname, values.get(name))
+                objs.append(obj)
+            # Rows missing a field in this batch would be reset to NULL; only pass fields all rows carry
+            common = [n for n in names if all(n in values for _, values in batch)]
+            partial = [n for n in names if n not in common]
+            with transaction.atomic(using=self.using):
+                if common:
+                    model._base_manager.using(self.using).bulk_update(objs, common, batch_size=self.batch_size)
+                for name in partial:
+                    subset = [o for o, (_, values) in zip(objs, batch) if name in values]
+                    model._base_manager.using(self.using).bulk_update(subset, [name], batch_size=self.batch_size)
+            updated += len(batch)
+            batch = []
+
+        with open(path, encoding='utf-8') as fh:
+            for rec in iter_ndjson(fh):
+                batch.append((rec['pk'], rec['fields']))
+                if len(batch) >= self.batch_size:
+                    flush()
+        flush()
+        if updated:
+            self.progress(f'  {model._meta.label_lower}: linked {updated} deferred references')
+
+    def _reset_sequences(self, model_list):
+        connection = connections[self.using]
+        statements = connection.ops.sequence_reset_sql(no_style(), model_list)
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+
+
+def file_sha256(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for block in iter(lambda: fh.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class BackupExporter:
+    """Write every row of the selected models as gzip NDJSON shards plus a manifest."""
+
+    def __init__(self, using='default', chunk_size=2000, shard_rows=50000, progress=None):
+        self.using = using
+        self.chunk_size = chunk_size
+        self.shard_rows = shard_rows
+        self.progress = progress or (lambda message: None)
+
+    def export(self, out_dir, model_list):
+        os.makedirs(out_dir, exist_ok=True)
+        manifest = {
+            'format': MANIFEST_FORMAT,
+            'created_at': timezone.now().isoformat(),
+            'database': connections[self.using].vendor,
+            'models': [],
+        }
+        for model in dependency_order(model_list):
+            manifest['models'].append(self._export_model(out_dir, model))
+        with open(os.path.join(out_dir, MANIFEST_NAME), 'w', encoding='utf-8') as fh:
+            json.dump(manifest, fh, indent=2)
+        return manifest
+
+    def _export_model(self, out_dir, model):
+        label = model._meta.label_lower
+        m2m_names = [f.name for f in model._meta.many_to_many if f.remote_field.through._meta.auto_created]
+        qs = model._base_manager.using(self.using).order_by(model._meta.pk.name)
+        if m2m_names:
+            qs = qs.prefetch_related(*m2m_names)
+        entry = {'model': label, 'rows': 0, 'shards': []}
+        shard = {'fh': None, 'path': None, 'rows': 0}
+
+        def close_shard():
+            if shard['fh'] is None:
+                return
+            shard['fh'].close()
+            entry['shards'].append({
+                'file': os.path.basename(shard['path']),
+                'rows': shard['rows'],
+                'bytes': os.path.getsize(shard['path']),
+                'sha256': file_sha256(shard['path']),
+            })
+            shard.update(fh=None, path=None, rows=0)
+
+        def write_chunk(objs):
+            for record in PythonSerializer().serialize(objs):
+                if shard['fh'] is None:
+                    shard['path'] = os.path.join(out_dir, f"{label}.{len(entry['shards']):04d}.ndjson.gz")
+                    shard['fh'] = gzip.open(shard['path'], 'wt', encoding='utf-8')
+                shard['fh'].write(json.dumps(record, cls=DjangoJSONEncoder, separators=(',', ':')) + '\n')
+                shard['rows'] += 1
+                entry['rows'] += 1
+                if shard['rows'] >= self.shard_rows:
+                    close_shard()
+            self.progress(f'  {label}: {entry["rows"]}')
+
+        chunk = []
+        try:
+            for obj in qs.iterator(chunk_size=self.chunk_size):
+                chunk.append(obj)
+                if len(chunk) >= self.chunk_size:
+                    write_chunk(chunk)
+                    chunk = []
+            if chunk:
+                write_chunk(chunk)
+        finally:
+            close_shard()
+        return entry
+
+
+def read_manifest(backup_dir):
+    with open(os.path.join(backup_dir, MANIFEST_NAME), encoding='utf-8') as fh:
+        manifest = json.load(fh)
+    if manifest.get('format') != MANIFEST_FORMAT:
+        raise ValueError(f"Unsupported backup format: {manifest.get('format')}")
+    return manifest
+
+
+def verify_backup(backup_dir, manifest=None):
+    """Return a list of problems (missing shards, checksum mismatches); empty when intact."""
+    manifest = manifest or read_manifest(backup_dir)
+    problems = []
+    for entry in manifest['models']:
+        for shard in entry['shards']:
+            path = os.path.join(backup_dir, shard['file'])
+            if not os.path.exists(path):
+                problems.append(f"{shard['file']}: missing")
+            elif file_sha256(path) != shard['sha256']:
+                problems.append(f"{shard['file']}: checksum mismatch")
+    return problems
+
+
+def manifest_groups(backup_dir, manifest):
+    """(label, lazy records, rows) groups for BackupLoader.load_groups, one shard open at a time."""
+    def records(entry):
+        for shard in entry['shards']:
+            yield from read_ndjson(os.path.join(backup_dir, shard['file']))
+
+    return [(entry['model'], records(entry), entry['rows']) for entry in manifest['models']]
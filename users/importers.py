@@ -0,0 +1,252 @@
+"""
+Bulk staff import from CSV.
+
+Rows are read as a stream and handled in batches: each batch is validated with a
+single lookup for clashing emails, usernames and employee IDs, gets its generated
+employee IDs from the locked EmployeeIdSequence, and is inserted with one
+bulk_create inside its own transaction.
+
+Columns (header row required, case-insensitive):
+    name | first_name + last_name, email, affiliate, department, role, employee_id, hire_date
+"""
+import csv
+import logging
+from datetime import date
+
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from .models import CustomUser, Department, Affiliate, EmployeeIdSequence
+from .signals import bulk_write_done
+
+
+logger = logging.getLogger('users')
+
+VALID_ROLES = {code for code, _ in CustomUser.ROLE_CHOICES}
+# Legacy role names accepted in older spreadsheets (the old template still says "hod")
+ROLE_ALIASES = {'hod': 'manager', 'employee': 'junior_staff', 'staff': 'junior_staff'}
+# Affiliates whose staff are individuals without a department
+NO_DEPARTMENT_AFFILIATES = {'SDSL', 'SBL'}
+
+
+def unique_usernames(bases, taken=None):
+    """Return a collision-free username for every base in `bases` (order preserved).
+
+    One query fetches existing usernames sharing any of the bases as a prefix; suffixes
+    are then assigned in memory. `taken` (a set) is updated with the names handed out so
+    repeated calls within one import do not collide with each other.
+    """
+    taken = taken if taken is not None else set()
+    bases = [b or 'user' for b in bases]
+    prefix_q = Q()
+    for base in set(bases):
+        prefix_q |= Q(username__startswith=base)
+    existing = set(CustomUser.objects.filter(prefix_q).values_list('username', flat=True)) if bases else set()
+    result = []
+    for base in bases:
+        candidate, counter = base, 1
+        while candidate in existing or candidate in taken:
+            candidate = f"{base}{counter}"
+            counter += 1
+        taken.add(candidate)
+        result.append(candidate)
+    return result
+
+
+class StaffImporter:
+    """Validate and insert staff rows from a CSV stream."""
+
+    BATCH_SIZE = 500
+
+    def __init__(self, dry_run=False, default_password=None, batch_size=None):
+        self.dry_run = dry_run
+        self.batch_size = batch_size or self.BATCH_SIZE
+        # Hash once: PBKDF2 per row would dominate the import time. Without a password the
+        # accounts get an unusable one and HR issues resets.
+        self.password_hash = make_password(default_password) if default_password else make_password(None)
+        self.affiliates = {a.name.strip().lower(): a for a in Affiliate.objects.all()}
+        self.departments = {}
+        for dept in Department.objects.select_related('affiliate'):
+            self.departments.setdefault(dept.name.strip().lower(), []).append(dept)
+        self._seen_emails = set()
+        self._seen_employee_ids = set()
+        self._taken_usernames = set()
+        self.report = {
+            'dry_run': dry_run,
+            'total_rows': 0,
+            'valid_rows': 0,
+            'created': 0,
+            'errors': [],
+            'created_employee_ids': [],
+        }
+
+    def run(self, text_stream):
+        """Import from a text stream; returns the report dict."""
+        reader = csv.DictReader(text_stream)
+        if not reader.fieldnames:
+            self.report['errors'].append({'row': 1, 'error': 'CSV is empty or has no header row'})
+            return self.report
+        reader.fieldnames = [(h or '').strip().lower() for h in reader.fieldnames]
+        missing = {'email', 'affiliate'} - set(reader.fieldnames)
+        if 'name' not in reader.fieldnames and 'first_name' not in reader.fieldnames:
+            missing.add('name')
+        if missing:
+            self.report['errors'].append({'row': 1, 'error': f"Missing required columns: {', '.join(sorted(missing))}"})
+            return self.report
+
+        batch = []
+        # Data rows start at line 2 (after the header)
+        for row_number, raw in enumerate(reader, start=2):
+            self.report['total_rows'] += 1
+            batch.append((row_number, raw))
+            if len(batch) >= self.batch_size:
+                self._process_batch(batch)
+                batch = []
+        if batch:
+            self._process_batch(batch)
+        if self.report['created']:
+            bulk_write_done()
+
+        logger.info(
+            'Staff import%s: rows=%s valid=%s created=%s errors=%s',
+            ' (dry run)' if self.dry_run else '', self.report['total_rows'], self.report['valid_rows'],
+            self.report['created'], len(self.report['errors']),
+        )
+        return self.report
+
+    def _error(self, row_number, message):
+        self.report['errors'].append({'row': row_number, 'error': message})
+
+    def _parse_row(self, row_number, raw):
+        """Validate one row against in-memory lookups; returns a dict or None on error."""
+        get = lambda key: (raw.get(key) or '').strip()
+        email = get('email').lower()
+        if not email or '@' not in email:
+            self._error(row_number, f'Invalid email "{get("email")}"')
+            return None
+        if email in self._seen_emails:
+            self._error(row_number, f'Duplicate email {email} in file')
+            return None
+
+        first_name, last_name = get('first_name'), get('last_name')
+        if not first_name:
+            parts = get('name').split(' ', 1)
+            first_name = parts[0]
+            last_name = last_name or (parts[1].strip() if len(parts) > 1 else '')
+        if not first_name:
+            self._error(row_number, 'Name is required')
+            return None
+
+        affiliate = self.affiliates.get(get('affiliate').lower())
+        if affiliate is None:
+            self._error(row_number, f'Invalid or missing affiliate "{get("affiliate")}"')
+            return None
+
+        department = None
+        dept_name = get('department')
+        if affiliate.name.upper() not in NO_DEPARTMENT_AFFILIATES:
+            if not dept_name:
+                self._error(row_number, f'Department required for {affiliate.name} employees')
+                return None
+            candidates = self.departments.get(dept_name.lower(), [])
+            # Prefer the department under this affiliate when names repeat across affiliates
+            department = next((d for d in candidates if d.affiliate_id == affiliate.id), None)
+            if department is None:
+                department = next((d for d in candidates if d.affiliate_id is None), None)
+            if department is None:
+                self._error(row_number, f'Invalid department "{dept_name}"')
+                return None
+
+        role = get('role').lower() or 'junior_staff'
+        role = ROLE_ALIASES.get(role, role)
+        if role not in VALID_ROLES:
+            self._error(row_number, f'Invalid role "{get("role")}"')
+            return None
+
+        hire_date = None
+        if get('hire_date'):
+            try:
+                hire_date = date.fromisoformat(get('hire_date'))
+            except ValueError:
+                self._error(row_number, f'Invalid hire_date "{get("hire_date")}" (expected YYYY-MM-DD)')
+                return None
+
+        employee_id = get('employee_id')
+        if employee_id:
+            if employee_id in self._seen_employee_ids:
+                self._error(row_number, f'Duplicate employee_id {employee_id} in file')
+                return None
+            self._seen_employee_ids.add(employee_id)
+        self._seen_emails.add(email)
+
+        return {
+            'row': row_number,
+            'email': email,
+            'first_name': first_name,
+            'last_name': last_name,
+            'affiliate': affiliate,
+            'department': department,
+            'role': role,
+            'hire_date': hire_date,
+            'employee_id': employee_id,
+        }
+
+    def _process_batch(self, batch):
+        parsed = [p for p in (self._parse_row(n, raw) for n, raw in batch) if p]
+        if not parsed:
+            return
+
+        # One query for clashes with existing accounts
+        emails = [p['email'] for p in parsed]
+        given_ids = [p['employee_id'] for p in parsed if p['employee_id']]
+        clashes = CustomUser.objects.filter(
+            Q(email_normalized__in=emails) | Q(employee_id__in=given_ids)
+        ).values_list('email_normalized', 'employee_id')
+        existing_emails, existing_ids = set(), set()
+        for email, emp_id in clashes:
+            existing_emails.add(email)
+            existing_ids.add(emp_id)
+
+        valid = []
+        for p in parsed:
+            if p['email'] in existing_emails:
+                self._error(p['row'], f"A user with email {p['email']} already exists")
+            elif p['employee_id'] and p['employee_id'] in existing_ids:
+                self._error(p['row'], f"Employee ID {p['employee_id']} already exists")
+            else:
+                valid.append(p)
+        self.report['valid_rows'] += len(valid)
+        if not valid or self.dry_run:
+            return
+
+        usernames = unique_usernames([p['email'].split('@')[0] for p in valid], self._taken_usernames)
+        try:
+            with transaction.atomic():
+                generated = iter(EmployeeIdSequence.allocate(sum(1 for p in valid if not p['employee_id'])))
+                users = []
+                for p, username in zip(valid, usernames):
+                    user = CustomUser(
+                        username=username,
+                        email=p['email'],
+                        first_name=p['first_name'],
+                        last_name=p['last_name'],
+                        employee_id=p['employee_id'] or next(generated),
+                        role=p['role'],
+                        affiliate=p['affiliate'],
+                        department=p['department'],
+                        hire_date=p['hire_date'],
+                        is_active_employee=True,
+                        password=self.password_hash,
+                    )
+                    user.refresh_search_fields()
+                    users.append(user)
+                CustomUser.objects.bulk_create(users, batch_size=self.batch_size)
+        except IntegrityError as exc:
+            # A concurrent writer took an email/ID after validation; the whole batch rolled back
+            for p in valid:
+                self._error(p['row'], f'Not imported: batch rolled back ({exc})')
+            self.report['valid_rows'] -= len(valid)
+            return
+        self.report['created'] += len(users)
+        self.report['created_employee_ids'].extend(u.employee_id for u in users)
@@ -0,0 +1,85 @@
+import statistics
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+
+TOKEN_PATH = '/api/auth/token/'
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the token endpoint under a burst of concurrent logins. Runs in-process through "
+        "the Django test client by default, or against a running server with --url."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--login', required=True, help='Username or email to log in with.')
+        parser.add_argument('--password', required=True, help='Password for the account.')
+        parser.add_argument('--requests', type=int, default=100, help='Total token requests to send.')
+        parser.add_argument('--concurrency', type=int, default=10, help='Requests in flight at once.')
+        parser.add_argument('--url', help='Base URL of a running server, e.g. http://127.0.0.1:8000')
+
+    def handle(self, *args, **options):
+        total, concurrency = options['requests'], options['concurrency']
+        if total < 1 or concurrency < 1:
+            raise CommandError('--requests and --concurrency must be positive')
+        payload = {'username': options['login'], 'password': options['password']}
+
+        if options['url']:
+            try:
+                import requests
+            except ImportError as exc:
+                raise CommandError('--url requires the requests package') from exc
+            url = options['url'].rstrip('/') + TOKEN_PATH
+            session_post = lambda: requests.post(url, json=payload, timeout=30).status_code
+        else:
+            # The test client's default host is rejected outside of test runs
+            host = next((h for h in settings.ALLOWED_HOSTS if h not in ('*', '') and not h.startswith('.')), 'localhost')
+            new_client = lambda: Client(HTTP_HOST=host)
+            # Single warm-up request doubles as a query count check
+            with CaptureQueriesContext(connection) as ctx:
+                status = new_client().post(TOKEN_PATH, payload, content_type='application/json').status_code
+            if status != 200:
+                raise CommandError(f'Login failed with HTTP {status}; check --login/--password')
+            self.stdout.write(f'Queries per login: {len(ctx.captured_queries)}')
+
+            def session_post():
+                try:
+                    return new_client().post(TOKEN_PATH, payload, content_type='application/json').status_code
+                finally:
+                    connections.close_all()
+
+        def timed(_):
+            started = time.perf_counter()
+            try:
+                status = session_post()
+            except Exception as exc:  # network errors are reported, not fatal
+                status = exc.__class__.__name__
+            return status, time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(timed, range(total)))
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(r[1] * 1000 for r in results)
+        statuses = Counter(r[0] for r in results)
+        pct = lambda p: latencies[min(len(latencies) - 1, int(round(p / 100 * (len(latencies) - 1))))]
+        self.stdout.write(
+            f"Requests: {total}  concurrency: {concurrency}  wall: {elapsed:.2f}s  "
+            f"throughput: {total / elapsed:.1f} req/s"
+        )
+        self.stdout.write(
+            f"Latency ms  p50: {pct(50):.1f}  p95: {pct(95):.1f}  p99: {pct(99):.1f}  "
+            f"max: {latencies[-1]:.1f}  mean: {statistics.fmean(latencies):.1f}"
+        )
+        summary = '  '.join(f'{status}: {count}' for status, count in sorted(statuses.items(), key=str))
+        style = self.style.SUCCESS if set(statuses) == {200} else self.style.WARNING
+        self.stdout.write(style(f'Status codes  {summary}'))
@@ -0,0 +1,53 @@
+from pathlib import Path
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from users.backups import BackupExporter, DEFAULT_EXPORT_APPS
+
+
+class Command(BaseCommand):
+    help = (
+        "Export application data as gzip-compressed NDJSON shards with a manifest (row counts, SHA-256). "
+        "Tables are streamed in chunks, so memory use does not grow with table size. "
+        "Restore with: python manage.py load_backup <backup_dir>"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'output_dir', nargs='?',
+            help='Directory to write the backup into (default: backups/backup-<timestamp>)'
+        )
+        parser.add_argument(
+            '--app', action='append', dest='apps',
+            help=f"App label or app_label.Model to include (repeatable; default: {', '.join(DEFAULT_EXPORT_APPS)})"
+        )
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Rows fetched per database round trip.')
+        parser.add_argument('--shard-rows', type=int, default=50000, help='Rows per NDJSON shard file.')
+
+    def handle(self, *args, **options):
+        out_dir = Path(options['output_dir'] or f"backups/backup-{timezone.now():%Y%m%d-%H%M%S}")
+        if out_dir.exists() and any(out_dir.iterdir()):
+            raise CommandError(f'Output directory is not empty: {out_dir}')
+
+        model_list = []
+        for spec in options['apps'] or DEFAULT_EXPORT_APPS:
+            try:
+                if '.' in spec:
+                    model_list.append(apps.get_model(spec))
+                else:
+                    model_list.extend(apps.get_app_config(spec).get_models())
+            except LookupError as e:
+                raise CommandError(str(e))
+
+        exporter = BackupExporter(
+            chunk_size=options['chunk_size'],
+            shard_rows=options['shard_rows'],
+            progress=self.stdout.write,
+        )
+        self.stdout.write(f'Exporting {len(model_list)} models to {out_dir} ...')
+        manifest = exporter.export(str(out_dir), model_list)
+        total = sum(m['rows'] for m in manifest['models'])
+        shards = sum(len(m['shards']) for m in manifest['models'])
+        self.stdout.write(self.style.SUCCESS(f'Backup written: {total} rows in {shards} shards ({out_dir}/manifest.json)'))
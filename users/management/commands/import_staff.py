@@ -0,0 +1,42 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from users.importers import StaffImporter
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk import staff from a CSV file (columns: name,email,affiliate,department,role,employee_id,hire_date). "
+        "Rows are validated and inserted in batches; use --dry-run to only validate."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_path', help='Path to the staff CSV file')
+        parser.add_argument('--dry-run', action='store_true', help='Validate every row and report without creating users.')
+        parser.add_argument('--password', help='Initial password for all imported accounts (default: unusable password).')
+        parser.add_argument('--batch-size', type=int, default=StaffImporter.BATCH_SIZE, help='Rows per validation/insert batch.')
+
+    def handle(self, *args, **options):
+        path = Path(options['csv_path'])
+        if not path.exists():
+            raise CommandError(f'CSV file not found: {path}')
+
+        importer = StaffImporter(
+            dry_run=options['dry_run'],
+            default_password=options.get('password'),
+            batch_size=options['batch_size'],
+        )
+        with path.open('r', encoding='utf-8-sig', newline='') as fh:
+            report = importer.run(fh)
+
+        for err in report['errors']:
+            self.stdout.write(self.style.WARNING(f"Row {err['row']}: {err['error']}"))
+        summary = (
+            f"Rows: {report['total_rows']}  valid: {report['valid_rows']}  "
+            f"created: {report['created']}  errors: {len(report['errors'])}"
+        )
+        if report['dry_run']:
+            self.stdout.write(self.style.NOTICE(f"Dry run - nothing written. {summary}"))
+        else:
+            self.stdout.write(self.style.SUCCESS(summary))
@@ -1,24 +1,33 @@
-import os
-import json
+import gzip
 from pathlib import Path
 from django.core.management.base import BaseCommand, CommandError
-from django.core.management import call_command
 from django.db import connection
 
+from users.backups import (
+    BackupLoader, DEFAULT_BATCH_SIZE, count_records, iter_json_array,
+    manifest_groups, read_manifest, verify_backup,
+)
+
 
 class Command(BaseCommand):
     help = (
         "Load a full JSON dump (created via dumpdata) into the current database. "
+        "The dump is streamed and inserted per model in dependency order with batched bulk inserts. "
         "Intended for a freshly provisioned production database. Fails if core tables already contain data unless --force is passed."
     )
 
     def add_arguments(self, parser):
         parser.add_argument(
             'backup_path', nargs='?', default='data-backup-2025-09-26.json',
-            help='Path to the JSON dump file (default: data-backup-2025-09-26.json)'
+            help='Path to the JSON dump file or an export_backup directory (default: data-backup-2025-09-26.json)'
         )
         parser.add_argument('--force', action='store_true', help='Bypass safety checks about existing data.')
         parser.add_argument('--dry-run', action='store_true', help='Parse file and report stats without loading.')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Rows per insert batch/transaction.')
+        parser.add_argument('--skip-existing', action='store_true',
+                            help='Ignore rows whose primary/unique keys already exist instead of failing (use with --force).')
+        parser.add_argument('--no-verify', action='store_true',
+                            help='Skip checksum verification of backup directory shards before loading.')
 
     def handle(self, *args, **options):
         backup_path = options['backup_path']
@@ -39,6 +48,10 @@ class Command(BaseCommand):
             msg_lines.append("Re-run with --force to override (will likely raise IntegrityError on duplicates).")
             raise CommandError("\n".join(msg_lines))
 
+        if path.is_dir():
+            self._load_directory(path, options)
+            return
+
         if dry_run:
             self.stdout.write(self.style.WARNING('Dry-run mode: reading JSON to show basic stats...'))
             stats = self._inspect_file(path)
@@ -48,12 +61,52 @@ class Command(BaseCommand):
             return
 
         self.stdout.write(f'Loading backup from {backup_path} ...')
+        loader = BackupLoader(
+            batch_size=options['batch_size'],
+            skip_existing=options['skip_existing'],
+            progress=self.stdout.write,
+        )
+        try:
+            with self._open(path) as fh:
+                loaded = loader.load_records(iter_json_array(fh))
+        except Exception as e:
+            raise CommandError(f'Backup load failed: {e}')
+        for model, count in loaded.items():
+            self.stdout.write(f"  {model}: {count}")
+        self.stdout.write(self.style.SUCCESS('Backup load completed.'))
+
+    def _load_directory(self, path: Path, options):
+        """Restore an export_backup directory shard by shard, verifying checksums first."""
         try:
-            # Use Django's loaddata; rely on the fixture format correctness.
-            call_command('loaddata', str(path), verbosity=1)
-            self.stdout.write(self.style.SUCCESS('Backup load completed.'))
+            manifest = read_manifest(path)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Invalid backup directory: {e}')
+
+        if options['dry_run'] or not options['no_verify']:
+            problems = verify_backup(path, manifest)
+            if problems:
+                raise CommandError('Backup verification failed:\n' + '\n'.join(f'  - {p}' for p in problems))
+            self.stdout.write('Checksums verified.')
+
+        if options['dry_run']:
+            for entry in manifest['models']:
+                self.stdout.write(f"  {entry['model']}: {entry['rows']} ({len(entry['shards'])} shards)")
+            self.stdout.write(self.style.SUCCESS('Dry-run complete; no data loaded.'))
+            return
+
+        self.stdout.write(f'Loading backup from {path} ...')
+        loader = BackupLoader(
+            batch_size=options['batch_size'],
+            skip_existing=options['skip_existing'],
+            progress=self.stdout.write,
+        )
+        try:
+            loaded = loader.load_groups(manifest_groups(str(path), manifest))
         except Exception as e:
             raise CommandError(f'Backup load failed: {e}')
+        for model, count in loaded.items():
+            self.stdout.write(f"  {model}: {count}")
+        self.stdout.write(self.style.SUCCESS('Backup load completed.'))
 
     def _collect_counts(self):
         """Return counts for sentinel tables to detect existing data."""
@@ -72,16 +125,15 @@ class Command(BaseCommand):
                     counts[table] = -1  # table may not exist yet
         return counts
 
+    def _open(self, path: Path):
+        if path.suffix == '.gz':
+            return gzip.open(path, 'rt', encoding='utf-8')
+        return path.open('r', encoding='utf-8')
+
     def _inspect_file(self, path: Path):
-        """Read the JSON (streaming) and count objects per model label."""
+        """Stream the JSON and count objects per model label."""
         try:
-            with path.open('r', encoding='utf-8') as fh:
-                data = json.load(fh)
+            with self._open(path) as fh:
+                return count_records(iter_json_array(fh))
         except Exception as e:
             raise CommandError(f'Failed to parse JSON: {e}')
-        stats = {}
-        if isinstance(data, list):
-            for obj in data:
-                mdl = obj.get('model', 'UNKNOWN')
-                stats[mdl] = stats.get(mdl, 0) + 1
-        return stats
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.6 on 2026-10-19 09:30
+
+from django.db import migrations, models
+
+
+def populate_search_fields(apps, schema_editor):
+    from users.search import normalize_search_text
+
+    CustomUser = apps.get_model('users', 'CustomUser')
+    batch = []
+    for user in CustomUser.objects.only('id', 'first_name', 'last_name', 'email').iterator(chunk_size=1000):
+        first = normalize_search_text(user.first_name)
+        last = normalize_search_text(user.last_name)
+        user.search_key = f"{first} {last}".strip()
+        user.search_key_reversed = f"{last} {first}".strip()
+        user.email_normalized = (user.email or '').strip().lower()
+        batch.append(user)
+        if len(batch) >= 1000:
+            CustomUser.objects.bulk_update(batch, ['search_key', 'search_key_reversed', 'email_normalized'])
+            batch = []
+    if batch:
+        CustomUser.objects.bulk_update(batch, ['search_key', 'search_key_reversed', 'email_normalized'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0013_affiliate_department_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='search_key',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=301),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='search_key_reversed',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=301),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='email_normalized',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=254),
+        ),
+        migrations.RunPython(populate_search_fields, migrations.RunPython.noop),
+    ]
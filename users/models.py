@@ -7,6 +7,7 @@ class Affiliate(models.Model):
     name = models.CharField(max_length=100, unique=True)
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['name']
@@ -29,6 +30,7 @@ class Department(models.Model):
     name = models.CharField(max_length=100)
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     # Optional affiliate link (HR can manage departments under an affiliate)
     affiliate = models.ForeignKey(
@@ -102,12 +104,36 @@ class CustomUser(AbstractUser):
         'EmploymentGrade', null=True, blank=True, on_delete=models.SET_NULL, related_name='users'
     )
     
+    # Normalized copies for indexed prefix search (maintained in save(); see users.search)
+    search_key = models.CharField(max_length=301, blank=True, default='', db_index=True, editable=False)
+    search_key_reversed = models.CharField(max_length=301, blank=True, default='', db_index=True, editable=False)
+    email_normalized = models.CharField(max_length=254, blank=True, default='', db_index=True, editable=False)
+
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    SEARCH_SOURCE_FIELDS = {'first_name', 'last_name', 'email'}
+    SEARCH_FIELDS = ['search_key', 'search_key_reversed', 'email_normalized']
     
     def __str__(self):
         return f"{self.get_full_name()} ({self.employee_id})"
+
+    def refresh_search_fields(self):
+        """Recompute the normalized search columns; call before bulk_create/bulk_update."""
+        from .search import normalize_search_text
+        first = normalize_search_text(self.first_name)
+        last = normalize_search_text(self.last_name)
+        self.search_key = f"{first} {last}".strip()
+        self.search_key_reversed = f"{last} {first}".strip()
+        self.email_normalized = (self.email or '').strip().lower()
+
+    def save(self, *args, **kwargs):
+        self.refresh_search_fields()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and self.SEARCH_SOURCE_FIELDS & set(update_fields):
+            kwargs['update_fields'] = list(update_fields) + self.SEARCH_FIELDS
+        super().save(*args, **kwargs)
     
     @property
     def full_name(self):
@@ -172,3 +198,54 @@ class EmploymentGrade(models.Model):
 
     def __str__(self) -> str:  # pragma: no cover - simple
         return self.name
+
+
+class EmployeeIdSequence(models.Model):
+    """Per-year counter for generated employee IDs (EMP-YYYY-NNNN).
+
+    Rows are locked with SELECT ... FOR UPDATE while numbers are handed out, so
+    concurrent creations and bulk imports never allocate the same ID.
+    """
+    prefix = models.CharField(max_length=20, unique=True)
+    last_number = models.PositiveIntegerField(default=0)
+
+    def __str__(self) -> str:  # pragma: no cover - simple
+        return f"{self.prefix} @ {self.last_number}"
+
+    @classmethod
+    def allocate(cls, count: int = 1, year=None):
+        """Reserve `count` consecutive employee IDs for `year` and return them.
+
+        Call inside the transaction that inserts the users so the lock is held until commit.
+        """
+        from django.db import IntegrityError, transaction
+        from django.utils import timezone
+
+        if count < 1:
+            return []
+        prefix = f"EMP-{year or timezone.now().year}"
+        with transaction.atomic():
+            try:
+                with transaction.atomic():
+                    seq, _ = cls.objects.select_for_update().get_or_create(prefix=prefix)
+            except IntegrityError:
+                # Another transaction created the row first
+                seq = cls.objects.select_for_update().get(prefix=prefix)
+            # IDs may also have been assigned by hand; never hand out one at or below them
+            last = max(seq.last_number, cls._highest_existing(prefix))
+            seq.last_number = last + count
+            seq.save(update_fields=['last_number'])
+        return [f"{prefix}-{n:04d}" for n in range(last + 1, last + count + 1)]
+
+    @staticmethod
+    def _highest_existing(prefix: str) -> int:
+        latest = (
+            CustomUser.objects.filter(employee_id__startswith=f"{prefix}-")
+            .order_by('-employee_id')
+            .values_list('employee_id', flat=True)
+            .first()
+        )
+        try:
+            return int(latest.rsplit('-', 1)[-1]) if latest else 0
+        except ValueError:
+            return 0
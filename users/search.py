@@ -0,0 +1,92 @@
+"""
+Employee typeahead search.
+
+Matching runs against normalized columns kept on CustomUser (see
+CustomUser.refresh_search_fields) so every branch is an indexed prefix scan:
+`LIKE 'abc%'` on a lowercase, accent-free copy of the name and email.
+"""
+import re
+import unicodedata
+
+from django.core.cache import cache
+from django.db.models import Case, IntegerField, Q, Value, When
+
+
+AUTOCOMPLETE_DEFAULT_LIMIT = 10
+AUTOCOMPLETE_MAX_LIMIT = 25
+AUTOCOMPLETE_CACHE_TTL = 30
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_search_text(value) -> str:
+    """Lowercase, strip accents and collapse whitespace: '  José  Mensah' -> 'jose mensah'."""
+    if not value:
+        return ''
+    text = unicodedata.normalize('NFKD', str(value))
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return _WHITESPACE.sub(' ', text).strip().lower()
+
+
+def autocomplete_users(query: str, limit: int = AUTOCOMPLETE_DEFAULT_LIMIT, include_inactive: bool = False):
+    """Return up to `limit` users whose name, email or employee ID starts with `query`.
+
+    Ranking: exact employee ID, employee ID prefix, full/first name prefix, last name
+    prefix, then email prefix; ties are ordered alphabetically by name.
+    """
+    from .models import CustomUser
+
+    raw = (query or '').strip()
+    term = normalize_search_text(raw)
+    if not term:
+        return []
+    limit = max(1, min(int(limit), AUTOCOMPLETE_MAX_LIMIT))
+
+    cache_key = f'user-autocomplete:{int(include_inactive)}:{limit}:{term}'
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    emp_prefixes = {raw, raw.upper()}
+    emp_q = Q()
+    for prefix in emp_prefixes:
+        emp_q |= Q(employee_id__startswith=prefix)
+
+    qs = CustomUser.objects.filter(
+        emp_q
+        | Q(search_key__startswith=term)
+        | Q(search_key_reversed__startswith=term)
+        | Q(email_normalized__startswith=term)
+    )
+    if not include_inactive:
+        qs = qs.filter(is_active=True)
+
+    qs = qs.annotate(
+        rank=Case(
+            When(employee_id__in=emp_prefixes, then=Value(0)),
+            When(emp_q, then=Value(1)),
+            When(search_key__startswith=term, then=Value(2)),
+            When(search_key_reversed__startswith=term, then=Value(3)),
+            default=Value(4),
+            output_field=IntegerField(),
+        )
+    ).order_by('rank', 'search_key', 'id')
+
+    rows = qs.values(
+        'id', 'employee_id', 'first_name', 'last_name', 'email', 'role',
+        'department__name', 'affiliate__name',
+    )[:limit]
+    results = [
+        {
+            'id': r['id'],
+            'employee_id': r['employee_id'],
+            'name': f"{r['first_name']} {r['last_name']}".strip(),
+            'email': r['email'],
+            'role': r['role'],
+            'department': r['department__name'],
+            'affiliate': r['affiliate__name'],
+        }
+        for r in rows
+    ]
+    cache.set(cache_key, results, AUTOCOMPLETE_CACHE_TTL)
+    return results
@@ -1,5 +1,7 @@
+from django.db import transaction
 from rest_framework import serializers
-from .models import Department, CustomUser as User, Affiliate
+from .models import Department, CustomUser as User, Affiliate, EmployeeIdSequence
+from .importers import unique_usernames
 
 
 class AffiliateSerializer(serializers.ModelSerializer):
@@ -117,31 +119,14 @@ class UserSerializer(serializers.ModelSerializer):
         
         # Auto-generate username from email if not provided
         if 'username' not in validated_data or not validated_data.get('username'):
-            base_username = validated_data['email'].split('@')[0]
-            username = base_username
-            counter = 1
-            while User.objects.filter(username=username).exists():
-                username = f"{base_username}{counter}"
-                counter += 1
-            validated_data['username'] = username
+            validated_data['username'] = unique_usernames([validated_data['email'].split('@')[0]])[0]
         
-        # Auto-generate employee_id if not provided
-        if 'employee_id' not in validated_data or not validated_data.get('employee_id'):
-            # Generate format: EMP-YYYY-NNNN
-            from django.utils import timezone
-            year = timezone.now().year
-            last_emp = User.objects.filter(employee_id__startswith=f'EMP-{year}').order_by('-employee_id').first()
-            if last_emp and last_emp.employee_id:
-                try:
-                    last_num = int(last_emp.employee_id.split('-')[-1])
-                    new_num = last_num + 1
-                except:
-                    new_num = 1
-            else:
-                new_num = 1
-            validated_data['employee_id'] = f'EMP-{year}-{new_num:04d}'
-        
-        user = User.objects.create_user(**validated_data)
+        with transaction.atomic():
+            # Auto-generate employee_id if not provided (format: EMP-YYYY-NNNN). The sequence row
+            # stays locked until this transaction commits, so concurrent creates get distinct IDs.
+            if 'employee_id' not in validated_data or not validated_data.get('employee_id'):
+                validated_data['employee_id'] = EmployeeIdSequence.allocate()[0]
+            user = User.objects.create_user(**validated_data)
         
         if password:
             user.set_password(password)
@@ -151,7 +136,7 @@ class UserSerializer(serializers.ModelSerializer):
         if affiliate_id:
             # Assign foreign key id via setattr to satisfy static analyzers
             setattr(user, 'affiliate_id', affiliate_id)
-            user.save(update_fields=['affiliate'])
+            user.save(update_fields=['affiliate', 'updated_at'])
             
         if department_id:
             # Assign foreign key id via setattr to satisfy static analyzers
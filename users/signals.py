@@ -0,0 +1,97 @@
+"""
+Cache invalidation hooks for user data.
+
+Connected from UsersConfig.ready().
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from rest_framework_simplejwt.settings import api_settings
+
+from leave_management import reference_data
+from leave_management.caching import bump_version
+from leave_management.conditional import bump_all_resources, bump_resources
+from .authentication import AUTH_DIRECTORY_VERSION, user_version_name
+from .models import Affiliate, CustomUser, Department, EmploymentGrade
+
+# Fields of a HOD that the department snapshot exposes
+HOD_FIELDS = {'username', 'first_name', 'last_name', 'email', 'employee_id', 'is_active', 'role'}
+
+
+@receiver(post_save, sender=CustomUser, dispatch_uid='users.auth_user_saved')
+@receiver(post_delete, sender=CustomUser, dispatch_uid='users.auth_user_deleted')
+def auth_user_changed(sender, instance, **kwargs):
+    # last_login updates included: cheap, and keeps the snapshot exact
+    bump_version(user_version_name(getattr(instance, api_settings.USER_ID_FIELD)))
+
+
+@receiver(post_save, sender=Department, dispatch_uid='users.auth_department_saved')
+@receiver(post_delete, sender=Department, dispatch_uid='users.auth_department_deleted')
+@receiver(post_save, sender=Affiliate, dispatch_uid='users.auth_affiliate_saved')
+@receiver(post_delete, sender=Affiliate, dispatch_uid='users.auth_affiliate_deleted')
+def auth_directory_changed(sender, instance, **kwargs):
+    bump_version(AUTH_DIRECTORY_VERSION)
+
+
+@receiver(post_save, sender=Affiliate, dispatch_uid='users.reference_affiliate_saved')
+@receiver(post_delete, sender=Affiliate, dispatch_uid='users.reference_affiliate_deleted')
+def reference_affiliate_changed(sender, instance, **kwargs):
+    reference_data.affiliates.changed()
+    # Department snapshots carry their affiliate
+    reference_data.departments.changed()
+    bump_resources('affiliates', 'departments')
+
+
+@receiver(post_save, sender=Department, dispatch_uid='users.reference_department_saved')
+@receiver(post_delete, sender=Department, dispatch_uid='users.reference_department_deleted')
+def reference_department_changed(sender, instance, **kwargs):
+    reference_data.departments.changed()
+    bump_resources('departments')
+
+
+@receiver(post_save, sender=EmploymentGrade, dispatch_uid='users.reference_grade_saved')
+@receiver(post_delete, sender=EmploymentGrade, dispatch_uid='users.reference_grade_deleted')
+def reference_grade_changed(sender, instance, **kwargs):
+    reference_data.employment_grades.changed()
+    bump_resources('employment-grades')
+
+
+@receiver(post_save, sender=CustomUser, dispatch_uid='users.reference_hod_saved')
+def reference_hod_saved(sender, instance, update_fields=None, **kwargs):
+    # Department snapshots carry their HOD; only HOD accounts matter
+    if update_fields is not None and not HOD_FIELDS & set(update_fields):
+        return
+    if any(dept.hod_id == instance.pk for dept in reference_data.departments.all()):
+        reference_data.departments.changed()
+
+
+@receiver(post_delete, sender=CustomUser, dispatch_uid='users.reference_hod_deleted')
+def reference_hod_deleted(sender, instance, **kwargs):
+    # Department.hod is cleared with a bulk UPDATE, which sends no Department signal
+    reference_data.departments.changed()
+
+
+@receiver(post_save, sender=CustomUser, dispatch_uid='users.resource_user_saved')
+@receiver(post_delete, sender=CustomUser, dispatch_uid='users.resource_user_deleted')
+def resource_user_changed(sender, instance, update_fields=None, **kwargs):
+    # Logins only touch last_login, which no listing shows
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    bump_resources('users')
+
+
+def bulk_write_done():
+    """Invalidate everything bulk_create/bulk_update bypassed (staff imports, backup restores).
+
+    Those send no signals, so no per-row handler above ran: every reference table, the
+    auth directory, the leave data and entitlement versions and every resource tag move.
+    Bumps repeat once the surrounding transaction commits (leave_management.caching).
+    """
+    from leaves.balances import ENTITLEMENTS_VERSION
+    from leaves.dashboard import LEAVE_DATA_VERSION
+
+    for table in reference_data.TABLES.values():
+        table.changed()
+    bump_version(AUTH_DIRECTORY_VERSION)
+    bump_version(LEAVE_DATA_VERSION)
+    bump_version(ENTITLEMENTS_VERSION)
+    bump_all_resources()
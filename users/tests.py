@@ -1,3 +1,380 @@
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from leave_management import reference_data
+from .models import CustomUser, Department, Affiliate
+
+
+class StaffManagementViewTests(TestCase):
+    def setUp(self):
+        self.merban = Affiliate.objects.create(name="MERBAN CAPITAL")
+        self.sdsl = Affiliate.objects.create(name="SDSL")
+        self.hr = CustomUser.objects.create_user(
+            username="hr", password="x", employee_id="HR001", role="hr", affiliate=self.merban,
+        )
+        self.depts = [
+            Department.objects.create(name=f"Dept {i}", affiliate=self.merban) for i in range(3)
+        ]
+        self.manager = CustomUser.objects.create_user(
+            username="mgr", password="x", employee_id="MGR001", role="manager", department=self.depts[0],
+        )
+        for i, dept in enumerate(self.depts):
+            for j in range(3):
+                CustomUser.objects.create_user(
+                    username=f"s{i}{j}", password="x", employee_id=f"S{i}{j}", department=dept,
+                    affiliate=self.merban, manager=self.manager,
+                )
+        CustomUser.objects.create_user(username="sdsl1", password="x", employee_id="SD001", affiliate=self.sdsl)
+        self.client = APIClient()
+        self.client.force_authenticate(self.hr)
+
+    def test_query_count_independent_of_department_count(self):
+        reference_data.departments.all()  # departments come from the in-process registry
+        with self.assertNumQueries(1):
+            resp = self.client.get('/api/users/staff/')
+        self.assertEqual(resp.status_code, 200)
+        by_name = {d['name']: d for d in resp.data}
+        self.assertEqual(by_name['Dept 0']['staff_count'], 4)
+        self.assertEqual(by_name['Dept 1']['staff'][0]['manager']['employee_id'], 'MGR001')
+        self.assertEqual(by_name['Dept 1']['staff'][0]['affiliate'], 'MERBAN CAPITAL')
+        individuals = by_name['Individual Employees']['staff']
+        self.assertIn('SD001', [s['employee_id'] for s in individuals])
+
+    def test_sdsl_individuals_returned_flat(self):
+        resp = self.client.get('/api/users/staff/', {'affiliate_id': self.sdsl.id})
+        self.assertEqual([s['employee_id'] for s in resp.data], ['SD001'])
+
+    def test_etag_round_trip(self):
+        first = self.client.get('/api/users/staff/')
+        etag = first['ETag']
+        again = self.client.get('/api/users/staff/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(again.status_code, 304)
+
+        self.depts[1].name = "Renamed"
+        self.depts[1].save()
+        changed = self.client.get('/api/users/staff/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], etag)
+
+
+class UserDirectoryListTests(TestCase):
+    def setUp(self):
+        self.aff = Affiliate.objects.create(name="MERBAN CAPITAL")
+        self.dept = Department.objects.create(name="IT", affiliate=self.aff)
+        self.hr = CustomUser.objects.create_user(
+            username="hr", password="x", employee_id="HR001", role="hr", affiliate=self.aff,
+        )
+        for i in range(5):
+            CustomUser.objects.create_user(
+                username=f"it{i}", password="x", employee_id=f"IT00{i}", first_name="Staff", last_name=str(i),
+                department=self.dept, role="senior_staff" if i % 2 else "junior_staff",
+            )
+        CustomUser.objects.create_user(
+            username="gone", password="x", employee_id="IT009", department=self.dept, is_active=False,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.hr)
+
+    def test_paginated_and_filtered(self):
+        resp = self.client.get('/api/users/', {'department': self.dept.id, 'is_active': 'true', 'page_size': 2})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data['count'], 5)
+        self.assertEqual(len(resp.data['results']), 2)
+
+        resp = self.client.get('/api/users/', {'affiliate': self.aff.id, 'role': 'senior_staff'})
+        self.assertEqual([u['employee_id'] for u in resp.data['results']], ['IT001', 'IT003'])
+
+    def test_sparse_fieldset(self):
+        with self.assertNumQueries(2):
+            resp = self.client.get('/api/users/', {'fields': 'id,employee_id,department_name', 'role': 'hr'})
+        self.assertEqual(resp.data['results'], [{'id': self.hr.id, 'employee_id': 'HR001', 'department_name': None}])
+
+        resp = self.client.get('/api/users/', {'fields': 'id,password'})
+        self.assertEqual(resp.status_code, 400)
+
+
+class UserAutocompleteTests(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.hr = CustomUser.objects.create_user(
+            username="hr", password="x", employee_id="HR001", role="hr", first_name="Helen", last_name="Ray",
+        )
+        self.ama = CustomUser.objects.create_user(
+            username="ama", password="x", employee_id="EMP-2025-0001", first_name="Ámà", last_name="Mensah",
+            email="Ama.Mensah@example.com",
+        )
+        self.kofi = CustomUser.objects.create_user(
+            username="kofi", password="x", employee_id="EMP-2025-0002", first_name="Kofi", last_name="Amankwah",
+            email="kofi@example.com",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.hr)
+
+    def test_search_fields_maintained_on_save(self):
+        self.assertEqual(self.ama.search_key, 'ama mensah')
+        self.assertEqual(self.ama.email_normalized, 'ama.mensah@example.com')
+        self.kofi.last_name = 'Boateng'
+        self.kofi.save(update_fields=['last_name'])
+        self.kofi.refresh_from_db()
+        self.assertEqual(self.kofi.search_key_reversed, 'boateng kofi')
+
+    def test_ranked_prefix_matches(self):
+        resp = self.client.get('/api/users/autocomplete/', {'q': 'ama'})
+        self.assertEqual(resp.status_code, 200)
+        # First-name match ranks ahead of the last-name match
+        self.assertEqual([r['id'] for r in resp.data['results']], [self.ama.id, self.kofi.id])
+
+        resp = self.client.get('/api/users/autocomplete/', {'q': 'emp-2025-0002'})
+        self.assertEqual([r['id'] for r in resp.data['results']], [self.kofi.id])
+
+    def test_requires_privileged_role(self):
+        self.client.force_authenticate(self.kofi)
+        resp = self.client.get('/api/users/autocomplete/', {'q': 'ama'})
+        self.assertEqual(resp.status_code, 403)
+
+
+class StaffImportTests(TestCase):
+    CSV = (
+        "name,email,affiliate,department,role,employee_id,hire_date\n"
+        "John Doe,john.doe@company.com,Merban Capital,IT,senior_staff,,2023-01-15\n"
+        "Jane Smith,jane.smith@company.com,Merban Capital,IT,hod,HOD001,2022-03-01\n"
+        "Alice Johnson,alice@company.com,SDSL,,junior_staff,,\n"
+        "Bad Dept,bad@company.com,Merban Capital,Nowhere,junior_staff,,\n"
+        "Dup Email,existing@company.com,SBL,,junior_staff,,\n"
+    )
+
+    def setUp(self):
+        merban = Affiliate.objects.create(name="MERBAN CAPITAL")
+        Affiliate.objects.create(name="SDSL")
+        Affiliate.objects.create(name="SBL")
+        Department.objects.create(name="IT", affiliate=merban)
+        self.hr = CustomUser.objects.create_user(username="hr", password="x", employee_id="HR001", role="hr")
+        CustomUser.objects.create_user(
+            username="john.doe", password="x", employee_id="OLD001", email="Existing@company.com",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.hr)
+
+    def _upload(self, dry_run):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        upload = SimpleUploadedFile('staff.csv', self.CSV.encode(), content_type='text/csv')
+        return self.client.post('/api/users/staff/import/', {'file': upload, 'dry_run': dry_run}, format='multipart')
+
+    def test_dry_run_reports_without_writing(self):
+        before = CustomUser.objects.count()
+        resp = self._upload('true')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual((resp.data['total_rows'], resp.data['valid_rows'], resp.data['created']), (5, 3, 0))
+        self.assertEqual(sorted(e['row'] for e in resp.data['errors']), [5, 6])
+        self.assertEqual(CustomUser.objects.count(), before)
+
+    def test_import_creates_users_with_sequence_ids(self):
+        etag = self.client.get('/api/users/staff/')['ETag']
+        resp = self._upload('false')
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual(resp.data['created'], 3)
+        john = CustomUser.objects.get(email='john.doe@company.com')
+        # Username collides with an existing account and gets a suffix
+        self.assertEqual(john.username, 'john.doe1')
+        self.assertTrue(john.employee_id.startswith('EMP-'))
+        self.assertEqual(john.department.name, 'IT')
+        self.assertEqual(CustomUser.objects.get(employee_id='HOD001').role, 'manager')
+        self.assertIsNone(CustomUser.objects.get(email='alice@company.com').department)
+        self.assertEqual(len(set(resp.data['created_employee_ids'])), 3)
+        # bulk_create sends no signals; the importer retires cached listings itself
+        self.assertEqual(self.client.get('/api/users/staff/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_serializer_allocates_distinct_employee_ids(self):
+        from .serializers import UserSerializer
+        ids = []
+        for i in range(2):
+            ser = UserSerializer(data={'email': f'new{i}@company.com', 'first_name': 'N', 'last_name': str(i)})
+            self.assertTrue(ser.is_valid(), ser.errors)
+            ids.append(ser.save().employee_id)
+        self.assertEqual(len(set(ids)), 2)
+        self.assertTrue(all(i.startswith('EMP-') for i in ids))
+
+
+class BackupLoaderTests(TestCase):
+    def _dump(self):
+        from django.core import serializers
+        objs = list(Affiliate.objects.all()) + list(Department.objects.all()) + list(CustomUser.objects.all())
+        return serializers.serialize('json', objs)
+
+    def test_streaming_restore_round_trip(self):
+        import io
+        from datetime import datetime, timezone as dt_tz
+        from .backups import BackupLoader, iter_json_array
+
+        aff = Affiliate.objects.create(name="MERBAN CAPITAL")
+        dept = Department.objects.create(name="IT", affiliate=aff)
+        boss = CustomUser.objects.create_user(username="boss", password="x", employee_id="B1", department=dept)
+        dept.hod = boss
+        dept.save()
+        for i in range(5):
+            CustomUser.objects.create_user(
+                username=f"u{i}", password="x", employee_id=f"U{i}", department=dept, manager=boss,
+                first_name="Kwame", last_name=str(i),
+            )
+        old_stamp = datetime(2020, 1, 1, tzinfo=dt_tz.utc)
+        CustomUser.objects.update(created_at=old_stamp)
+        dump = self._dump()
+
+        CustomUser.objects.all().delete()
+        Department.objects.all().delete()
+        Affiliate.objects.all().delete()
+
+        self.assertIsNone(reference_data.departments.get_by_name("IT"))
+
+        # Tiny read chunks force objects to straddle buffer boundaries
+        records = iter_json_array(io.StringIO(dump), chunk_size=64)
+        loaded = BackupLoader(batch_size=2).load_records(records)
+
+        self.assertEqual(loaded, {'users.affiliate': 1, 'users.department': 1, 'users.customuser': 6})
+        dept = Department.objects.get(name="IT")
+        self.assertEqual(dept.hod.username, "boss")
+        # Restored rows bypassed the signals; the reference tables reload anyway
+        self.assertEqual(reference_data.departments.get_by_name("IT").pk, dept.pk)
+        user = CustomUser.objects.get(username="u3")
+        self.assertEqual(user.manager.username, "boss")
+        self.assertEqual(user.department_id, dept.id)
+        self.assertEqual(user.created_at, old_stamp)
+        self.assertEqual(user.search_key, 'kwame 3')
+
+    def test_sharded_export_verify_and_restore(self):
+        import os
+        import tempfile
+        from .backups import (
+            BackupExporter, BackupLoader, manifest_groups, read_manifest, verify_backup,
+        )
+
+        dept = Department.objects.create(name="Ops")
+        for i in range(5):
+            CustomUser.objects.create_user(username=f"x{i}", password="x", employee_id=f"X{i}", department=dept)
+
+        with tempfile.TemporaryDirectory() as out:
+            manifest = BackupExporter(chunk_size=2, shard_rows=2).export(out, [Department, CustomUser])
+            users_entry = next(m for m in manifest['models'] if m['model'] == 'users.customuser')
+            self.assertEqual((users_entry['rows'], len(users_entry['shards'])), (5, 3))
+            self.assertEqual(verify_backup(out), [])
+
+            CustomUser.objects.all().delete()
+            Department.objects.all().delete()
+            loaded = BackupLoader(batch_size=2).load_groups(manifest_groups(out, read_manifest(out)))
+            self.assertEqual(loaded['users.customuser'], 5)
+            self.assertEqual(CustomUser.objects.filter(department__name="Ops").count(), 5)
+
+            with open(os.path.join(out, users_entry['shards'][0]['file']), 'ab') as fh:
+                fh.write(b'corrupt')
+            self.assertEqual(len(verify_backup(out)), 1)
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        self.affiliate = Affiliate.objects.create(name='AUTHCO')
+        self.department = Department.objects.create(name='Treasury', affiliate=self.affiliate)
+        self.user = CustomUser.objects.create_user(
+            username='cached', password='x', employee_id='AUTH1', role='manager',
+            department=self.department, affiliate=self.affiliate,
+        )
+        self.token = str(AccessToken.for_user(self.user))
+
+    def _authenticate(self, method='get'):
+        from rest_framework.request import Request
+        from rest_framework.test import APIRequestFactory
+        from .authentication import CachedJWTAuthentication
+
+        factory = APIRequestFactory()
+        request = Request(getattr(factory, method)('/api/users/me/', HTTP_AUTHORIZATION=f'Bearer {self.token}'))
+        user, _ = CachedJWTAuthentication().authenticate(request)
+        return user
+
+    def test_warm_requests_do_not_query(self):
+        self._authenticate()
+        with self.assertNumQueries(0):
+            user = self._authenticate()
+            self.assertEqual(user.pk, self.user.pk)
+            self.assertEqual(user.role, 'manager')
+            self.assertEqual(user.affiliate.name, 'AUTHCO')
+            self.assertEqual(user.department.affiliate.name, 'AUTHCO')
+        # The deferred password still loads on demand
+        self.assertTrue(user.check_password('x'))
+
+    def test_saves_invalidate_snapshot(self):
+        self._authenticate()
+        self.department.name = 'Markets'
+        self.department.save()
+        self.assertEqual(self._authenticate().department.name, 'Markets')
+
+        self.user.is_active = False
+        self.user.save()
+        from rest_framework.exceptions import AuthenticationFailed
+        with self.assertRaises(AuthenticationFailed):
+            self._authenticate()
+
+    def test_unsafe_methods_read_the_row(self):
+        self._authenticate()
+        with self.assertNumQueries(1):
+            self._authenticate(method='post')
+
+
+class EmailOrUsernameLoginTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(
+            username='kofi', email='Kofi.Mensah@Example.com', password='pass-1234', employee_id='LOGIN1',
+        )
+        self.client = APIClient()
+
+    def test_token_by_username_or_email(self):
+        for login in ('kofi', 'kofi.mensah@example.com', ' KOFI.MENSAH@EXAMPLE.COM '):
+            resp = self.client.post('/api/auth/token/', {'username': login, 'password': 'pass-1234'}, format='json')
+            self.assertEqual(resp.status_code, 200, login)
+            self.assertIn('access', resp.data)
+        resp = self.client.post('/api/auth/token/', {'username': 'kofi', 'password': 'wrong'}, format='json')
+        self.assertEqual(resp.status_code, 401)
+
+    def test_backend_resolves_login_in_one_query(self):
+        from .backends import EmailOrUsernameModelBackend
+
+        with self.assertNumQueries(1):
+            user = EmailOrUsernameModelBackend().authenticate(None, username='KOFI.mensah@example.com', password='pass-1234')
+        self.assertEqual(user, self.user)
+
+
+class ReferenceDataRegistryTests(TestCase):
+    def setUp(self):
+        self.merban = Affiliate.objects.create(name="MERBAN CAPITAL")
+        self.dept = Department.objects.create(name="Finance", affiliate=self.merban)
+
+    def test_lookups_served_from_memory(self):
+        reference_data.departments.all()
+        with self.assertNumQueries(0):
+            dept = reference_data.departments.get(self.dept.pk)
+            self.assertEqual(dept.affiliate.name, "MERBAN CAPITAL")
+            self.assertIs(reference_data.departments.get_by_name(" finance "), dept)
+            self.assertIsNone(reference_data.departments.get("nope"))
+
+    def test_signals_refresh_snapshot(self):
+        reference_data.departments.all()
+        self.merban.name = "MERBAN"
+        self.merban.save()
+        self.assertEqual(reference_data.departments.get(self.dept.pk).affiliate.name, "MERBAN")
+
+        hod = CustomUser.objects.create_user(username="hod", password="x", employee_id="H1", first_name="Ama")
+        self.dept.hod = hod
+        self.dept.save()
+        hod.first_name = "Abena"
+        hod.save(update_fields=["first_name"])
+        self.assertEqual(reference_data.departments.get(self.dept.pk).hod.first_name, "Abena")
+
+    def test_department_list_runs_no_reference_queries(self):
+        hr = CustomUser.objects.create_user(username="hr", password="x", employee_id="HR1", role="hr")
+        client = APIClient()
+        client.force_authenticate(hr)
+        client.get('/api/users/departments/')
+        with self.assertNumQueries(0):
+            resp = client.get('/api/users/departments/', {'affiliate_id': self.merban.pk})
+        self.assertEqual([d['name'] for d in resp.data['results']], ["Finance"])
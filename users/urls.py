@@ -1,7 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
-    UserViewSet, UserProfileView, StaffManagementView, MyProfileView, 
+    UserViewSet, UserProfileView, StaffManagementView, StaffImportView, MyProfileView, 
     DepartmentViewSet, ChangePasswordView, AdminResetPasswordView, 
     AdminUpdateEmailView, get_role_choices, role_summary, 
     AffiliateViewSet, normalize_merban
@@ -33,6 +33,7 @@ urlpatterns = [
     path('<int:user_id>/reset-password/', AdminResetPasswordView.as_view(), name='admin-reset-password'),
     path('<int:user_id>/update-email/', AdminUpdateEmailView.as_view(), name='admin-update-email'),
     path('staff/', StaffManagementView.as_view(), name='staff-management'),
+    path('staff/import/', StaffImportView.as_view(), name='staff-import'),
     path('admin/normalize-merban/', normalize_merban, name='normalize-merban'),
     path('role-choices/', get_role_choices, name='role-choices'),
     path('role-summary/', role_summary, name='role-summary'),
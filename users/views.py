@@ -4,25 +4,87 @@ from rest_framework.decorators import api_view, permission_classes, action
 from rest_framework.response import Response
 from .models import CustomUser, Department
 from rest_framework.views import APIView
+from rest_framework.pagination import PageNumberPagination
 from django.conf import settings
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from django.contrib.auth import get_user_model
 from django.db.models import QuerySet
 from typing import cast
 from django.core.management import call_command
+from django.utils.http import quote_etag
+import hashlib
+import json
 import io
 from .models import CustomUser, Department, Affiliate
 from .serializers import UserSerializer, DepartmentSerializer, AffiliateSerializer
+from .search import autocomplete_users, AUTOCOMPLETE_DEFAULT_LIMIT
+from leave_management import reference_data
+from leave_management.conditional import ConditionalGetMixin, bump_resources, etag_matches
+from leave_management.db_router import read_replica
+from leave_management.middleware import query_budget
 
 User = get_user_model()
 
-class UserViewSet(viewsets.ModelViewSet):
+
+class UserDirectoryPagination(PageNumberPagination):
+    """Page-number pagination for the user directory; clients may ask for up to 200 rows."""
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+
+class UserViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing users
     """
     queryset = CustomUser.objects.all()
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
+    conditional_resources = {
+        action: ('users', 'departments', 'affiliates') for action in ('list', 'retrieve')
+    }
+
+    pagination_class = UserDirectoryPagination
+
+    # Public names accepted by ?fields= mapped to the lookups read through values()
+    SPARSE_FIELDS = {
+        'id': 'id',
+        'username': 'username',
+        'email': 'email',
+        'first_name': 'first_name',
+        'last_name': 'last_name',
+        'employee_id': 'employee_id',
+        'role': 'role',
+        'phone': 'phone',
+        'hire_date': 'hire_date',
+        'is_active': 'is_active',
+        'is_active_employee': 'is_active_employee',
+        'department_id': 'department_id',
+        'department_name': 'department__name',
+        'affiliate_id': 'affiliate_id',
+        'affiliate_name': 'affiliate__name',
+        'manager_id': 'manager_id',
+    }
+
+    def _filter_directory(self, request, qs):
+        """Apply ?role=, ?affiliate=, ?department= and ?is_active= filters."""
+        from django.db.models import Q
+
+        params = request.query_params
+        roles = [r for r in (params.get('role') or '').split(',') if r]
+        if roles:
+            qs = qs.filter(role__in=roles)
+        affiliate = params.get('affiliate')
+        if affiliate:
+            # Users belong to an affiliate directly or through their department
+            qs = qs.filter(Q(affiliate_id=affiliate) | Q(department__affiliate_id=affiliate))
+        department = params.get('department')
+        if department:
+            qs = qs.filter(department_id=department)
+        is_active = params.get('is_active')
+        if is_active is not None and is_active != '':
+            qs = qs.filter(is_active=is_active.lower() in ('1', 'true', 'yes'))
+        return qs
 
     def list(self, request, *args, **kwargs):
         user = request.user
@@ -30,8 +92,45 @@ class UserViewSet(viewsets.ModelViewSet):
             qs = CustomUser.objects.all()
         else:
             qs = CustomUser.objects.filter(pk=user.pk)
-        serializer = self.get_serializer(qs, many=True)
-        return Response(serializer.data)
+        try:
+            qs = self._filter_directory(request, qs)
+        except (TypeError, ValueError):
+            return Response({'error': 'affiliate and department must be numeric ids'}, status=status.HTTP_400_BAD_REQUEST)
+
+        fields_param = request.query_params.get('fields')
+        if fields_param:
+            # Sparse fieldset: read plain columns without building model instances
+            requested = [f.strip() for f in fields_param.split(',') if f.strip()]
+            unknown = [f for f in requested if f not in self.SPARSE_FIELDS]
+            if unknown:
+                return Response(
+                    {'error': f"Unknown fields: {', '.join(unknown)}", 'allowed': sorted(self.SPARSE_FIELDS)},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            lookups = {f: self.SPARSE_FIELDS[f] for f in requested}
+            rows = qs.values(*lookups.values())
+            page = self.paginate_queryset(rows)
+            data = [{name: row[lookup] for name, lookup in lookups.items()} for row in page]
+            return self.get_paginated_response(data)
+
+        qs = qs.select_related('affiliate', 'department__affiliate', 'department__hod')
+        page = self.paginate_queryset(qs)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['get'])
+    def autocomplete(self, request):
+        """Employee typeahead: ?q=<prefix>&limit=<n> matched on name, email and employee ID."""
+        user = request.user
+        if not (getattr(user, 'is_superuser', False) or getattr(user, 'role', None) in ['manager', 'hr', 'admin']):
+            return Response({"detail": "Not authorized"}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            limit = int(request.query_params.get('limit', AUTOCOMPLETE_DEFAULT_LIMIT))
+        except (TypeError, ValueError):
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        include_inactive = request.query_params.get('include_inactive') in ('1', 'true')
+        results = autocomplete_users(request.query_params.get('q', ''), limit, include_inactive)
+        return Response({'results': results})
 
     def retrieve(self, request, *args, **kwargs):
         user = request.user
@@ -60,6 +159,7 @@ class UserProfileView(APIView):
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+@read_replica
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def role_summary(request):
@@ -93,7 +193,7 @@ def role_summary(request):
 
     # Department HOD assignments snapshot
     hods = []
-    for dept in Department.objects.select_related('hod').order_by('name'):
+    for dept in reference_data.departments.all():
         if getattr(dept, 'hod', None):
             hods.append({
                 'department': dept.name,
@@ -290,12 +390,31 @@ class AdminUpdateEmailView(APIView):
         })
 
 
-class StaffManagementView(APIView):
+class StaffManagementView(ConditionalGetMixin, APIView):
     """
     View for HR staff management - view departments and staff
     """
     permission_classes = [permissions.IsAuthenticated]
+    conditional_resources = ('users', 'departments', 'affiliates')
+
+    @staticmethod
+    def _exclude_demo() -> bool:
+        import os
+        # Control demo user visibility:
+        # - SHOW_DEMO_USERS=1 forces inclusion
+        # - EXCLUDE_DEMO_USERS=1 forces exclusion
+        # - Otherwise: default behavior excludes demo when DEBUG is False (production), includes in DEBUG
+        if os.environ.get('SHOW_DEMO_USERS') == '1':
+            return False
+        if os.environ.get('EXCLUDE_DEMO_USERS') == '1':
+            return True
+        # Default: hide demo users in production
+        return not bool(getattr(settings, 'DEBUG', False))
+
+    def get_conditional_scope(self):
+        return (self._exclude_demo(),)
     
+    @query_budget(8)
     def get(self, request):
         """Get all departments with their staff members"""
         # Cast to CustomUser to access role attribute
@@ -311,36 +430,43 @@ class StaffManagementView(APIView):
         # Check for filtering parameters
         affiliate_id = request.GET.get('affiliate_id')
         role_filter = request.GET.get('role')
-        
-        import os
-        # Control demo user visibility:
-        # - SHOW_DEMO_USERS=1 forces inclusion
-        # - EXCLUDE_DEMO_USERS=1 forces exclusion
-        # - Otherwise: default behavior excludes demo when DEBUG is False (production), includes in DEBUG
-        show_demo_env = os.environ.get('SHOW_DEMO_USERS')
-        exclude_demo_env = os.environ.get('EXCLUDE_DEMO_USERS')
-        if show_demo_env == '1':
-            exclude_demo = False
-        elif exclude_demo_env == '1':
-            exclude_demo = True
-        else:
-            # Default: hide demo users in production
-            exclude_demo = not bool(getattr(settings, 'DEBUG', False))
-        
+        # Unchanged directories are answered with 304 by ConditionalGetMixin before this runs
+        return Response(self._build_directory(affiliate_id, role_filter, self._exclude_demo()))
+
+    @staticmethod
+    def _staff_entry(staff, affiliate_name):
+        manager_info = None
+        if staff.manager:
+            manager_info = {
+                'id': staff.manager.pk,
+                'name': staff.manager.get_full_name(),
+                'employee_id': staff.manager.employee_id
+            }
+        return {
+            'id': staff.pk,
+            'employee_id': staff.employee_id,
+            'name': staff.get_full_name(),
+            'email': staff.email,
+            'affiliate': affiliate_name,
+            'role': staff.role,
+            'hire_date': staff.hire_date,
+            'manager': manager_info,
+        }
+
+    def _build_directory(self, affiliate_id, role_filter, exclude_demo):
+        """Build the department tree from a single user query grouped in memory."""
+        from django.db.models import Q
+
         # If requesting CEOs specifically, handle that separately
         if role_filter == 'ceo':
-            ceo_qs = CustomUser.objects.filter(role='ceo', is_active=True)
+            ceo_qs = CustomUser.objects.filter(role='ceo', is_active=True).select_related('affiliate')
             if affiliate_id:
                 # Match either direct user.affiliate or via their department's affiliate
-                from django.db.models import Q as _Q
-                ceo_qs = ceo_qs.filter(_Q(affiliate_id=affiliate_id) | _Q(department__affiliate_id=affiliate_id))
-            
+                ceo_qs = ceo_qs.filter(Q(affiliate_id=affiliate_id) | Q(department__affiliate_id=affiliate_id))
             if exclude_demo:
                 ceo_qs = ceo_qs.exclude(is_demo=True)
-            
-            ceo_data = []
-            for ceo in ceo_qs:
-                ceo_data.append({
+            return [
+                {
                     'id': ceo.pk,
                     'employee_id': getattr(ceo, 'employee_id', None),
                     'name': ceo.get_full_name(),
@@ -348,58 +474,53 @@ class StaffManagementView(APIView):
                     'affiliate': ceo.affiliate.name if ceo.affiliate else None,
                     'role': ceo.role,
                     'hire_date': ceo.hire_date,
-                })
-            
-            return Response(ceo_data)
-        
+                }
+                for ceo in ceo_qs
+            ]
+
+        departments = reference_data.departments.all()
+        staff_qs = (
+            CustomUser.objects.filter(is_active=True)
+            .exclude(role='admin')  # Exclude admin users from staff list
+            .select_related('manager', 'affiliate', 'department__affiliate')
+        )
         if affiliate_id:
-            # Filter departments by affiliate
-            departments = Department.objects.select_related('hod').filter(affiliate_id=affiliate_id)
-        else:
-            departments = Department.objects.select_related('hod').all()
-        
+            # Filter departments by affiliate; individuals (no department) match on their own affiliate
+            departments = [d for d in departments if str(d.affiliate_id) == str(affiliate_id)]
+            staff_qs = staff_qs.filter(
+                Q(department__affiliate_id=affiliate_id) | Q(department__isnull=True, affiliate_id=affiliate_id)
+            )
+        # Apply demo exclusion policy
+        if exclude_demo:
+            staff_qs = staff_qs.exclude(is_demo=True)
+
+        by_department = {}
+        individuals = []
+        for staff in staff_qs:
+            if staff.department_id is None:
+                # Prefer department affiliate when present; fallback to user's affiliate
+                individuals.append(self._staff_entry(staff, staff.affiliate.name if staff.affiliate else None))
+            else:
+                by_department.setdefault(staff.department_id, []).append(staff)
+
+        if affiliate_id:
+            # For SDSL/SBL, individual employees (no department) are returned as a flattened list
+            affiliate = reference_data.affiliates.get(affiliate_id)
+            if affiliate and affiliate.name in ['SDSL', 'SBL'] and individuals:
+                return individuals
+
         data = []
-        
         for dept in departments:
-            # Use a simple, reliable filter to avoid missing users on legacy datasets
-            staff_qs = CustomUser.objects.filter(
-                department=dept,
-                is_active=True,
-            ).exclude(role='admin')  # Exclude admin users from staff list
-            # Apply demo exclusion policy decided above
-            if exclude_demo:
-                staff_qs = staff_qs.exclude(is_demo=True)
-            staff_members = staff_qs
             staff_data = []
-            
-            for staff in staff_members:
-                manager_info = None
-                if staff.manager:
-                    manager_info = {
-                        'id': staff.manager.pk,
-                        'name': staff.manager.get_full_name(),
-                        'employee_id': staff.manager.employee_id
-                    }
-                
+            for staff in by_department.get(dept.pk, []):
                 # Get affiliate name - prefer department's affiliate, fall back to user's affiliate
-                affiliate_name = None
                 if dept.affiliate:
                     affiliate_name = dept.affiliate.name
                 elif staff.affiliate:
                     affiliate_name = staff.affiliate.name
-
-                staff_data.append({
-                    'id': staff.pk,
-                    'employee_id': staff.employee_id,
-                    'name': staff.get_full_name(),
-                    'email': staff.email,
-                    'affiliate': affiliate_name,
-                    'role': staff.role,
-                    'hire_date': staff.hire_date,
-                    'manager': manager_info,
-                    # grades removed
-                })
-            
+                else:
+                    affiliate_name = None
+                staff_data.append(self._staff_entry(staff, affiliate_name))
             data.append({
                 'id': dept.pk,
                 'name': dept.name,
@@ -414,112 +535,20 @@ class StaffManagementView(APIView):
                     'email': dept.hod.email
                 } if getattr(dept, 'hod', None) else None
             })
-        
-        # Handle affiliate-specific individual employees (SDSL/SBL without departments)
-        if affiliate_id:
-            try:
-                affiliate = Affiliate.objects.get(pk=affiliate_id)
-                # For SDSL/SBL, include individual employees (no department, but with affiliate)
-                if affiliate.name in ['SDSL', 'SBL']:
-                    individuals_qs = CustomUser.objects.filter(
-                        affiliate_id=affiliate_id,
-                        department__isnull=True,  # No department assignment
-                        is_active=True
-                    ).exclude(role='admin')  # Exclude admin only
-                    
-                    if exclude_demo:
-                        individuals_qs = individuals_qs.exclude(is_demo=True)
-                    
-                    # Convert to list format similar to departments
-                    individual_staff = []
-                    for staff in individuals_qs:
-                        manager_info = None
-                        if staff.manager:
-                            manager_info = {
-                                'id': staff.manager.pk,
-                                'name': staff.manager.get_full_name(),
-                                'employee_id': staff.manager.employee_id
-                            }
-                        
-                        # Prefer department affiliate when present; fallback to user's affiliate
-                        aff_name = None
-                        try:
-                            if getattr(staff, 'department', None) and getattr(staff.department, 'affiliate', None):
-                                aff_name = staff.department.affiliate.name
-                            elif getattr(staff, 'affiliate', None):
-                                aff_name = staff.affiliate.name
-                        except Exception:
-                            aff_name = getattr(getattr(staff, 'affiliate', None), 'name', None)
-
-                        individual_staff.append({
-                            'id': staff.pk,
-                            'employee_id': staff.employee_id,
-                            'name': staff.get_full_name(),
-                            'email': staff.email,
-                            'affiliate': aff_name,
-                            'role': staff.role,
-                            'hire_date': staff.hire_date,
-                            'manager': manager_info,
-                            # grades removed
-                        })
-                    
-                    # Return individual employees as a flattened list for SDSL/SBL
-                    if individual_staff:
-                        return Response(individual_staff)
-                        
-            except Affiliate.DoesNotExist:
-                pass
 
         # Global view: include individual employees (no department) across all affiliates
-        if not affiliate_id:
-            individuals_qs = CustomUser.objects.filter(
-                department__isnull=True, 
-                is_active=True
-            ).exclude(role='admin')  # Exclude admin only
-            if exclude_demo:
-                individuals_qs = individuals_qs.exclude(is_demo=True)
-            individuals_list = []
-            for staff in individuals_qs:
-                manager_info = None
-                if staff.manager:
-                    manager_info = {
-                        'id': staff.manager.pk,
-                        'name': staff.manager.get_full_name(),
-                        'employee_id': staff.manager.employee_id
-                    }
-                # Prefer department affiliate when present; fallback to user's affiliate
-                aff_name = None
-                try:
-                    if getattr(staff, 'department', None) and getattr(staff.department, 'affiliate', None):
-                        aff_name = staff.department.affiliate.name
-                    elif getattr(staff, 'affiliate', None):
-                        aff_name = staff.affiliate.name
-                except Exception:
-                    aff_name = getattr(getattr(staff, 'affiliate', None), 'name', None)
-
-                individuals_list.append({
-                    'id': staff.pk,
-                    'employee_id': staff.employee_id,
-                    'name': staff.get_full_name(),
-                    'email': staff.email,
-                    'affiliate': aff_name,
-                    'role': staff.role,
-                    'hire_date': staff.hire_date,
-                    'manager': manager_info,
-                })
-            if individuals_list:
-                data.append({
-                    'id': 'individuals',
-                    'name': 'Individual Employees',
-                    'description': 'Employees not assigned to a department',
-                    'staff_count': len(individuals_list),
-                    'staff': individuals_list,
-                    'manager': None
-                })
-        
-        # Do not add any special 'Executives' grouping; CEOs will appear in Individuals list (no department)
+        if not affiliate_id and individuals:
+            data.append({
+                'id': 'individuals',
+                'name': 'Individual Employees',
+                'description': 'Employees not assigned to a department',
+                'staff_count': len(individuals),
+                'staff': individuals,
+                'manager': None
+            })
 
-        return Response(data)
+        # Do not add any special 'Executives' grouping; CEOs will appear in Individuals list (no department)
+        return data
     
     def post(self, request):
         """Create a new employee (HR only) with auto-department creation"""
@@ -555,8 +584,7 @@ class StaffManagementView(APIView):
         else:
             if department_name and not data.get('department_id'):
                 # Try to find existing department
-                department_qs = Department.objects.filter(name__iexact=department_name)
-                department = department_qs.first()
+                department = reference_data.departments.get_by_name(department_name)
                 if not department:
                     # Create new department
                     department = Department.objects.create(
@@ -572,13 +600,49 @@ class StaffManagementView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class DepartmentViewSet(viewsets.ModelViewSet):
+class StaffImportView(APIView):
+    """
+    HR bulk staff import: POST multipart with `file` (CSV), optional `dry_run` and `default_password`.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [MultiPartParser, FormParser]
+
+    def post(self, request):
+        user = request.user
+        if not (getattr(user, 'is_superuser', False) or getattr(user, 'role', None) in ['hr', 'admin']):
+            return Response({"error": "Only HR can import employees"}, status=status.HTTP_403_FORBIDDEN)
+
+        upload = request.FILES.get('file')
+        if not upload:
+            return Response({'error': 'file is required'}, status=status.HTTP_400_BAD_REQUEST)
+        dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+
+        from .importers import StaffImporter
+        importer = StaffImporter(dry_run=dry_run, default_password=request.data.get('default_password') or None)
+        # Decode the upload lazily so large files are parsed row by row
+        text = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+        try:
+            report = importer.run(text)
+        except UnicodeDecodeError:
+            return Response({'error': 'CSV must be UTF-8 encoded'}, status=status.HTTP_400_BAD_REQUEST)
+        finally:
+            text.detach()
+
+        code = status.HTTP_201_CREATED if report['created'] else status.HTTP_200_OK
+        return Response(report, status=code)
+
+
+class DepartmentViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing departments (HR only)
     """
     queryset = Department.objects.all()
     serializer_class = DepartmentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # HOD details come from the users table
+    conditional_resources = {
+        action: ('departments', 'affiliates', 'users') for action in ('list', 'retrieve')
+    }
     
     def get_permissions(self):
         """Only HR can create, update, or delete departments"""
@@ -597,6 +661,21 @@ class DepartmentViewSet(viewsets.ModelViewSet):
             except (TypeError, ValueError):
                 qs = qs.none()
         return qs
+
+    def list(self, request, *args, **kwargs):
+        """Served from the reference-data registry (same rows as get_queryset)."""
+        rows = reference_data.departments.all()
+        affiliate_id = request.query_params.get('affiliate_id')
+        if affiliate_id:
+            try:
+                affiliate_id = int(affiliate_id)
+            except (TypeError, ValueError):
+                affiliate_id = None
+            rows = [d for d in rows if affiliate_id is not None and d.affiliate_id == affiliate_id]
+        page = self.paginate_queryset(list(rows))
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer(rows, many=True).data)
     
     @action(detail=True, methods=['post'])
     def set_manager(self, request, pk=None):
@@ -648,10 +727,12 @@ class DepartmentViewSet(viewsets.ModelViewSet):
 ## Affiliate endpoints removed
 
 
-class AffiliateViewSet(viewsets.ModelViewSet):
+class AffiliateViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Affiliate.objects.all().order_by('name')
     serializer_class = AffiliateSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # CEO details come from the users table
+    conditional_resources = {action: ('affiliates', 'users') for action in ('list', 'retrieve')}
 
     def get_permissions(self):
         if self.action in ['create', 'update', 'partial_update', 'destroy']:
@@ -662,12 +743,14 @@ class AffiliateViewSet(viewsets.ModelViewSet):
 
     def list(self, request, *args, **kwargs):
         # Auto-seed initial affiliates if none exist
-        if Affiliate.objects.count() == 0:
+        if not reference_data.affiliates.all():
             Affiliate.objects.bulk_create([
                 Affiliate(name='MERBAN CAPITAL'),
                 Affiliate(name='SDSL'),
                 Affiliate(name='SBL'),
             ])
+            reference_data.affiliates.changed()
+            bump_resources('affiliates', 'departments')
         return super().list(request, *args, **kwargs)
 
 
@@ -686,8 +769,16 @@ def get_role_choices(request):
             'label': role_label,  # Original label
             'display': temp_user.get_role_display_name()  # Custom display name
         })
-    
-    return Response(role_choices)
+
+    # Choices only change with a deploy, so the tag is a digest of the payload itself
+    tag = quote_etag(hashlib.sha1(json.dumps(role_choices).encode()).hexdigest())
+    if etag_matches(tag, request.META.get('HTTP_IF_NONE_MATCH')):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(role_choices)
+    response['ETag'] = tag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
 
 
 class IsHRPermission(permissions.BasePermission):